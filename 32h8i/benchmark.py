@@ -0,0 +1,64 @@
+import argparse
+import time
+
+from driver.TempController32h8i import TempController32h8i, TempController32h8iPoller
+from simulator.TempController32h8iSimulator import TempController32h8iSimulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(baudrate, latency, count):
+    simulator = TempController32h8iSimulator(slave_addresses=[1], baudrate=baudrate, latency=latency).start()
+    device = TempController32h8i(1, comport=simulator.port, baudrate=baudrate)
+
+    measure("get_process_value", lambda: device.get_process_value(is_comms_value=False), count)
+    for func_name in ["get_setpoint_value", "get_input_range_low", "get_input_range_high",
+                      "get_pv_offset"]:
+        measure(func_name, getattr(device, func_name), count)
+    measure("set_setpoint_value", lambda: device.set_setpoint_value(100.0), count)
+    measure("snapshot registers one by one",
+            lambda: [device.read_register(address) for address in TempController32h8i.SNAPSHOT_REGISTERS.values()],
+            count)
+    measure("read_snapshot", device.read_snapshot, count)
+    measure("get_instrument_status", device.get_instrument_status, count)
+    measure("read_process_value_and_status", device.read_process_value_and_status, count)
+    measure("read_process_value_and_status(73)", lambda: device.read_process_value_and_status(max_gap=73), count)
+
+    device.close()
+    simulator.stop()
+
+
+def poller_benchmark(baudrate, latency, count, slaves):
+    slave_addresses = list(range(1, slaves + 1))
+    simulator = TempController32h8iSimulator(slave_addresses=slave_addresses, baudrate=baudrate,
+                                             latency=latency).start()
+    poller = TempController32h8iPoller(slave_addresses, comport=simulator.port, baudrate=baudrate)
+
+    measure(f"sweep of {slaves} slaves", poller.sweep, count)
+    measure(f"sweep_status of {slaves} slaves", poller.sweep_status, count)
+    print(poller.bus.report())
+
+    poller.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="32h8i driver benchmark against a simulated Modbus RTU bus")
+    parser.add_argument("--baudrate", type=int, default=9600, choices=TempController32h8i.BAUD_RATES)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    parser.add_argument("--slaves", type=int, default=8, help="slaves on the bus swept by the poller")
+    args = parser.parse_args()
+
+    driver_benchmark(args.baudrate, args.latency, args.count)
+    poller_benchmark(args.baudrate, args.latency, max(1, args.count // args.slaves), args.slaves)
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+import serial
+
+
+@dataclass
+class SlaveStats:
+    transactions: int = 0
+    # Transactions that got no or only part of the expected response
+    timeouts: int = 0
+    # Seconds from the end of the request to the end of the response
+    latency: float = 0.0
+    max_latency: float = 0.0
+
+    def __str__(self):
+        return f"{self.transactions} transactions, {self.timeouts} timeouts, " \
+               f"latency {1e3 * self.latency:.1f} ms (max {1e3 * self.max_latency:.1f} ms)"
+
+
+class ModbusRtuBus:
+    """
+    RS-485 port shared by any number of Modbus RTU slaves. It owns the only serial.Serial of the port and runs one
+    transaction at a time, whichever thread the slaves are used from. Before a request it only waits for what is
+    left of the inter-frame gap since the end of the previous response, instead of a fixed delay.
+    """
+
+    # Ports with a bus, see shared()
+    __buses: Dict[str, "ModbusRtuBus"] = dict()
+    __buses_lock = threading.Lock()
+
+    def __init__(self, port: str, baudrate: int = 9600, parity=serial.PARITY_NONE, bytesize=serial.EIGHTBITS,
+                 stopbits=serial.STOPBITS_ONE, timeout: float = 0.05):
+        """
+        :param timeout: seconds to wait for a response, on top of the time the response takes on the wire
+        """
+        self.serial = serial.Serial(port=port, baudrate=baudrate, parity=parity, bytesize=bytesize,
+                                    stopbits=stopbits, timeout=timeout)
+        self.timeout = timeout
+        self.inter_frame_gap = self.minimum_gap(baudrate)
+        self.character_time = 11 / baudrate
+
+        self.__stats: Dict[int, SlaveStats] = dict()
+        self.__lock = threading.Lock()
+        self.__last_frame_end = 0.0
+        # Holders of the bus from shared(), the last release() closes it
+        self.__users = 0
+
+    @classmethod
+    def shared(cls, port: str, baudrate: int = 9600, parity=serial.PARITY_NONE, bytesize=serial.EIGHTBITS,
+               stopbits=serial.STOPBITS_ONE) -> "ModbusRtuBus":
+        """
+        Every call must be paired with a release() once the bus isn't needed anymore
+
+        :return: the open bus of the port, a new one if there is none yet
+        :raises ValueError: if the bus of the port runs with other settings
+        """
+        with cls.__buses_lock:
+            bus = cls.__buses.get(port)
+            if bus is None or not bus.serial.is_open:
+                bus = cls.__buses[port] = cls(port, baudrate, parity, bytesize, stopbits)
+            elif (bus.serial.baudrate, bus.serial.parity, bus.serial.bytesize, bus.serial.stopbits) != \
+                    (baudrate, parity, bytesize, stopbits):
+                raise ValueError(f"{port} is already in use with other settings")
+            bus.__users += 1
+            return bus
+
+    def release(self):
+        """Give back a bus from shared(), the port is closed when its last holder releases it"""
+        with self.__buses_lock:
+            self.__users -= 1
+            if self.__users > 0:
+                return
+            if self.__buses.get(self.serial.port) is self:
+                del self.__buses[self.serial.port]
+        self.close()
+
+    @staticmethod
+    def minimum_gap(baudrate: int) -> float:
+        """
+        :return: silent interval between two frames in seconds: 3.5 character times of 11 bits, fixed to 1.75 ms
+        above 19200 baud as the Modbus serial line specification recommends
+        """
+        return 1.75e-3 if baudrate > 19200 else 3.5 * 11 / baudrate
+
+    def transaction(self, slave_address: int, request: bytes, response_size: int) -> bytes:
+        """
+        Send a request frame and read the response
+
+        :param response_size: bytes to read back, 0 for a broadcast which gets no response
+        :return: the response, shorter than response_size if the slave didn't answer in time
+        """
+        with self.__lock:
+            wait = self.__last_frame_end + self.inter_frame_gap - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            self.serial.reset_input_buffer()
+            # Long block reads take a while on the wire, a fixed timeout would cut them off at low baud rates
+            self.serial.timeout = self.timeout + response_size * self.character_time
+            self.serial.write(request)
+            self.serial.flush()
+            sent = time.monotonic()
+            response = self.serial.read(response_size) if response_size else b""
+            self.__last_frame_end = time.monotonic()
+
+            self.__record(slave_address, self.__last_frame_end - sent, len(response) < response_size)
+
+        return response
+
+    def stats(self) -> Dict[int, SlaveStats]:
+        with self.__lock:
+            return {slave_address: SlaveStats(**vars(stats)) for slave_address, stats in self.__stats.items()}
+
+    def report(self) -> str:
+        return "\n".join(f"Slave {slave_address}: {stats}" for slave_address, stats in sorted(self.stats().items()))
+
+    def close(self):
+        with self.__lock:
+            self.serial.close()
+        logging.info(f"Closed the Modbus RTU bus on {self.serial.port}\n{self.report()}")
+
+    def __record(self, slave_address: int, latency: float, timed_out: bool):
+        stats = self.__stats.setdefault(slave_address, SlaveStats())
+        stats.transactions += 1
+        stats.timeouts += timed_out
+        stats.latency += (latency - stats.latency) / stats.transactions
+        stats.max_latency = max(stats.max_latency, latency)
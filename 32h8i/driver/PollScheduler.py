@@ -0,0 +1,252 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class PollChannelStats:
+    polls: int = 0
+    errors: int = 0
+    # Polls per second, from the time between the starts of consecutive polls
+    rate: float = 0.0
+    # Seconds a poll took
+    latency: float = 0.0
+    max_latency: float = 0.0
+    # Seconds a poll started after its deadline
+    jitter: float = 0.0
+    max_jitter: float = 0.0
+
+    def __str__(self):
+        return f"{self.rate:.2f} Hz, latency {1e3 * self.latency:.1f} ms (max {1e3 * self.max_latency:.1f} ms), " \
+               f"jitter {1e3 * self.jitter:.1f} ms (max {1e3 * self.max_jitter:.1f} ms), " \
+               f"{self.polls} polls, {self.errors} errors"
+
+
+class PollChannel:
+    """A function polled at a fixed interval, its result is passed to callback"""
+
+    # Weight of the newest value in the moving averages of the statistics
+    SMOOTHING = 0.1
+
+    def __init__(self, name: str, bus: str, func: Callable[[], Any], interval: float,
+                 callback: Optional[Callable[[Any], None]], error_callback: Optional[Callable[[Exception], None]]):
+        self.name = name
+        self.bus = bus
+        self.func = func
+        self.interval = interval
+        self.callback = callback
+        self.error_callback = error_callback
+        self.stats = PollChannelStats()
+        self.deadline = time.monotonic()
+        self.removed = False
+        self.__last_start: Optional[float] = None
+
+    def poll(self):
+        start = time.monotonic()
+        try:
+            result = self.func()
+        except Exception as e:
+            logging.warning(f"Polling {self.name} failed: {e}")
+            self.__update_stats(start, error=True)
+            if self.error_callback:
+                self.error_callback(e)
+            return
+
+        self.__update_stats(start, error=False)
+        if self.callback:
+            self.callback(result)
+
+    def __update_stats(self, start: float, error: bool):
+        stats = self.stats
+        latency = time.monotonic() - start
+        jitter = max(0.0, start - self.deadline)
+
+        stats.polls += 1
+        stats.errors += error
+        stats.latency += self.SMOOTHING * (latency - stats.latency) if stats.polls > 1 else latency
+        stats.jitter += self.SMOOTHING * (jitter - stats.jitter) if stats.polls > 1 else jitter
+        stats.max_latency = max(stats.max_latency, latency)
+        stats.max_jitter = max(stats.max_jitter, jitter)
+        if self.__last_start is not None and start > self.__last_start:
+            rate = 1 / (start - self.__last_start)
+            stats.rate += self.SMOOTHING * (rate - stats.rate) if stats.rate else rate
+        self.__last_start = start
+
+
+class _Lane:
+    """Worker thread of one bus, runs the due polls of its channels one at a time, earliest deadline first"""
+
+    def __init__(self, bus: str):
+        self.bus = bus
+        self.queue: List[tuple] = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"PollScheduler {bus}", daemon=True)
+        self.thread.start()
+
+    def push(self, deadline: float, task):
+        with self.condition:
+            heapq.heappush(self.queue, (deadline, next(self.counter), task))
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and (not self.queue or self.queue[0][0] > time.monotonic()):
+                    self.condition.wait(self.queue[0][0] - time.monotonic() if self.queue else None)
+                if not self.running:
+                    # Submitted tasks still run, e.g. closing a port after its last poll
+                    tasks = [task for _, _, task in sorted(self.queue) if not isinstance(task, PollChannel)]
+                    self.queue.clear()
+                    break
+                deadline, _, task = heapq.heappop(self.queue)
+
+            if isinstance(task, PollChannel):
+                # An entry left behind when set_interval() moved the deadline forward
+                if task.removed or deadline != task.deadline:
+                    continue
+                task.poll()
+                self.__reschedule(task, deadline)
+            else:
+                self.__run(task)
+
+        for task in tasks:
+            self.__run(task)
+
+    def __run(self, task: Callable[[], Any]):
+        try:
+            task()
+        except Exception:
+            logging.exception(f"Task on {self.bus} failed")
+
+    def __reschedule(self, channel: PollChannel, deadline: float):
+        # Keep a fixed rate, unless the channel fell a whole interval behind: then skip the missed polls
+        channel.deadline = deadline + channel.interval
+        if channel.deadline < time.monotonic():
+            channel.deadline = time.monotonic()
+        self.push(channel.deadline, channel)
+
+
+class PollScheduler:
+    """
+    Runs every polled channel of the application off the GUI thread. Channels on the same bus share a worker thread
+    (a lane), as a serial port or a Modbus connection only carries one exchange at a time, channels on different
+    buses are polled in parallel. Within a lane the channel with the earliest deadline goes first. Callbacks are
+    called on the lane thread, emit a Qt signal from them to reach the GUI.
+    """
+
+    def __init__(self, report_interval: Optional[float] = 60.0):
+        """
+        :param report_interval: seconds between two logged statistics reports, None to never log them
+        """
+        self.channels: Dict[str, PollChannel] = dict()
+        self.__lanes: Dict[str, _Lane] = dict()
+        self.__lock = threading.Lock()
+        self.__closed = False
+
+        self.__report_timer = None
+        if report_interval:
+            self.__schedule_report(report_interval)
+
+    def add_channel(self, name: str, bus: str, func: Callable[[], Any], interval: float,
+                    callback: Optional[Callable[[Any], None]] = None,
+                    error_callback: Optional[Callable[[Exception], None]] = None) -> PollChannel:
+        """
+        Start polling func every interval seconds, the first poll is due right away
+
+        :param name: unique name of the channel
+        :param bus: the physical bus func talks over, e.g. the serial port or the IP address of the device
+        :raises RuntimeError: if the scheduler is closed
+        """
+        channel = PollChannel(name, bus, func, interval, callback, error_callback)
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError(f"Can't poll {name}, the scheduler is closed")
+            if name in self.channels:
+                raise ValueError(f"Channel {name} is already polled")
+            self.channels[name] = channel
+            lane = self.__lane(bus)
+
+        lane.push(channel.deadline, channel)
+        return channel
+
+    def remove_channel(self, name: str):
+        with self.__lock:
+            channel = self.channels.pop(name, None)
+        if channel:
+            channel.removed = True
+
+    def set_interval(self, name: str, interval: float):
+        """A shorter interval applies right away, a longer one from the next poll on"""
+        channel = self.channels[name]
+        with self.__lock:
+            if self.__closed:
+                return
+            lane = self.__lane(channel.bus)
+
+        # The next poll is due one new interval after the last deadline, instead of one old interval
+        deadline = channel.deadline - channel.interval + interval
+        channel.interval = interval
+        if deadline < channel.deadline:
+            channel.deadline = deadline
+            lane.push(deadline, channel)
+
+    def submit(self, bus: str, func: Callable[[], Any]):
+        """
+        Run func once on the lane of bus, before any poll that isn't overdue yet, e.g. to write a setpoint. Once the
+        scheduler is closed func is dropped with a warning, it may come from a Qt signal queued before the close.
+        """
+        with self.__lock:
+            if self.__closed:
+                logging.warning(f"Task on {bus} dropped, the scheduler is closed")
+                return
+            lane = self.__lane(bus)
+        lane.push(time.monotonic(), func)
+
+    def stats(self) -> Dict[str, PollChannelStats]:
+        with self.__lock:
+            return {name: channel.stats for name, channel in self.channels.items()}
+
+    def report(self) -> str:
+        return "\n".join(f"{name}: {stats}" for name, stats in self.stats().items())
+
+    def close(self):
+        """Stop polling, tasks already submitted still run before the lanes stop"""
+        with self.__lock:
+            self.__closed = True
+            if self.__report_timer:
+                self.__report_timer.cancel()
+            lanes = list(self.__lanes.values())
+            self.__lanes.clear()
+            self.channels.clear()
+        for lane in lanes:
+            lane.stop()
+
+    def __lane(self, bus: str) -> _Lane:
+        if bus not in self.__lanes:
+            self.__lanes[bus] = _Lane(bus)
+        return self.__lanes[bus]
+
+    def __schedule_report(self, report_interval: float):
+        def report():
+            if self.channels:
+                logging.info(f"Polling statistics:\n{self.report()}")
+            with self.__lock:
+                # close() may have run while the report was logged, its cancel() came too late for this timer
+                if not self.__closed:
+                    self.__schedule_report(report_interval)
+
+        self.__report_timer = threading.Timer(report_interval, report)
+        self.__report_timer.daemon = True
+        self.__report_timer.start()
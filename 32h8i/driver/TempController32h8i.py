@@ -1,8 +1,14 @@
-from dataclasses import dataclass
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
 
 import serial
 import minimalmodbus
 
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.ModbusRtuBus import ModbusRtuBus
+
 def parse_int_to_float(func):
     """
     Parse a float returned by the device according to the documentation, as in divide by 10
@@ -13,9 +19,13 @@ def parse_int_to_float(func):
         return float(func(*args, **kwargs))/10
     return wrapper
 
-class TempController32h8i(minimalmodbus.Instrument):
-    @dataclass
+class TempController32h8i(AsyncDriverMixin, minimalmodbus.Instrument):
+    @dataclass(frozen=True)
     class InstrumentStatus:
+        """Flags of the instrument status word, register 75"""
+        __slots__ = ("alarm1_status", "alarm2_status", "alarm3_status", "alarm4_status", "sensor_break_status",
+                     "pv_overrange_status", "new_alarm_status")
+
         alarm1_status: bool
         alarm2_status: bool
         alarm3_status: bool
@@ -24,20 +34,87 @@ class TempController32h8i(minimalmodbus.Instrument):
         pv_overrange_status: bool
         new_alarm_status: bool
 
+        # Bit of each flag in the status word
+        ALARM1 = 1 << 0
+        ALARM2 = 1 << 1
+        ALARM3 = 1 << 2
+        ALARM4 = 1 << 3
+        SENSOR_BREAK = 1 << 5
+        PV_OVERRANGE = 1 << 10
+        NEW_ALARM = 1 << 12
+
+        @classmethod
+        def from_word(cls, status_word: int) -> "TempController32h8i.InstrumentStatus":
+            return cls(alarm1_status=bool(status_word & cls.ALARM1),
+                       alarm2_status=bool(status_word & cls.ALARM2),
+                       alarm3_status=bool(status_word & cls.ALARM3),
+                       alarm4_status=bool(status_word & cls.ALARM4),
+                       sensor_break_status=bool(status_word & cls.SENSOR_BREAK),
+                       pv_overrange_status=bool(status_word & cls.PV_OVERRANGE),
+                       new_alarm_status=bool(status_word & cls.NEW_ALARM))
+
+    @dataclass(frozen=True)
+    class Snapshot:
+        """Every parameter read by read_snapshot(), temperatures in degrees"""
+        process_value: float
+        setpoint: float
+        input_range_low: float
+        input_range_high: float
+        pv_offset: float
+        # Register 75 as read, see InstrumentStatus for its bits
+        status_word: int
+        timestamp: float = field(default_factory=time.time)
+
+        @property
+        def status(self) -> "TempController32h8i.InstrumentStatus":
+            return TempController32h8i.InstrumentStatus.from_word(self.status_word)
+
+    @dataclass(frozen=True)
+    class StatusPoll:
+        """Result of read_process_value_and_status()"""
+        process_value: float
+        status: "TempController32h8i.InstrumentStatus"
+        timestamp: float = field(default_factory=time.time)
+
     BAUD_RATES = [1200, 2400, 4800, 9600, 19200]
 
-    def __init__(self, slave_address, comport='COM1', baudrate=9600, parity=serial.PARITY_NONE,
-                 databits=serial.EIGHTBITS, stopbits=serial.STOPBITS_ONE):
-        minimalmodbus.Instrument.__init__(self, comport, slave_address)
+    # Registers of read_snapshot(), the temperatures are in tenths of a degree
+    SNAPSHOT_REGISTERS = {
+        "process_value": 1,
+        "input_range_low": 11,
+        "input_range_high": 12,
+        "setpoint": 26,
+        "status_word": 75,
+        "pv_offset": 141
+    }
+    PROCESS_VALUE_REGISTER = 1
+    STATUS_REGISTER = 75
+    # Most registers a single Modbus read may return
+    MAX_BLOCK_SIZE = 125
 
-        if baudrate in self.BAUD_RATES:
-            self.serial.baudrate = baudrate
-        else:
+    def __init__(self, slave_address, comport='COM1', baudrate=9600, parity=serial.PARITY_NONE,
+                 databits=serial.EIGHTBITS, stopbits=serial.STOPBITS_ONE, bus: ModbusRtuBus = None):
+        """
+        :param bus: bus the controller is connected to, by default the shared bus of comport, which is opened with
+        the given serial settings if it isn't open yet
+        """
+        if baudrate not in self.BAUD_RATES:
             raise ValueError("Baud rate of {} not allowed".format(baudrate))
 
-        self.serial.parity = parity
-        self.serial.bytesize = databits
-        self.serial.stopbits = stopbits
+        self.bus = bus if bus is not None else ModbusRtuBus.shared(comport, baudrate, parity, databits, stopbits)
+        self.__shares_bus = bus is None
+        minimalmodbus.Instrument.__init__(self, self.bus.serial, slave_address)
+
+    def close(self):
+        """Release the shared bus of the port, a bus that was passed in is left to its owner"""
+        if self.__shares_bus:
+            self.__shares_bus = False
+            self.bus.release()
+
+    def _communicate(self, request: bytes, number_of_bytes_to_read: int) -> bytes:
+        # Every frame goes through the bus, which serializes the slaves sharing the port and keeps the gap between
+        # frames, minimalmodbus still builds and checks the frames
+        return self.bus.transaction(self.address, request, number_of_bytes_to_read)
 
     def set_process_value(self, process_value: float, is_comms_value: bool) -> bool:
         if is_comms_value:
@@ -78,17 +155,20 @@ class TempController32h8i(minimalmodbus.Instrument):
         return True
 
     def get_instrument_status(self) -> InstrumentStatus:
-        bit_values = bin(self.read_register(75))  # do [::-1] if the order is wrong
-        status = self.InstrumentStatus(
-            alarm1_status=bool(bit_values[0]),
-            alarm2_status=bool(bit_values[1]),
-            alarm3_status=bool(bit_values[2]),
-            alarm4_status=bool(bit_values[3]),
-            sensor_break_status=bool(bit_values[5]),
-            pv_overrange_status=bool(bit_values[10]),
-            new_alarm_status=bool(bit_values[12]))
-
-        return status
+        return self.InstrumentStatus.from_word(self.read_register(self.STATUS_REGISTER))
+
+    def read_process_value_and_status(self, max_gap: int = 0) -> "TempController32h8i.StatusPoll":
+        """
+        Read the process value and the decoded status word in one call. By default these are two short reads: a
+        single block of registers 1 to 75 puts 163 bytes on the wire against 30, which only pays off on a bus with
+        a slave turnaround beyond 130 character times.
+
+        :param max_gap: see read_block(), 73 or more reads both registers as one block, which requires a controller
+        that answers reads of the unused registers in between
+        """
+        values = self.read_block([self.PROCESS_VALUE_REGISTER, self.STATUS_REGISTER], max_gap)
+        return self.StatusPoll(values[self.PROCESS_VALUE_REGISTER] / 10,
+                               self.InstrumentStatus.from_word(values[self.STATUS_REGISTER]))
 
     @parse_int_to_float
     def get_pv_offset(self) -> float:
@@ -97,3 +177,82 @@ class TempController32h8i(minimalmodbus.Instrument):
     def set_pv_offset(self, pv_offset: float):
         self.write_register(141, int(pv_offset*10))
         return True
+
+    def read_block(self, addresses: Iterable[int], max_gap: int = 0) -> Dict[int, int]:
+        """
+        Read several registers with as few transactions as possible: registers no more than max_gap apart are read
+        together by one read_registers call.
+
+        :param addresses: registers to read
+        :param max_gap: unwanted registers a block may span, only raise it if the controller answers reads of the
+        registers in between
+        :return: value of every register in addresses
+        """
+        values = dict()
+        for start, count in self.__blocks(sorted(set(addresses)), max_gap):
+            block = self.read_registers(start, count)
+            values.update(zip(range(start, start + count), block))
+        return {address: values[address] for address in addresses}
+
+    def read_snapshot(self, max_gap: int = 0) -> "TempController32h8i.Snapshot":
+        """
+        Read the process value, setpoint, input range, PV offset and status in one go, adjacent registers are read
+        in a single transaction
+        """
+        values = self.read_block(self.SNAPSHOT_REGISTERS.values(), max_gap)
+        return self.Snapshot(**{name: values[address] if name == "status_word" else values[address] / 10
+                                for name, address in self.SNAPSHOT_REGISTERS.items()})
+
+    def __blocks(self, addresses: List[int], max_gap: int):
+        start = previous = addresses[0]
+        for address in addresses[1:]:
+            if address - previous - 1 > max_gap or address - start + 1 > self.MAX_BLOCK_SIZE:
+                yield start, previous - start + 1
+                start = address
+            previous = address
+        yield start, previous - start + 1
+
+
+class TempController32h8iPoller:
+    """
+    Reads the snapshot of every 32h8i daisy-chained on one RS-485 port, one slave after the other. A slave that
+    doesn't answer doesn't stop the sweep, its snapshot is None until it answers again.
+    """
+
+    def __init__(self, slave_addresses: Iterable[int], comport='COM1', baudrate=9600, parity=serial.PARITY_NONE,
+                 databits=serial.EIGHTBITS, stopbits=serial.STOPBITS_ONE, max_gap: int = 0):
+        self.max_gap = max_gap
+        self.bus = ModbusRtuBus.shared(comport, baudrate, parity, databits, stopbits)
+        self.controllers = {slave_address: TempController32h8i(slave_address, bus=self.bus)
+                            for slave_address in slave_addresses}
+
+    def sweep(self) -> Dict[int, Optional[TempController32h8i.Snapshot]]:
+        """
+        :return: snapshot of every slave address, None for the slaves that failed
+        """
+        snapshots = dict()
+        for slave_address, controller in self.controllers.items():
+            try:
+                snapshots[slave_address] = controller.read_snapshot(self.max_gap)
+            except (IOError, ValueError) as e:
+                logging.warning(f"Reading the snapshot of 32h8i {slave_address} failed: {e}")
+                snapshots[slave_address] = None
+        return snapshots
+
+    def sweep_status(self) -> Dict[int, Optional[TempController32h8i.StatusPoll]]:
+        """
+        Alarm monitoring of every slave, see TempController32h8i.read_process_value_and_status()
+
+        :return: process value and status of every slave address, None for the slaves that failed
+        """
+        polls = dict()
+        for slave_address, controller in self.controllers.items():
+            try:
+                polls[slave_address] = controller.read_process_value_and_status(self.max_gap)
+            except (IOError, ValueError) as e:
+                logging.warning(f"Reading the status of 32h8i {slave_address} failed: {e}")
+                polls[slave_address] = None
+        return polls
+
+    def close(self):
+        self.bus.release()
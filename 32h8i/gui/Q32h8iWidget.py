@@ -1,16 +1,42 @@
-from PyQt5.QtCore import QTimer
+import math
+
+import numpy as np
+import pyqtgraph
+from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QIntValidator
 from PyQt5.QtWidgets import QWidget, QLineEdit, QComboBox, QPushButton, QVBoxLayout, QHBoxLayout, QGroupBox, QLabel, \
     QSpinBox, QDoubleSpinBox
+from pyqtgraph import PlotWidget, DateAxisItem
 from serial.tools.list_ports import comports
 
+from driver.PollScheduler import PollScheduler
+from driver.Telemetry import TelemetryRecorder
 from driver.TempController32h8i import TempController32h8i
+from gui.SampleRingBuffer import SampleRingBuffer, decimate_min_max
 
 
 class Q32h8iWidget(QWidget):
-    def __init__(self):
+    # Emitted from the polling thread, delivered on the GUI thread
+    snapshot_ready = pyqtSignal(TempController32h8i.Snapshot)
+
+    # Default seconds between two readouts
+    READOUT_INTERVAL = 1.0
+    # Seconds of samples kept for the trend, the capacity of the buffers follows the interval
+    SAMPLE_HISTORY = 24 * 60 * 60
+    # Upper bound of the capacity whatever the interval, two arrays of 2 * capacity floats take 32 MB
+    MAX_SAMPLE_CAPACITY = 1000000
+
+    def __init__(self, recorder: TelemetryRecorder = None, scheduler: PollScheduler = None):
         super(Q32h8iWidget, self).__init__()
         self.device: TempController32h8i = None
+        self.recorder = recorder
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.comport = None
+        self.channel_name = None
+
+        self.process_value_samples = SampleRingBuffer(self.sample_capacity(self.READOUT_INTERVAL))
+        self.setpoint_samples = SampleRingBuffer(self.sample_capacity(self.READOUT_INTERVAL))
 
         self.setLayout(QVBoxLayout())
 
@@ -24,9 +50,17 @@ class Q32h8iWidget(QWidget):
         self.connect_button = QPushButton("Connect")
         self.connect_button.clicked.connect(self.connect_to_device)
 
+        self.interval_spinbox = QDoubleSpinBox()
+        self.interval_spinbox.setRange(0.1, 3600)
+        self.interval_spinbox.setValue(self.READOUT_INTERVAL)
+        self.interval_spinbox.setSuffix(" s")
+        self.interval_spinbox.valueChanged.connect(self.update_interval)
+
         temp_layout = QHBoxLayout()
         temp_layout.addWidget(self.slave_address_input)
         temp_layout.addWidget(self.comport_dropdown)
+        temp_layout.addWidget(QLabel("Interval"))
+        temp_layout.addWidget(self.interval_spinbox)
         temp_layout.addWidget(self.connect_button)
         self.layout().addLayout(temp_layout)
 
@@ -35,12 +69,26 @@ class Q32h8iWidget(QWidget):
         self.actions_group.setLayout(QVBoxLayout())
 
         self.temperature_readout_label = QLabel("Temperature: None ℃")
-        self.temperature_readout_timer = QTimer()
+        self.status_label = QLabel("Status: None")
+        self.snapshot_ready.connect(self.update_temperature)
+
+        self.plot_widget = PlotWidget()
+        self.plot_widget.getPlotItem().showGrid(x=True, y=True, alpha=1)
+        self.plot_widget.getPlotItem().setAxisItems(axisItems={"bottom": DateAxisItem()})
+        self.plot_widget.getPlotItem().addLegend()
+        self.process_value_curve = self.plot_widget.plot(pen=pyqtgraph.mkPen((255, 127, 0), width=1.25),
+                                                         name="Process value")
+        self.setpoint_curve = self.plot_widget.plot(pen=pyqtgraph.mkPen((0, 127, 255), width=1.25,
+                                                                        style=Qt.DashLine),
+                                                    name="Setpoint")
+        self.plot_widget.getPlotItem().getViewBox().sigResized.connect(self.redraw_trend)
+        self.plot_widget.getPlotItem().getViewBox().sigXRangeChanged.connect(self.redraw_trend_on_zoom)
 
         self.setpoint_spinbox = QDoubleSpinBox()
         self.process_value_spinbox = QDoubleSpinBox()
 
         self.actions_group.layout().addWidget(self.temperature_readout_label)
+        self.actions_group.layout().addWidget(self.status_label)
 
         temp_layout = QHBoxLayout()
         temp_layout.addWidget(QLabel("Setpoint "))
@@ -55,32 +103,104 @@ class Q32h8iWidget(QWidget):
         self.actions_group.layout().addLayout(temp_layout)
 
         self.layout().addWidget(self.actions_group)
-        self.layout().addStretch(0)
+        self.layout().addWidget(self.plot_widget)
 
     def connect_to_device(self):
-        self.device = TempController32h8i(int(self.slave_address_input.text()),
-                                          self.comport_dropdown.currentText())
+        self.comport = self.comport_dropdown.currentText()
+        self.device = TempController32h8i(int(self.slave_address_input.text()), self.comport)
         if self.device:
+            device = self.device
             self.actions_group.setEnabled(True)
-            self.setpoint_spinbox.valueChanged.connect(self.device.set_setpoint_value)
-            self.temperature_readout_timer.timeout.connect(
-                lambda: self.temperature_readout_label.setText("Temperature: "
-                                                               f"{self.device.get_process_value(is_comms_value=False)}"
-                                                               " ℃"))
+            # Writes go through the polling lane of the port too, the bus carries one request at a time
+            self.setpoint_spinbox.valueChanged.connect(
+                lambda val: self.scheduler.submit(self.comport, lambda: device.set_setpoint_value(val)))
             self.process_value_spinbox.valueChanged.connect(
-                lambda val: self.device.set_process_value(val, is_comms_value=True))
-            self.temperature_readout_timer.start(10000)
+                lambda val: self.scheduler.submit(self.comport,
+                                                  lambda: device.set_process_value(val, is_comms_value=True)))
+            self.channel_name = f"32h8i/{self.comport}/{device.address}"
+            self.process_value_samples.clear()
+            self.setpoint_samples.clear()
+            self.scheduler.add_channel(self.channel_name, self.comport, device.read_snapshot,
+                                       self.interval_spinbox.value(), self.snapshot_ready.emit)
             self.connect_button.setText("Disconnect")
             self.connect_button.clicked.disconnect()
             self.connect_button.clicked.connect(self.disconnect_device)
 
     def disconnect_device(self):
+        self.scheduler.remove_channel(self.channel_name)
+        # Release the bus on the polling lane, after a poll that may still be running. The port closes with the
+        # last controller on it
+        self.scheduler.submit(self.comport, self.device.close)
         self.device = None
         self.actions_group.setEnabled(False)
         self.setpoint_spinbox.valueChanged.disconnect()
-        self.temperature_readout_timer.timeout.disconnect()
         self.process_value_spinbox.valueChanged.disconnect()
-        self.temperature_readout_timer.stop()
         self.connect_button.setText("Connect")
         self.connect_button.clicked.disconnect()
         self.connect_button.clicked.connect(self.connect_to_device)
+
+    def closeEvent(self, event):
+        if self.device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted, the release of the bus among them
+            self.scheduler.close()
+        super().closeEvent(event)
+
+    def update_interval(self, interval: float):
+        self.resize_samples(interval)
+        if self.device:
+            self.scheduler.set_interval(self.channel_name, interval)
+
+    def sample_capacity(self, interval: float) -> int:
+        """
+        :param interval: seconds between two readouts
+        """
+        return min(math.ceil(self.SAMPLE_HISTORY / interval), self.MAX_SAMPLE_CAPACITY)
+
+    def resize_samples(self, interval: float):
+        """Keep SAMPLE_HISTORY worth of samples at the new interval, the newest samples move to the new buffers"""
+        capacity = self.sample_capacity(interval)
+        if capacity != self.process_value_samples.capacity:
+            self.process_value_samples = self.process_value_samples.resized(capacity)
+            self.setpoint_samples = self.setpoint_samples.resized(capacity)
+
+    def update_temperature(self, snapshot: TempController32h8i.Snapshot):
+        if self.device is None:
+            return
+
+        self.temperature_readout_label.setText(f"Temperature: {snapshot.process_value} ℃")
+        status = snapshot.status
+        active_flags = [name for name in status.__slots__ if getattr(status, name)]
+        self.status_label.setText(f"Status: {', '.join(active_flags) if active_flags else 'OK'}")
+
+        self.process_value_samples.append(snapshot.timestamp, snapshot.process_value)
+        self.setpoint_samples.append(snapshot.timestamp, snapshot.setpoint)
+        self.redraw_trend()
+
+        if self.recorder:
+            self.recorder.record_many({
+                f"32h8i/{self.device.address}/process_value": snapshot.process_value,
+                f"32h8i/{self.device.address}/setpoint": snapshot.setpoint,
+                f"32h8i/{self.device.address}/status": snapshot.status_word
+            }, snapshot.timestamp)
+
+    def redraw_trend(self):
+        """Plot only the visible samples, reduced to their min and max per pixel column"""
+        view_box = self.plot_widget.getPlotItem().getViewBox()
+        for samples, curve in [(self.process_value_samples, self.process_value_curve),
+                               (self.setpoint_samples, self.setpoint_curve)]:
+            timestamps, values = samples.data()
+
+            # While the x axis follows the data every sample is visible
+            if not view_box.autoRangeEnabled()[0]:
+                x_min, x_max = view_box.viewRange()[0]
+                # One sample past each edge keeps the line running off the plot
+                start, end = np.searchsorted(timestamps, [x_min, x_max])
+                timestamps, values = timestamps[max(start - 1, 0):end + 1], values[max(start - 1, 0):end + 1]
+
+            curve.setData(*decimate_min_max(timestamps, values, int(view_box.width())))
+
+    def redraw_trend_on_zoom(self):
+        if not self.plot_widget.getPlotItem().getViewBox().autoRangeEnabled()[0]:
+            self.redraw_trend()
@@ -0,0 +1,85 @@
+from typing import Tuple
+
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Fixed capacity store of (timestamp, value) samples, the oldest samples are dropped once it is full. Every sample is
+    written twice, capacity apart, so the samples in order are always one contiguous slice and data() doesn't copy.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.__timestamps = np.zeros(2 * capacity)
+        self.__values = np.zeros(2 * capacity)
+        self.__start = 0
+        self.__size = 0
+
+    def __len__(self):
+        return self.__size
+
+    def append(self, timestamp: float, value: float):
+        index = (self.__start + self.__size) % self.capacity
+        self.__timestamps[index] = self.__timestamps[index + self.capacity] = timestamp
+        self.__values[index] = self.__values[index + self.capacity] = value
+
+        if self.__size < self.capacity:
+            self.__size += 1
+        else:
+            self.__start = (self.__start + 1) % self.capacity
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray):
+        """Append many samples at once, of more than capacity samples only the newest are kept"""
+        timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+        count = len(timestamps)
+        indices = (self.__start + self.__size + np.arange(count)) % self.capacity
+        self.__timestamps[indices] = self.__timestamps[indices + self.capacity] = timestamps
+        self.__values[indices] = self.__values[indices + self.capacity] = values
+
+        overflow = max(0, self.__size + count - self.capacity)
+        self.__start = (self.__start + overflow) % self.capacity
+        self.__size = min(self.capacity, self.__size + count)
+
+    def resized(self, capacity: int) -> "SampleRingBuffer":
+        """
+        :return: a new buffer of the given capacity holding the newest samples of this one
+        """
+        samples = SampleRingBuffer(capacity)
+        samples.extend(*self.data())
+        return samples
+
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :return: timestamps and values, oldest first, as views into the buffer
+        """
+        end = self.__start + self.__size
+        return self.__timestamps[self.__start:end], self.__values[self.__start:end]
+
+    def clear(self):
+        self.__start = 0
+        self.__size = 0
+
+
+def decimate_min_max(x: np.ndarray, y: np.ndarray, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce samples to the minimum and maximum of each of buckets equally sized groups, in their original order, so
+    a plot that is buckets pixels wide looks the same with at most 2 * buckets points
+
+    :param x: sample timestamps, ascending
+    :param y: sample values
+    :param buckets: number of groups, e.g. the plot width in pixels
+    :return: the decimated x and y
+    """
+    group_size = len(x) // max(buckets, 1)
+    if group_size <= 2:
+        return x, y
+
+    # Samples that don't fill a whole group are kept as they are
+    grouped_length = group_size * buckets
+    groups = y[:grouped_length].reshape(buckets, group_size)
+    offsets = np.arange(0, grouped_length, group_size)[:, np.newaxis]
+    indices = np.sort(np.stack([groups.argmin(axis=1), groups.argmax(axis=1)], axis=1), axis=1) + offsets
+    indices = np.concatenate([indices.ravel(), np.arange(grouped_length, len(x))])
+
+    return x[indices], y[indices]
@@ -1,8 +1,11 @@
 from PyQt5.QtWidgets import *
 
+from driver.Telemetry import TelemetryRecorder
 from gui.Q32h8iWidget import Q32h8iWidget
 
+recorder = TelemetryRecorder(TelemetryRecorder.default_path("32h8i"))
 app = QApplication([])
-label = Q32h8iWidget()
+label = Q32h8iWidget(recorder)
 label.show()
-app.exec()
\ No newline at end of file
+app.exec()
+recorder.close()
\ No newline at end of file
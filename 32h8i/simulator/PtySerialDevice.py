@@ -0,0 +1,114 @@
+import logging
+import os
+import queue
+import select
+import threading
+import time
+import tty
+from typing import List, Optional
+
+
+class PtySerialDevice:
+    """
+    Simulated instrument on the far end of a pseudo terminal. The driver under test opens `port` like any other
+    serial port, the simulator answers every complete command it receives with handle_command().
+    Pseudo terminals only exist on POSIX systems.
+    """
+
+    def __init__(self, terminator: bytes = b"\r", baudrate: int = 9600, latency: float = 0.0,
+                 link_latency: float = 0.0):
+        """
+        :param terminator: end of command marker used to split the incoming byte stream
+        :param baudrate: simulated line speed, replies are delayed by the time their bytes take on the wire
+        :param latency: extra processing delay of the device in seconds, added before every reply
+        :param link_latency: round trip delay of the link in seconds, e.g. the latency timer of a USB serial adapter.
+        Unlike latency it doesn't hold up the device, so it is paid once for commands sent back to back.
+        """
+        self.terminator = terminator
+        self.baudrate = baudrate
+        self.latency = latency
+        self.link_latency = link_latency
+
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        self.port = os.ttyname(self.__slave)
+
+        self.__buffer = bytearray()
+        self.__running = False
+        self.__thread = None
+        # Replies on their way over the link, with the time they arrive at
+        self.__deliveries = queue.Queue()
+        self.__delivery_thread = None
+
+    def start(self):
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__serve, name=f"{type(self).__name__} {self.port}", daemon=True)
+        self.__thread.start()
+        if self.link_latency:
+            self.__delivery_thread = threading.Thread(target=self.__deliver, name=f"{type(self).__name__} link",
+                                                      daemon=True)
+            self.__delivery_thread.start()
+        return self
+
+    def stop(self):
+        self.__running = False
+        self.__thread.join()
+        if self.__delivery_thread:
+            self.__delivery_thread.join()
+        os.close(self.__slave)
+        os.close(self.__master)
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        """
+        :param command: one complete command as split by split_commands()
+        :return: bytes to send back, or None to stay silent
+        """
+        raise NotImplementedError
+
+    def split_commands(self, buffer: bytearray) -> List[bytes]:
+        """Remove every complete command from the front of buffer, the terminator is not part of the command"""
+        commands = []
+        index = buffer.find(self.terminator)
+        while index != -1:
+            commands.append(bytes(buffer[:index]))
+            del buffer[:index + len(self.terminator)]
+            index = buffer.find(self.terminator)
+        return commands
+
+    def send(self, data: bytes):
+        # 10 bits per character on the wire: start bit, 8 data bits and a stop bit
+        time.sleep(self.latency + 10 * len(data) / self.baudrate)
+        if self.link_latency:
+            self.__deliveries.put((time.monotonic() + self.link_latency, data))
+        else:
+            os.write(self.__master, data)
+
+    def __deliver(self):
+        while self.__running:
+            try:
+                arrival, data = self.__deliveries.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            time.sleep(max(0.0, arrival - time.monotonic()))
+            try:
+                os.write(self.__master, data)
+            except OSError:
+                return
+
+    def __serve(self):
+        while self.__running:
+            if not select.select([self.__master], [], [], 0.1)[0]:
+                continue
+
+            try:
+                data = os.read(self.__master, 1024)
+            except OSError:
+                return
+
+            self.__buffer += data
+            for command in self.split_commands(self.__buffer):
+                logging.debug(f"{type(self).__name__} received {command}")
+                reply = self.handle_command(command)
+                if reply is not None:
+                    self.send(reply)
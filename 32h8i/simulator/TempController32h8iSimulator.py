@@ -0,0 +1,114 @@
+import struct
+import time
+from typing import Dict, List, Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+READ_HOLDING_REGISTERS = 0x03
+WRITE_SINGLE_REGISTER = 0x06
+WRITE_MULTIPLE_REGISTERS = 0x10
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+
+# Unused registers inside a block read, a block has to start and end at a register in use
+UNUSED_REGISTER_VALUE = 0x8000
+
+
+def crc16(data: bytes) -> bytes:
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return struct.pack("<H", crc)
+
+
+class SimulatedZone:
+    """Register map of one 32h8i, values are stored the way the controller sends them (tenths of a degree)"""
+
+    def __init__(self, process_value: float = 21.0, setpoint: float = 21.0, time_constant: float = 30.0):
+        self.registers: Dict[int, int] = {1: int(process_value * 10), 11: 0, 12: 4000, 26: int(setpoint * 10),
+                                          75: 0, 141: 0, 203: 0}
+        # Process value settles towards the setpoint as a first order lag with this time constant in seconds
+        self.time_constant = time_constant
+        self.__updated_at = time.monotonic()
+
+    def read(self, address: int) -> int:
+        self.__settle()
+        return self.registers[address]
+
+    def write(self, address: int, value: int):
+        self.__settle()
+        self.registers[address] = value
+
+    def __settle(self):
+        now = time.monotonic()
+        step = min(1.0, (now - self.__updated_at) / self.time_constant)
+        self.__updated_at = now
+        self.registers[1] += int(round((self.registers[26] - self.registers[1]) * step))
+
+
+class TempController32h8iSimulator(PtySerialDevice):
+    """Simulated RS-485 bus of 32h8i controllers speaking Modbus RTU, one zone per slave address"""
+
+    def __init__(self, slave_addresses: List[int] = (1,), baudrate: int = 9600, latency: float = 0.0):
+        super().__init__(terminator=b"", baudrate=baudrate, latency=latency)
+
+        self.zones = {slave_address: SimulatedZone() for slave_address in slave_addresses}
+
+    def split_commands(self, buffer: bytearray) -> List[bytes]:
+        # RTU frames have no terminator, their length follows from the function code
+        commands = []
+        while len(buffer) >= 8:
+            length = 9 + buffer[6] if buffer[1] == WRITE_MULTIPLE_REGISTERS else 8
+            if len(buffer) < length:
+                break
+            commands.append(bytes(buffer[:length]))
+            del buffer[:length]
+        return commands
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        if crc16(command[:-2]) != command[-2:] or command[0] not in self.zones:
+            # Corrupted frames and frames for other slaves are ignored, as on a real bus
+            return None
+
+        slave_address, function_code = command[0], command[1]
+        try:
+            payload = self.execute(self.zones[slave_address], function_code, command[2:-2])
+        except KeyError:
+            payload = bytes([function_code | 0x80, ILLEGAL_DATA_ADDRESS])
+        except ValueError:
+            payload = bytes([function_code | 0x80, ILLEGAL_DATA_VALUE])
+
+        response = bytes([slave_address]) + payload
+        return response + crc16(response)
+
+    def execute(self, zone: SimulatedZone, function_code: int, data: bytes) -> bytes:
+        if function_code == READ_HOLDING_REGISTERS:
+            address, count = struct.unpack(">HH", data[:4])
+            if not 1 <= count <= 125:
+                raise ValueError
+            zone.read(address)
+            zone.read(address + count - 1)
+            values = [zone.read(register) if register in zone.registers else UNUSED_REGISTER_VALUE
+                      for register in range(address, address + count)]
+            return struct.pack(f">BB{count}H", function_code, 2 * count, *values)
+
+        if function_code == WRITE_SINGLE_REGISTER:
+            address, value = struct.unpack(">HH", data[:4])
+            zone.read(address)
+            zone.write(address, value)
+            return bytes([function_code]) + data[:4]
+
+        if function_code == WRITE_MULTIPLE_REGISTERS:
+            address, count, byte_count = struct.unpack(">HHB", data[:5])
+            if byte_count != 2 * count:
+                raise ValueError
+            for offset, value in enumerate(struct.unpack(f">{count}H", data[5:5 + byte_count])):
+                zone.read(address + offset)
+                zone.write(address + offset, value)
+            return bytes([function_code]) + data[:4]
+
+        return bytes([function_code | 0x80, ILLEGAL_FUNCTION])
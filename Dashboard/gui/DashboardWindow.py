@@ -0,0 +1,90 @@
+import logging
+import traceback
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QMainWindow, QTabWidget, QWidget, QVBoxLayout, QScrollArea, QLabel
+
+from gui.PluginNamespace import PluginNamespace
+from gui.PollStatsWidget import PollStatsWidget
+
+
+@dataclass
+class DashboardServices:
+    # Telemetry recorder for every plugin that records its readouts
+    recorder: object = None
+    # Polling scheduler shared by every plugin that polls its device
+    scheduler: object = None
+
+
+@dataclass
+class Plugin:
+    title: str
+    # Application directory the widget and its driver are imported from
+    directory: str
+    # Builds the widget from the application's modules: create(namespace, services)
+    create: Callable[[PluginNamespace, DashboardServices], QWidget]
+    scrollable: bool = False
+
+
+class DashboardWindow(QMainWindow):
+    """
+    One tab per instrument plugin. A plugin's modules are only imported and its widget is only created once its tab
+    is opened for the first time. The last tab shows the polling statistics, if there is a scheduler.
+    """
+
+    def __init__(self, plugins: List[Plugin], services: DashboardServices = None):
+        """
+        :param services: shared objects handed to every plugin
+        """
+        super().__init__()
+
+        self.plugins = plugins
+        self.services = services if services is not None else DashboardServices()
+        self.widgets: Dict[int, QWidget] = dict()
+
+        self.tab_widget = QTabWidget()
+        for plugin in plugins:
+            placeholder = QWidget()
+            placeholder.setLayout(QVBoxLayout())
+            self.tab_widget.addTab(placeholder, plugin.title)
+        if self.services.scheduler is not None:
+            self.tab_widget.addTab(PollStatsWidget(self.services.scheduler), "Polling")
+        self.tab_widget.currentChanged.connect(self.open_tab)
+        self.setCentralWidget(self.tab_widget)
+
+        self.open_tab(self.tab_widget.currentIndex())
+
+    def open_tab(self, index: int):
+        if index < 0 or index >= len(self.plugins) or index in self.widgets:
+            return
+
+        plugin = self.plugins[index]
+        logging.info(f"Loading the {plugin.title} plugin")
+        widget = self.__create_widget(plugin)
+        self.widgets[index] = widget
+
+        if isinstance(widget, QMainWindow):
+            widget.setWindowFlags(Qt.Widget)
+        if plugin.scrollable:
+            scroll_area = QScrollArea()
+            scroll_area.setWidget(widget)
+            widget = scroll_area
+
+        self.tab_widget.widget(index).layout().addWidget(widget)
+
+    def closeEvent(self, event):
+        # Lets every plugin release its device, as if its own window was closed
+        for widget in self.widgets.values():
+            widget.close()
+        super().closeEvent(event)
+
+    def __create_widget(self, plugin: Plugin) -> QWidget:
+        try:
+            return plugin.create(PluginNamespace(plugin.directory), self.services)
+        except Exception as e:
+            logging.exception(f"Loading the {plugin.title} plugin failed")
+            label = QLabel(f"Loading {plugin.title} failed: {e}\n\n{traceback.format_exc()}")
+            label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            return label
@@ -0,0 +1,47 @@
+import importlib
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict
+
+
+class PluginNamespace:
+    """
+    Imports the modules of one instrument application. Every application has its own top level driver and gui
+    packages, so each one is imported with only its own directory on sys.path and its modules are swapped out of
+    sys.modules afterwards, keeping the applications from seeing each other's packages. Only imports made through
+    load() are isolated, plugin code must not import modules lazily at runtime.
+    """
+
+    # Top level packages every application has a copy of
+    SHARED_PACKAGES = ("driver", "gui", "simulator")
+
+    def __init__(self, directory: str):
+        """
+        :param directory: application directory, e.g. the RX01 directory of the repository
+        """
+        self.directory = os.path.abspath(directory)
+        self.modules: Dict[str, ModuleType] = dict()
+
+    def load(self, module_name: str) -> ModuleType:
+        with self.__activated():
+            logging.debug(f"Importing {module_name} from {self.directory}")
+            return importlib.import_module(module_name)
+
+    @contextmanager
+    def __activated(self):
+        other_modules = self.__take_shared_modules()
+        sys.modules.update(self.modules)
+        sys.path.insert(0, self.directory)
+        try:
+            yield
+        finally:
+            sys.path.remove(self.directory)
+            self.modules = self.__take_shared_modules()
+            sys.modules.update(other_modules)
+
+    def __take_shared_modules(self) -> Dict[str, ModuleType]:
+        names = [name for name in sys.modules if name.split(".")[0] in self.SHARED_PACKAGES]
+        return {name: sys.modules.pop(name) for name in names}
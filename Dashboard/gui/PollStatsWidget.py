@@ -0,0 +1,37 @@
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QHeaderView
+
+
+class PollStatsWidget(QWidget):
+    """Table of the achieved rate, latency and jitter of every channel of a PollScheduler, refreshed every second"""
+
+    COLUMNS = ["Channel", "Rate [Hz]", "Latency [ms]", "Max latency [ms]", "Jitter [ms]", "Max jitter [ms]",
+               "Polls", "Errors"]
+
+    def __init__(self, scheduler):
+        super().__init__()
+
+        self.scheduler = scheduler
+
+        self.setLayout(QVBoxLayout())
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.verticalHeader().hide()
+        self.layout().addWidget(self.table)
+
+        self.refresh_timer = QTimer()
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start(1000)
+
+    def refresh(self):
+        stats = self.scheduler.stats()
+        self.table.setRowCount(len(stats))
+        for row, (name, channel_stats) in enumerate(sorted(stats.items())):
+            cells = [name, f"{channel_stats.rate:.2f}",
+                     f"{1e3 * channel_stats.latency:.1f}", f"{1e3 * channel_stats.max_latency:.1f}",
+                     f"{1e3 * channel_stats.jitter:.1f}", f"{1e3 * channel_stats.max_jitter:.1f}",
+                     str(channel_stats.polls), str(channel_stats.errors)]
+            for column, text in enumerate(cells):
+                self.table.setItem(row, column, QTableWidgetItem(text))
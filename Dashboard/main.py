@@ -0,0 +1,69 @@
+import logging
+import os
+import sys
+from ipaddress import IPv4Address
+
+from PyQt5.QtWidgets import QApplication
+
+from gui.DashboardWindow import DashboardServices, DashboardWindow, Plugin
+from gui.PluginNamespace import PluginNamespace
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SR201_IP_ADDRESS = IPv4Address("192.168.1.100")
+
+PLUGINS = [
+    Plugin("RX01", os.path.join(REPOSITORY_DIRECTORY, "RX01"),
+           lambda namespace, services: namespace.load("gui.RX01Widget").RX01Widget(services.scheduler),
+           scrollable=True),
+    Plugin("PD500X1", os.path.join(REPOSITORY_DIRECTORY, "PD500X1"),
+           lambda namespace, services: namespace.load("gui.PD500X1Widget").PD500X1Widget(services.scheduler),
+           scrollable=True),
+    Plugin("ETC1103", os.path.join(REPOSITORY_DIRECTORY, "ETC1103"),
+           lambda namespace, services: namespace.load("gui.ETC1103Widget").ETC1103Widget(services.scheduler)),
+    Plugin("VGC403", os.path.join(REPOSITORY_DIRECTORY, "VGC403"),
+           lambda namespace, services: namespace.load("gui.VGC403Widget").VGC403Widget(services.recorder,
+                                                                                     services.scheduler)),
+    Plugin("32h8i", os.path.join(REPOSITORY_DIRECTORY, "32h8i"),
+           lambda namespace, services: namespace.load("gui.Q32h8iWidget").Q32h8iWidget(services.recorder,
+                                                                                     services.scheduler)),
+    Plugin("MKS MFC", os.path.join(REPOSITORY_DIRECTORY, "MKSGUI"),
+           lambda namespace, services: namespace.load("gui.MainWindow").MainWindow(services.recorder)),
+    Plugin("SR201", os.path.join(REPOSITORY_DIRECTORY, "SR201"),
+           lambda namespace, services: namespace.load("gui.SR201Widget").SR201Widget(SR201_IP_ADDRESS,
+                                                                                  services.recorder,
+                                                                                  scheduler=services.scheduler)),
+    Plugin("WP8026ADAM", os.path.join(REPOSITORY_DIRECTORY, "WP8026ADAM"),
+           lambda namespace, services: namespace.load("gui.WP8026ADAMWidget").WP8026ADAMWidget(services.recorder,
+                                                                                             services.scheduler)),
+    Plugin("Stepper", os.path.join(REPOSITORY_DIRECTORY, "Stepper + datum search"),
+           lambda namespace, services: namespace.load("gui.MainWindow").MainWindow(services.scheduler)),
+]
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler("debug.log", mode="w"),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+    # The telemetry and polling modules are the same in every application, any copy serves all of them
+    TelemetryRecorder = PluginNamespace(os.path.join(REPOSITORY_DIRECTORY, "MKSGUI")).load("driver.Telemetry") \
+        .TelemetryRecorder
+    PollScheduler = PluginNamespace(os.path.join(REPOSITORY_DIRECTORY, "VGC403")).load("driver.PollScheduler") \
+        .PollScheduler
+    recorder = TelemetryRecorder(TelemetryRecorder.default_path("Dashboard"))
+    scheduler = PollScheduler()
+
+    app = QApplication([])
+    window = DashboardWindow(PLUGINS, DashboardServices(recorder, scheduler))
+    window.setWindowTitle("GLAD")
+    window.setMinimumSize(800, 600)
+    window.show()
+    exit_code = app.exec_()
+    scheduler.close()
+    recorder.close()
+    sys.exit(exit_code)
@@ -0,0 +1,40 @@
+import argparse
+import time
+
+from driver.ETC1103 import ETC1103
+from simulator.ETC1103Simulator import ETC1103Simulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(baudrate, latency, count):
+    simulator = ETC1103Simulator(baudrate=baudrate, latency=latency).start()
+    device = ETC1103(comport=simulator.port, baudrate=baudrate)
+
+    device.start_pump()
+    for func_name in ["get_pump_status", "get_operational_time", "get_output_frequency", "get_failure_details"]:
+        measure(func_name, getattr(device, func_name), count)
+    measure("start_pump", device.start_pump, count)
+
+    device.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ETC1103 driver benchmark against a simulated pump controller")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    driver_benchmark(args.baudrate, args.latency, args.count)
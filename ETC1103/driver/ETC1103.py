@@ -1,10 +1,12 @@
+import logging
 import re
 from typing import Union
 
-import serial
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.SerialTransport import SerialTransport
 
 
-class ETC1103:
+class ETC1103(AsyncDriverMixin):
 
     ERROR_CODES = {
         "#00": "There is no such command.",
@@ -41,15 +43,22 @@ class ETC1103:
         "7": "Failure"
     }
 
-    def __init__(self, comport="COM1", baudrate=9600, bytesize=8, stopbits=1):
-        self.__serial = serial.Serial(port=comport, baudrate=baudrate, bytesize=bytesize, stopbits=stopbits)
+    def __init__(self, comport="COM1", baudrate=9600, bytesize=8, stopbits=1, timeout=1.0):
+        self.__transport = SerialTransport(comport, terminator=b"\r", timeout=timeout, baudrate=baudrate,
+                                           bytesize=bytesize, stopbits=stopbits)
 
         # Make sure CRC is disabled
         self.__disable_crc()
 
+    def close(self):
+        self.__transport.close()
+
     def __write_and_read(self, command: str, expected_response: Union[str, None] = None) -> Union[str, bool]:
-        self.__serial.write(f"{command}\r".encode())
-        response = self.__serial.read_until(b"\r").decode()
+        try:
+            response = self.__transport.request(f"{command}\r".encode()).decode()
+        except TimeoutError:
+            logging.warning(f"No response for command {command}")
+            response = ""
 
         if response in self.ERROR_CODES:
             return self.__handle_command_failure(command, response)
@@ -1,17 +1,32 @@
+from typing import Tuple
+
 import serial.tools.list_ports
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QPushButton, QGroupBox, QLabel, QHBoxLayout
 
 from driver.ETC1103 import ETC1103
+from driver.PollScheduler import PollScheduler
 
 
 class ETC1103Widget(QWidget):
-    def __init__(self):
+    # Seconds between two reads of the pump status
+    POLL_INTERVAL = 2.0
+
+    # Emitted from the polling thread, delivered on the GUI thread
+    device_info_ready = pyqtSignal(tuple)
+
+    def __init__(self, scheduler: PollScheduler = None):
+        """
+        :param scheduler: polls the pump and runs its commands off the GUI thread, a new one if not given
+        """
         super().__init__()
 
         self._device = None
-        self.device_update_timer = QTimer()
-        self.device_update_timer.timeout.connect(self.get_device_info)
+        self.comport = None
+        self.channel_name = None
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.device_info_ready.connect(self.show_device_info)
 
         self.setLayout(QVBoxLayout())
 
@@ -52,21 +67,28 @@ class ETC1103Widget(QWidget):
         self.layout().addWidget(self.device_groupbox)
 
     def connect_device(self):
-        self._device = ETC1103(comport=self.comport_dropdown.currentText())
+        self.comport = self.comport_dropdown.currentText()
+        self._device = ETC1103(comport=self.comport)
 
         self.connect_button.setText("Disconnect")
         self.connect_button.clicked.disconnect()
         self.connect_button.clicked.connect(self.disconnect_device)
         self.comport_dropdown.setEnabled(False)
 
-        self.start_button.clicked.connect(self._device.start_pump)
-        self.stop_button.clicked.connect(self._device.stop_pump)
+        device = self._device
+        self.start_button.clicked.connect(lambda: self.scheduler.submit(self.comport, device.start_pump))
+        self.stop_button.clicked.connect(lambda: self.scheduler.submit(self.comport, device.stop_pump))
 
         self.device_groupbox.setEnabled(True)
 
-        self.device_update_timer.start(2000)
+        self.channel_name = f"ETC1103/{self.comport}"
+        self.scheduler.add_channel(self.channel_name, self.comport, self.get_device_info, self.POLL_INTERVAL,
+                                   self.device_info_ready.emit)
 
     def disconnect_device(self):
+        self.scheduler.remove_channel(self.channel_name)
+        # Close the port on the polling lane, after a poll that may still be running
+        self.scheduler.submit(self.comport, self._device.close)
         self._device = None
 
         self.connect_button.setText("Connect")
@@ -79,10 +101,25 @@ class ETC1103Widget(QWidget):
 
         self.device_groupbox.setEnabled(False)
 
-        self.device_update_timer.stop()
+    def get_device_info(self) -> Tuple[str, int, int, str]:
+        """Called on the polling thread"""
+        device = self._device
+        assert device, "There was no device, but its status was requested"
+        return (device.get_pump_status(), device.get_operational_time(), device.get_output_frequency(),
+                device.get_failure_details())
+
+    def show_device_info(self, device_info: Tuple[str, int, int, str]):
+        status, operational_time, output_frequency, failure_details = device_info
+        self.status_label.setText(f"Status: {status}")
+        self.operational_time_label.setText(f"Operational time: {operational_time} h")
+        self.output_frequency_label.setText(f"Output frequency: {output_frequency} h")
+        self.failure_details_label.setText(f"Failures: {failure_details}")
+
+    def closeEvent(self, event):
+        if self._device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted, the close of the port among them
+            self.scheduler.close()
+        super().closeEvent(event)
 
-    def get_device_info(self):
-        self.status_label.setText(f"Status: {self._device.get_pump_status()}")
-        self.operational_time_label.setText(f"Operational time: {self._device.get_operational_time()} h")
-        self.output_frequency_label.setText(f"Output frequency: {self._device.get_output_frequency()} h")
-        self.failure_details_label.setText(f"Failures: {self._device.get_failure_details()}")
@@ -0,0 +1,86 @@
+import time
+from typing import Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+
+class ETC1103Simulator(PtySerialDevice):
+    """Simulated ETC1103 turbo pump controller, including its #xx error replies"""
+
+    def __init__(self, baudrate: int = 9600, latency: float = 0.0, rated_frequency: int = 1000,
+                 acceleration_time: float = 2.0):
+        super().__init__(terminator=b"\r", baudrate=baudrate, latency=latency)
+
+        self.rated_frequency = rated_frequency
+        self.acceleration_time = acceleration_time
+        self.serial_mode = True
+        self.crc_enabled = True
+        self.alarm_code = "1"
+        self.operational_time = 1234
+        self.__started_at = None
+        self.__stopped_at = None
+        self.__stop_frequency = 0
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        return f"{self.execute(command.decode().strip())}\r".encode()
+
+    def execute(self, command: str) -> str:
+        name, argument = command[:3], command[3:]
+
+        if self.crc_enabled and name != "SCC":
+            return "#06"
+
+        if name == "SCC":
+            if argument not in ["0", "1"]:
+                return "#01"
+            self.crc_enabled = argument == "1"
+            return "$"
+        if name == "SDR":
+            return self.set_drive(argument)
+        if name == "RDT":
+            return f"{self.operational_time}"
+        if name == "RSS":
+            return self.status()
+        if name == "RSA":
+            return self.alarm_code
+        if name == "RRS":
+            return f"{self.frequency()}"
+
+        return "#00"
+
+    def set_drive(self, argument: str) -> str:
+        if argument not in ["0", "1"]:
+            return "#01"
+        if not self.serial_mode:
+            return "#05"
+        if argument == "1" and self.alarm_code != "1":
+            return "#03"
+
+        if argument == "1" and self.__started_at is None:
+            self.__started_at = time.monotonic()
+            self.__stopped_at = None
+        elif argument == "0" and self.__started_at is not None:
+            self.__stop_frequency = self.frequency()
+            self.__started_at = None
+            self.__stopped_at = time.monotonic()
+
+        return "$"
+
+    def frequency(self) -> int:
+        # Linear ramp up to the rated frequency and a brake back down at the same rate
+        if self.__started_at is not None:
+            elapsed = time.monotonic() - self.__started_at
+            return int(min(1.0, elapsed / self.acceleration_time) * self.rated_frequency)
+        if self.__stopped_at is not None:
+            elapsed = time.monotonic() - self.__stopped_at
+            return int(max(0.0, self.__stop_frequency - elapsed / self.acceleration_time * self.rated_frequency))
+        return 0
+
+    def status(self) -> str:
+        if self.alarm_code != "1":
+            return "7"
+
+        frequency = self.frequency()
+        if self.__started_at is not None:
+            return "3" if frequency >= self.rated_frequency else "2"
+        return "4" if frequency > 0 else "1"
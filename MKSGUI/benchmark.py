@@ -0,0 +1,81 @@
+import argparse
+import random
+import time
+import timeit
+
+from pyModbusTCP.utils import decode_ieee, encode_ieee, long_list_to_word, word_list_to_long
+
+from driver.FloatModbusClient import decode_floats, encode_floats
+from driver.MksEthMfc import MksEthMfc
+from simulator.MksEthMfcSimulator import MksEthMfcSimulator
+
+
+def helper_decode_floats(registers, big_endian=True):
+    # The per-value pyModbusTCP helper path FloatModbusClient used before the bulk codec, kept for comparison
+    return [decode_ieee(f) for f in word_list_to_long(registers, big_endian)]
+
+
+def helper_encode_floats(floats, big_endian=True):
+    return long_list_to_word([encode_ieee(f) for f in floats], big_endian)
+
+
+def bench(name, func, number=1000):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<40} {1e6 * seconds / number:8.3f} us/call")
+    return seconds
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def codec_benchmark(float_count):
+    floats = [random.uniform(-1e6, 1e6) for _ in range(float_count)]
+
+    for big_endian in [True, False]:
+        word_order = "big endian" if big_endian else "little endian"
+        registers = helper_encode_floats(floats, big_endian)
+        assert encode_floats(floats, big_endian) == registers
+        assert decode_floats(registers, big_endian) == helper_decode_floats(registers, big_endian)
+
+        helper = bench(f"helper decode {float_count} {word_order}",
+                       lambda: helper_decode_floats(registers, big_endian))
+        bulk = bench(f"bulk decode {float_count} {word_order}", lambda: decode_floats(registers, big_endian))
+        print(f"Decode speedup: {helper / bulk:.1f}x")
+
+        helper = bench(f"helper encode {float_count} {word_order}", lambda: helper_encode_floats(floats, big_endian))
+        bulk = bench(f"bulk encode {float_count} {word_order}", lambda: encode_floats(floats, big_endian))
+        print(f"Encode speedup: {helper / bulk:.1f}x")
+
+
+def driver_benchmark(port, latency, count):
+    simulator = MksEthMfcSimulator(port=port, latency=latency).start()
+    device = MksEthMfc("localhost", port=port)
+
+    device.set_setpoint(42.0)
+    for func_name in ["get_flow", "get_temperature", "get_valve_position", "get_flow_hours", "get_flow_total",
+                      "read_snapshot", "get_setpoint", "get_valve_state"]:
+        measure(func_name, getattr(device, func_name), count)
+    measure("set_setpoint", lambda: device.set_setpoint(42.0), count)
+
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="MKS MFC codec and driver benchmarks against a simulated controller")
+    parser.add_argument("--port", type=int, default=5020, help="local TCP port of the simulator")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    parser.add_argument("--floats", type=int, default=1000, help="floats per codec call")
+    args = parser.parse_args()
+
+    codec_benchmark(args.floats)
+    driver_benchmark(args.port, args.latency, args.count)
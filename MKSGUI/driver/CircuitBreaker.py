@@ -0,0 +1,148 @@
+import logging
+import threading
+from enum import Enum
+from typing import Callable, Optional
+
+from pyModbusTCP.client import ModbusClient
+from pyModbusTCP.constants import MB_CONNECT_ERR
+
+
+class CircuitBreaker:
+    """
+    Health state of one device. After failure_threshold consecutive failures the circuit opens: calls are refused
+    right away instead of each waiting out its own timeout, while a background probe checks on the device with an
+    exponentially growing interval. Once a probe succeeds calls are let through again, the first of them decides
+    whether the circuit closes or opens again with a longer backoff.
+    """
+
+    class State(Enum):
+        CLOSED = "closed"
+        OPEN = "open"
+        HALF_OPEN = "half open"
+
+    def __init__(self, name: str, probe: Callable[[], bool], failure_threshold: int = 2,
+                 initial_backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        :param name: device name used in log messages
+        :param probe: called from a background thread while the circuit is open, returns True if the device is back
+        :param failure_threshold: consecutive failures that open the circuit
+        :param initial_backoff: seconds until the first probe
+        :param max_backoff: upper limit of the seconds between probes
+        """
+        self.name = name
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.state_changed_callback: Optional[Callable[[CircuitBreaker.State], None]] = None
+
+        self.state = CircuitBreaker.State.CLOSED
+        self.failures = 0
+        self.backoff = initial_backoff
+        self.__lock = threading.Lock()
+        self.__probe_timer: Optional[threading.Timer] = None
+
+    def allow(self) -> bool:
+        return self.state != CircuitBreaker.State.OPEN
+
+    def record_success(self):
+        with self.__lock:
+            self.failures = 0
+            self.backoff = self.initial_backoff
+            changed = self.__set_state(CircuitBreaker.State.CLOSED)
+
+        if changed:
+            logging.info(f"{self.name} is reachable again")
+            self.__notify()
+
+    def record_failure(self):
+        with self.__lock:
+            self.failures += 1
+            if self.state == CircuitBreaker.State.OPEN or (self.state == CircuitBreaker.State.CLOSED
+                                                           and self.failures < self.failure_threshold):
+                return
+
+            if self.state == CircuitBreaker.State.HALF_OPEN:
+                self.backoff = min(2 * self.backoff, self.max_backoff)
+            self.__set_state(CircuitBreaker.State.OPEN)
+            self.__schedule_probe()
+
+        logging.warning(f"{self.name} is down, failing fast for the next {self.backoff:.1f} s")
+        self.__notify()
+
+    def cancel(self):
+        """Stop probing, for when the device is not used anymore"""
+        with self.__lock:
+            if self.__probe_timer:
+                self.__probe_timer.cancel()
+                self.__probe_timer = None
+
+    def __set_state(self, state: "CircuitBreaker.State") -> bool:
+        changed = self.state != state
+        self.state = state
+        return changed
+
+    def __schedule_probe(self):
+        self.__probe_timer = threading.Timer(self.backoff, self.__run_probe)
+        self.__probe_timer.daemon = True
+        self.__probe_timer.start()
+
+    def __run_probe(self):
+        try:
+            is_back = self.probe()
+        except Exception:
+            logging.exception(f"Probing {self.name} failed")
+            is_back = False
+
+        with self.__lock:
+            if self.__probe_timer is None or self.state != CircuitBreaker.State.OPEN:
+                return
+
+            if is_back:
+                self.__probe_timer = None
+                self.__set_state(CircuitBreaker.State.HALF_OPEN)
+            else:
+                self.backoff = min(2 * self.backoff, self.max_backoff)
+                logging.debug(f"{self.name} still down, next probe in {self.backoff:.1f} s")
+                self.__schedule_probe()
+                return
+
+        self.__notify()
+
+    def __notify(self):
+        if self.state_changed_callback:
+            self.state_changed_callback(self.state)
+
+
+class CircuitBreakerModbusClient(ModbusClient):
+    """
+    ModbusClient whose requests go through a CircuitBreaker. While the device is down requests fail immediately,
+    the same way as a request that timed out: the request methods return None or False and last_error is
+    MB_CONNECT_ERR. A Modbus exception response counts as success, the device did answer.
+    """
+
+    def __init__(self, *args, failure_threshold: int = 2, initial_backoff: float = 1.0, max_backoff: float = 60.0,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.circuit_breaker = CircuitBreaker(f"Modbus TCP device {self.host}:{self.port}", self.__probe,
+                                              failure_threshold, initial_backoff, max_backoff)
+
+    def _req_pdu(self, tx_pdu, rx_min_len=2):
+        if not self.circuit_breaker.allow():
+            raise ModbusClient._NetworkError(MB_CONNECT_ERR, "device is down, circuit breaker open")
+
+        try:
+            rx_pdu = super()._req_pdu(tx_pdu, rx_min_len)
+        except ModbusClient._NetworkError:
+            self.circuit_breaker.record_failure()
+            raise
+        except ModbusClient._ModbusExcept:
+            self.circuit_breaker.record_success()
+            raise
+
+        self.circuit_breaker.record_success()
+        return rx_pdu
+
+    def __probe(self) -> bool:
+        self.close()
+        return self.open()
@@ -1,23 +1,53 @@
 # via example from https://github.com/sourceperl/pyModbusTCP/blob/master/examples/client_float.py
 
-from pyModbusTCP.client import ModbusClient
-from pyModbusTCP.utils import encode_ieee, decode_ieee, \
-                              long_list_to_word, word_list_to_long
+import struct
 
+from driver.CircuitBreaker import CircuitBreakerModbusClient
 
-class FloatModbusClient(ModbusClient):
+
+def swap_words(words):
+    """Swap the two 16 bit words of every 32 bit value in a register list."""
+    swapped = list(words)
+    swapped[0::2], swapped[1::2] = words[1::2], words[0::2]
+    return swapped
+
+
+def decode_floats(registers, big_endian=True):
+    """
+    Decode a register list into IEEE-754 single precision floats, two registers per float.
+
+    :param registers: 16 bit register values, of even length
+    :param big_endian: True if the high word of each float comes first, as in pyModbusTCP.utils.word_list_to_long
+    :return: list of len(registers) // 2 floats
+    """
+    if not big_endian:
+        registers = swap_words(registers)
+    return list(struct.unpack(f">{len(registers) // 2}f", struct.pack(f">{len(registers)}H", *registers)))
+
+
+def encode_floats(floats, big_endian=True):
+    """
+    Encode IEEE-754 single precision floats into a register list, two registers per float.
+
+    :param floats: values to encode
+    :param big_endian: True to put the high word of each float first, as in pyModbusTCP.utils.long_list_to_word
+    :return: list of 2 * len(floats) 16 bit register values
+    """
+    registers = list(struct.unpack(f">{2 * len(floats)}H", struct.pack(f">{len(floats)}f", *floats)))
+    return registers if big_endian else swap_words(registers)
+
+
+class FloatModbusClient(CircuitBreakerModbusClient):
     """A ModbusClient class with float support."""
 
-    def read_float(self, address, number=1):
+    def read_float(self, address, number=1, big_endian=True):
         """Read float(s) with read holding registers."""
         reg_l = self.read_holding_registers(address, number * 2)
         if reg_l:
-            return [decode_ieee(f) for f in word_list_to_long(reg_l)]
+            return decode_floats(reg_l, big_endian)
         else:
             return None
 
-    def write_float(self, address, floats_list):
+    def write_float(self, address, floats_list, big_endian=True):
         """Write float(s) with write multiple registers."""
-        b32_l = [encode_ieee(f) for f in floats_list]
-        b16_l = long_list_to_word(b32_l)
-        return self.write_multiple_registers(address, b16_l)
+        return self.write_multiple_registers(address, encode_floats(floats_list, big_endian))
@@ -1,13 +1,18 @@
+import heapq
+import itertools
 import logging
-from dataclasses import dataclass
-from enum import Enum
-from queue import Queue
-from typing import Callable, Any
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Callable, Any, Optional, Dict, List
 
-from PyQt5.QtCore import QRunnable, QObject, pyqtSignal
-from pyModbusTCP.utils import decode_ieee, word_list_to_long
+from PyQt5.QtCore import QRunnable, QObject, QThreadPool, pyqtSignal
+from pyModbusTCP.utils import word_list_to_long
 
-from driver.FloatModbusClient import FloatModbusClient
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.FloatModbusClient import FloatModbusClient, decode_floats
 
 
 class MksEthMfcValveState(Enum):
@@ -16,19 +21,46 @@ class MksEthMfcValveState(Enum):
     OPEN = 2
 
 
-class MksEthMfc:
+@dataclass(frozen=True)
+class MksEthMfcSnapshot:
+    flow: float
+    temperature: float
+    valve_position: float
+    flow_hours: int
+    flow_total: int
+    # time.time() of the read
+    timestamp: float = field(default_factory=time.time)
 
-    def __init__(self, host_ip_address: str):
-        self.modbus_client = FloatModbusClient(host=host_ip_address, port=502, unit_id=1, auto_open=True)
+
+class MksEthMfc(AsyncDriverMixin):
+    # Input registers 0x4000-0x400B, big endian words: flow, temperature and valve position as 32 bit floats,
+    # two reserved registers, flow hours and flow total as 32 bit unsigned integers
+    SNAPSHOT_ADDRESS = 0x4000
+    SNAPSHOT_FORMAT = struct.Struct(">fff4xII")
+    SNAPSHOT_REGISTERS = SNAPSHOT_FORMAT.size // 2
+
+    def __init__(self, host_ip_address: str, port: int = 502, timeout: float = 2.0):
+        self.modbus_client = FloatModbusClient(host=host_ip_address, port=port, unit_id=1, auto_open=True,
+                                               timeout=timeout)
+
+    def is_available(self) -> bool:
+        """
+        :return: False while the MFC is considered down and requests fail without contacting it
+        """
+        return self.modbus_client.circuit_breaker.allow()
+
+    def close(self):
+        self.modbus_client.circuit_breaker.cancel()
+        self.modbus_client.close()
 
     def get_flow(self) -> float:
-        return decode_ieee(word_list_to_long(self.modbus_client.read_input_registers(0x4000, 2))[0])
+        return decode_floats(self.modbus_client.read_input_registers(0x4000, 2))[0]
 
     def get_temperature(self) -> float:
-        return decode_ieee(word_list_to_long(self.modbus_client.read_input_registers(0x4002, 2))[0])
+        return decode_floats(self.modbus_client.read_input_registers(0x4002, 2))[0]
 
     def get_valve_position(self) -> float:
-        return decode_ieee(word_list_to_long(self.modbus_client.read_input_registers(0x4004, 2))[0])
+        return decode_floats(self.modbus_client.read_input_registers(0x4004, 2))[0]
 
     def get_flow_hours(self) -> int:
         return word_list_to_long(self.modbus_client.read_input_registers(0x4008, 2))[0]
@@ -36,6 +68,18 @@ class MksEthMfc:
     def get_flow_total(self) -> float:
         return word_list_to_long(self.modbus_client.read_input_registers(0x400A, 2))[0]
 
+    def read_snapshot(self) -> Optional[MksEthMfcSnapshot]:
+        """
+        Read flow, temperature, valve position, flow hours and flow total in a single Modbus transaction
+
+        :return: the decoded snapshot, None if the read failed
+        """
+        registers = self.modbus_client.read_input_registers(self.SNAPSHOT_ADDRESS, self.SNAPSHOT_REGISTERS)
+        if not registers:
+            return None
+
+        return MksEthMfcSnapshot(*self.SNAPSHOT_FORMAT.unpack(struct.pack(f">{len(registers)}H", *registers)))
+
     def get_setpoint(self) -> float:
         return self.modbus_client.read_float(0xA000, 2)[0]
 
@@ -78,26 +122,112 @@ class MksEthMfc:
 
 class MksEthMfcWorkerSignals(QObject):
     flow_ready = pyqtSignal(float)
+    snapshot_ready = pyqtSignal(object)
     empty = pyqtSignal(bool)
 
 
 @dataclass(order=True)
 class MksEthMfcWorkerTask:
+    class Priority(IntEnum):
+        WRITE = 0
+        READ = 1
+
     signal: pyqtSignal
     func: Callable[[Any], Any]
     error_return: Any
+    priority: Priority = Priority.READ
+    # Pending tasks with the same key are coalesced, only the latest one runs
+    key: Optional[str] = None
+    # Seconds after which a task that did not start yet is dropped, None to never drop it
+    max_age: Optional[float] = None
+    created: float = field(default_factory=time.monotonic)
 
+    def is_stale(self) -> bool:
+        return self.max_age is not None and time.monotonic() - self.created > self.max_age
+
+
+class MksEthMfcTaskQueue:
+    """
+    Pending tasks of a worker. Writes run before reads, tasks of equal priority run in submission order. A task with
+    the key of a pending task replaces it and takes over its place in the queue, so repeated reads and setpoint
+    changes never pile up. If its priority differs, the replaced entry moves to the new priority.
+    """
 
-class MksEthMfcWorker(QRunnable, QObject):
     def __init__(self):
+        self.__heap: List[list] = []
+        self.__keyed: Dict[str, list] = dict()
+        self.__counter = itertools.count()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__heap)
+
+    def empty(self) -> bool:
+        return not self.__heap
+
+    def put(self, task: MksEthMfcWorkerTask):
+        with self.__lock:
+            entry = self.__keyed.get(task.key)
+            if entry is not None:
+                logging.debug(f"Replacing pending task {task.key}")
+                entry[2] = task
+                if entry[0] != task.priority:
+                    entry[0] = task.priority
+                    heapq.heapify(self.__heap)
+                return
+
+            entry = [task.priority, next(self.__counter), task]
+            heapq.heappush(self.__heap, entry)
+            if task.key is not None:
+                self.__keyed[task.key] = entry
+
+    def get_nowait(self) -> MksEthMfcWorkerTask:
+        """
+        :raises IndexError: if the queue is empty
+        """
+        with self.__lock:
+            entry = heapq.heappop(self.__heap)
+            task = entry[2]
+            if task.key is not None and self.__keyed.get(task.key) is entry:
+                del self.__keyed[task.key]
+            return task
+
+
+class MksEthMfcWorker(QRunnable, QObject):
+    """
+    Runs the tasks of one MFC one at a time, in the order of its MksEthMfcTaskQueue. The worker only holds a thread
+    of its pool while it has tasks, submit() starts it again once new tasks arrive.
+    """
+
+    def __init__(self, thread_pool: Optional[QThreadPool] = None):
         super().__init__()
+        self.setAutoDelete(False)
         self.signals = MksEthMfcWorkerSignals()
-        self.task_queue = Queue()
+        self.task_queue = MksEthMfcTaskQueue()
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.__lock = threading.Lock()
+        self.__running = False
+
+    def submit(self, task: MksEthMfcWorkerTask):
+        with self.__lock:
+            self.task_queue.put(task)
+            if not self.__running:
+                self.__running = True
+                self.thread_pool.start(self)
 
     def run(self):
         while True:
-            logging.debug("Waiting for task")
-            task = self.task_queue.get(block=True)
+            with self.__lock:
+                if self.task_queue.empty():
+                    self.__running = False
+                    return
+                task = self.task_queue.get_nowait()
+
+            if task.is_stale():
+                logging.warning("Dropping stale task with func {}".format(task.func.__qualname__))
+                task.signal.emit(task.error_return)
+                continue
+
             logging.debug("New task with func {}".format(task.func.__qualname__))
             try:
                 task.signal.emit(task.func())
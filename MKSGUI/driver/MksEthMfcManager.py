@@ -0,0 +1,132 @@
+import dataclasses
+import logging
+from typing import Dict, Set, Optional
+
+from PyQt5.QtCore import QObject, QThreadPool, QTimer, pyqtSignal
+
+from driver.MksEthMfc import MksEthMfc, MksEthMfcSnapshot, MksEthMfcWorker, MksEthMfcWorkerTask
+from driver.Telemetry import TelemetryRecorder
+from driver.TelemetryReplay import TelemetryReplay
+
+
+class MksEthMfcManager(QObject):
+    """
+    Owns every MFC of the application. All controllers are sampled with read_snapshot() on one shared timer, at most
+    max_connections of them at a time, and every result is published through snapshot_ready.
+    """
+
+    # IP address of the MFC and its MksEthMfcSnapshot, None if sampling failed
+    snapshot_ready = pyqtSignal(str, object)
+    # New sampling interval in milliseconds
+    interval_changed = pyqtSignal(int)
+
+    # Telemetry channel of every snapshot field but the timestamp, which is the timestamp of the samples
+    CHANNEL_PREFIX = "MksEthMfc/"
+    SNAPSHOT_FIELDS = {snapshot_field.name: snapshot_field.type
+                       for snapshot_field in dataclasses.fields(MksEthMfcSnapshot)
+                       if snapshot_field.name != "timestamp"}
+
+    # Shortest sampling interval in milliseconds, a snapshot takes several Modbus reads
+    MIN_INTERVAL = 100
+
+    def __init__(self, max_connections: int = 4, interval: int = 1000, recorder: Optional[TelemetryRecorder] = None):
+        """
+        :param max_connections: number of MFCs talked to concurrently
+        :param interval: sampling interval in milliseconds
+        :param recorder: records every field of every snapshot, if given
+        """
+        super().__init__()
+        self.recorder = recorder
+
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(max_connections)
+
+        self.devices: Dict[str, MksEthMfc] = dict()
+        self.workers: Dict[str, MksEthMfcWorker] = dict()
+        self.__sampling: Set[str] = set()
+
+        self.sampling_timer = QTimer()
+        self.sampling_timer.timeout.connect(self.sample)
+        self.sampling_timer.start(interval)
+
+    def add_device(self, ip_address: str, port: int = 502) -> MksEthMfc:
+        if ip_address in self.devices:
+            return self.devices[ip_address]
+
+        logging.debug(f"Adding MFC {ip_address}:{port}")
+        self.devices[ip_address] = MksEthMfc(ip_address, port)
+        self.workers[ip_address] = MksEthMfcWorker(self.thread_pool)
+        self.workers[ip_address].signals.snapshot_ready.connect(
+            lambda snapshot: self.__publish(ip_address, snapshot))
+
+        return self.devices[ip_address]
+
+    def remove_device(self, ip_address: str):
+        self.devices.pop(ip_address).close()
+        self.workers.pop(ip_address)
+        self.__sampling.discard(ip_address)
+
+    def close(self):
+        self.sampling_timer.stop()
+        self.thread_pool.waitForDone()
+        for device in self.devices.values():
+            device.close()
+
+    def submit(self, ip_address: str, task: MksEthMfcWorkerTask):
+        """Run a task on the worker of the MFC, after the tasks already queued for it"""
+        self.workers[ip_address].submit(task)
+
+    def connect_replay(self, replay: TelemetryReplay):
+        """Publish the snapshots of a recording through snapshot_ready instead of sampling the MFCs"""
+        self.sampling_timer.stop()
+        fields: Dict[str, dict] = dict()
+
+        def on_sample(channel: str, timestamp: float, value: float):
+            if not channel.startswith(self.CHANNEL_PREFIX):
+                return
+
+            ip_address, name = channel[len(self.CHANNEL_PREFIX):].rsplit("/", 1)
+            snapshot_fields = fields.setdefault(ip_address, dict())
+            # All fields of a snapshot share its timestamp, a new timestamp means a new snapshot
+            if snapshot_fields.get("timestamp") != timestamp:
+                snapshot_fields.clear()
+                snapshot_fields["timestamp"] = timestamp
+            snapshot_fields[name] = self.SNAPSHOT_FIELDS[name](value)
+
+            if len(snapshot_fields) == len(self.SNAPSHOT_FIELDS) + 1:
+                self.snapshot_ready.emit(ip_address, MksEthMfcSnapshot(**snapshot_fields))
+                snapshot_fields.clear()
+
+        replay.sample_ready.connect(on_sample)
+
+    def set_interval(self, interval: int):
+        """
+        :param interval: sampling interval in milliseconds
+        :raises ValueError: if interval is below MIN_INTERVAL
+        """
+        if interval < self.MIN_INTERVAL:
+            raise ValueError(f"Sampling interval of {interval} ms is below the minimum of {self.MIN_INTERVAL} ms")
+        self.sampling_timer.setInterval(interval)
+        self.interval_changed.emit(interval)
+
+    def sample(self):
+        for ip_address, worker in self.workers.items():
+            # A controller still busy with its previous sample is skipped instead of queueing up reads
+            if ip_address in self.__sampling:
+                continue
+
+            self.__sampling.add(ip_address)
+            worker.submit(MksEthMfcWorkerTask(worker.signals.snapshot_ready,
+                                              self.devices[ip_address].read_snapshot,
+                                              None,
+                                              key="snapshot",
+                                              max_age=self.sampling_timer.interval() / 1000))
+
+    def __publish(self, ip_address: str, snapshot):
+        # The worker's snapshot_ready is queued to the thread that called add_device(), normally the GUI thread, so
+        # this runs there and not on the worker
+        self.__sampling.discard(ip_address)
+        if self.recorder and snapshot:
+            self.recorder.record_many({f"{self.CHANNEL_PREFIX}{ip_address}/{name}": getattr(snapshot, name)
+                                       for name in self.SNAPSHOT_FIELDS}, snapshot.timestamp)
+        self.snapshot_ready.emit(ip_address, snapshot)
@@ -0,0 +1,295 @@
+import bisect
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# A telemetry file is the magic followed by two kinds of records, appended as the recording goes on:
+#   CHAN: channel id, length of the name, UTF-8 channel name - registers a channel before its first chunk
+#   CHNK: channel id, sample count, first and last timestamp, compressed sizes of both columns, then the
+#         zlib compressed timestamps and values, each a little endian float64 column
+# The chunk headers double as the index: a reader hops from header to header without decompressing anything.
+FILE_MAGIC = b"GLADTLM1"
+CHANNEL_RECORD = struct.Struct("<4sHH")
+CHUNK_RECORD = struct.Struct("<4sHIddII")
+
+
+def _column_bytes(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array("d", column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _column_from_bytes(data: bytes) -> array:
+    column = array("d")
+    column.frombytes(data)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+@dataclass(frozen=True)
+class TelemetryChunk:
+    channel: str
+    count: int
+    start: float
+    end: float
+    # Offset of the compressed timestamps in the file, the compressed values follow right after them
+    offset: int
+    timestamps_size: int
+    values_size: int
+
+
+class TelemetryReader:
+    """
+    Read access to a telemetry file. The file is memory-mapped, only the chunks a query touches are read and
+    decompressed, so long recordings don't have to fit in memory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.chunks: Dict[str, List[TelemetryChunk]] = dict()
+        self.channel_ids: Dict[str, int] = dict()
+        # Length of the file up to the last complete record, a recording cut short ends with a partial record
+        self.valid_length = len(FILE_MAGIC)
+
+        self.__chunk_starts: Dict[str, List[float]] = dict()
+        self.__chunk_ends: Dict[str, List[float]] = dict()
+        self.__file = open(path, "rb")
+        self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ) \
+            if os.fstat(self.__file.fileno()).st_size else None
+
+        if self.__map is None or self.__map[:len(FILE_MAGIC)] != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a telemetry file")
+
+        self.__scan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        self.__file.close()
+
+    def channels(self) -> List[str]:
+        return list(self.chunks)
+
+    def time_range(self, channel: str) -> Tuple[float, float]:
+        return self.chunks[channel][0].start, self.chunks[channel][-1].end
+
+    def read_chunk(self, chunk: TelemetryChunk) -> Tuple[array, array]:
+        values_offset = chunk.offset + chunk.timestamps_size
+        return _column_from_bytes(zlib.decompress(self.__map[chunk.offset:values_offset])), \
+            _column_from_bytes(zlib.decompress(self.__map[values_offset:values_offset + chunk.values_size]))
+
+    def find_chunks(self, channel: str, start: Optional[float] = None, end: Optional[float] = None) \
+            -> List[TelemetryChunk]:
+        """
+        :return: the chunks of the channel holding samples between start and end, in time order
+        """
+        if channel not in self.chunks:
+            return []
+
+        first = 0 if start is None else bisect.bisect_left(self.__chunk_ends[channel], start)
+        last = len(self.chunks[channel]) if end is None else bisect.bisect_right(self.__chunk_starts[channel], end)
+        return self.chunks[channel][first:last]
+
+    def query(self, channel: str, start: Optional[float] = None, end: Optional[float] = None) -> Tuple[array, array]:
+        """
+        Read the samples of a channel with start <= timestamp <= end
+
+        :param start: first timestamp of interest, None for the beginning of the recording
+        :param end: last timestamp of interest, None for the end of the recording
+        :return: timestamps and values
+        """
+        timestamps, values = array("d"), array("d")
+        for chunk in self.find_chunks(channel, start, end):
+            chunk_timestamps, chunk_values = self.read_chunk(chunk)
+            first = 0 if start is None or chunk.start >= start else bisect.bisect_left(chunk_timestamps, start)
+            last = len(chunk_timestamps) if end is None or chunk.end <= end \
+                else bisect.bisect_right(chunk_timestamps, end)
+            timestamps += chunk_timestamps[first:last]
+            values += chunk_values[first:last]
+
+        return timestamps, values
+
+    def __scan(self):
+        names = dict()
+        offset = len(FILE_MAGIC)
+        size = len(self.__map)
+
+        while offset + 4 <= size:
+            tag = self.__map[offset:offset + 4]
+
+            if tag == b"CHAN" and offset + CHANNEL_RECORD.size <= size:
+                _, channel_id, name_size = CHANNEL_RECORD.unpack_from(self.__map, offset)
+                offset += CHANNEL_RECORD.size
+                if offset + name_size > size:
+                    break
+                name = self.__map[offset:offset + name_size].decode()
+                offset += name_size
+
+                names[channel_id] = name
+                self.channel_ids[name] = channel_id
+                self.chunks.setdefault(name, [])
+                self.__chunk_starts.setdefault(name, [])
+                self.__chunk_ends.setdefault(name, [])
+
+            elif tag == b"CHNK" and offset + CHUNK_RECORD.size <= size:
+                _, channel_id, count, start, end, timestamps_size, values_size = \
+                    CHUNK_RECORD.unpack_from(self.__map, offset)
+                offset += CHUNK_RECORD.size
+                if offset + timestamps_size + values_size > size or channel_id not in names:
+                    break
+
+                chunk = TelemetryChunk(names[channel_id], count, start, end, offset, timestamps_size, values_size)
+                self.chunks[chunk.channel].append(chunk)
+                self.__chunk_starts[chunk.channel].append(start)
+                self.__chunk_ends[chunk.channel].append(end)
+                offset += timestamps_size + values_size
+
+            else:
+                break
+
+            self.valid_length = offset
+
+        if self.valid_length != size:
+            logging.warning(f"{self.path} ends with {size - self.valid_length} bytes of an incomplete record")
+
+
+class TelemetryRecorder:
+    """
+    Append-only recorder of timestamped samples. record() only queues the sample, a background thread groups the
+    samples per channel and writes them as compressed chunks, so recording never waits for the disk. Samples of one
+    channel are expected in time order.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 4096, max_chunk_age: float = 10.0, flush_interval: float = 0.5,
+                 compression_level: int = 6):
+        """
+        :param path: telemetry file, appended to if it exists
+        :param chunk_size: maximum number of samples per chunk
+        :param max_chunk_age: seconds after which a channel's samples are written even if the chunk isn't full
+        :param flush_interval: seconds between two runs of the writer thread
+        :param compression_level: zlib compression level, 1 (fast) to 9 (small)
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_chunk_age = max_chunk_age
+        self.flush_interval = flush_interval
+        self.compression_level = compression_level
+
+        self.__channel_ids: Dict[str, int] = dict()
+        if os.path.exists(path) and os.path.getsize(path):
+            with TelemetryReader(path) as reader:
+                self.__channel_ids.update(reader.channel_ids)
+                valid_length = reader.valid_length
+            os.truncate(path, valid_length)
+
+        self.__file = open(path, "ab")
+        if self.__file.tell() == 0:
+            self.__file.write(FILE_MAGIC)
+
+        # deque.append is atomic, recording threads never take a lock
+        self.__pending = deque()
+        self.__columns: Dict[str, Tuple[array, array]] = dict()
+        self.__column_started: Dict[str, float] = dict()
+
+        self.__stopped = threading.Event()
+        self.__writer = threading.Thread(target=self.__write_loop, name=f"TelemetryRecorder {path}", daemon=True)
+        self.__writer.start()
+
+    @staticmethod
+    def default_path(name: str, directory: str = "recordings") -> str:
+        """
+        :return: a new file name in directory, made of name and the current date and time
+        """
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S}.tlm")
+
+    def record(self, channel: str, value: float, timestamp: Optional[float] = None):
+        self.__pending.append((channel, float(value), time.time() if timestamp is None else timestamp))
+
+    def record_many(self, values: Dict[str, float], timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        self.__pending.extend((channel, float(value), timestamp) for channel, value in values.items())
+
+    def close(self):
+        """Write everything recorded so far and close the file"""
+        self.__stopped.set()
+        self.__writer.join()
+        self.__file.close()
+
+    def __write_loop(self):
+        while not self.__stopped.wait(self.flush_interval):
+            self.__try_write(flush_all=False)
+        self.__try_write(flush_all=True)
+
+    def __try_write(self, flush_all: bool):
+        # An unexpected error must not end the writer thread, recording would silently stop for good
+        try:
+            self.__write(flush_all)
+        except Exception:
+            logging.exception(f"Writing telemetry to {self.path} failed")
+
+    def __write(self, flush_all: bool):
+        records = bytearray()
+        new_channels = []
+        now = time.monotonic()
+
+        while self.__pending:
+            channel, value, timestamp = self.__pending.popleft()
+            if channel not in self.__channel_ids:
+                self.__channel_ids[channel] = len(self.__channel_ids)
+                new_channels.append(channel)
+                name = channel.encode()
+                records += CHANNEL_RECORD.pack(b"CHAN", self.__channel_ids[channel], len(name)) + name
+            if channel not in self.__columns:
+                self.__columns[channel] = array("d"), array("d")
+                self.__column_started[channel] = now
+
+            timestamps, values = self.__columns[channel]
+            timestamps.append(timestamp)
+            values.append(value)
+            if len(timestamps) >= self.chunk_size:
+                records += self.__chunk(channel)
+
+        for channel in list(self.__columns):
+            if flush_all or now - self.__column_started[channel] >= self.max_chunk_age:
+                records += self.__chunk(channel)
+
+        if records:
+            try:
+                self.__file.write(records)
+                self.__file.flush()
+            except OSError:
+                logging.exception(f"Writing telemetry to {self.path} failed, {len(records)} bytes lost")
+                # The CHAN records of these channels were lost with the rest, they are written again on their next sample
+                for channel in new_channels:
+                    del self.__channel_ids[channel]
+
+    def __chunk(self, channel: str) -> bytes:
+        timestamps, values = self.__columns.pop(channel)
+        del self.__column_started[channel]
+
+        compressed_timestamps = zlib.compress(_column_bytes(timestamps), self.compression_level)
+        compressed_values = zlib.compress(_column_bytes(values), self.compression_level)
+        return CHUNK_RECORD.pack(b"CHNK", self.__channel_ids[channel], len(timestamps), timestamps[0], timestamps[-1],
+                                 len(compressed_timestamps), len(compressed_values)) \
+            + compressed_timestamps + compressed_values
@@ -1,12 +1,32 @@
 import logging
 
-from PyQt5.QtWidgets import QMainWindow, QGridLayout
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout
 
+from driver.MksEthMfcManager import MksEthMfcManager
+from driver.Telemetry import TelemetryRecorder
 from gui.MksEthWidget import MksEthWidget
 
+MFC_IP_ADDRESSES = ["192.168.2.155"]
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, recorder: TelemetryRecorder = None):
+        """
+        :param recorder: recorder shared with other instruments, a recording of its own is started if None
+        """
         super().__init__()
         logging.debug("Init MainWindow")
-        self.setCentralWidget(MksEthWidget("192.168.2.155"))
+        self.owns_recorder = recorder is None
+        self.recorder = recorder or TelemetryRecorder(TelemetryRecorder.default_path("MKSGUI"))
+        self.mfc_manager = MksEthMfcManager(recorder=self.recorder)
+
+        self.setCentralWidget(QWidget())
+        self.centralWidget().setLayout(QVBoxLayout())
+        for ip_address in MFC_IP_ADDRESSES:
+            self.centralWidget().layout().addWidget(MksEthWidget(ip_address, self.mfc_manager))
+
+    def closeEvent(self, event):
+        self.mfc_manager.close()
+        if self.owns_recorder:
+            self.recorder.close()
+        super().closeEvent(event)
@@ -1,73 +1,89 @@
+import math
 import random
 from datetime import datetime, timedelta
 import logging
+import numpy as np
 import pyqtgraph
-from PyQt5.QtCore import QTimer, QThreadPool, QRegExp
+from PyQt5.QtCore import QRegExp
 from PyQt5.QtGui import QRegExpValidator
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QDoubleSpinBox, QGroupBox, QRadioButton, QHBoxLayout, \
     QLineEdit
 from pyqtgraph import PlotWidget, DateAxisItem
-from driver.MksEthMfc import MksEthMfc, MksEthMfcWorker, MksEthMfcWorkerTask, MksEthMfcValveState
+from driver.MksEthMfc import MksEthMfcWorkerTask, MksEthMfcValveState
+from driver.MksEthMfcManager import MksEthMfcManager
+from gui.SampleRingBuffer import SampleRingBuffer, decimate_min_max
 
 
 # TODO: Query current valve state before ending __init__
 
 class MksEthWidget(QWidget):
-    def __init__(self, ip_address: str):
+    # Seconds of samples kept for the plot, the capacity of the buffer follows the sampling interval
+    SAMPLE_HISTORY = 7 * 24 * 60 * 60
+    # Upper bound of the capacity whatever the interval, two arrays of 2 * capacity floats take 32 MB
+    MAX_SAMPLE_CAPACITY = 1000000
+
+    def __init__(self, ip_address: str, manager: MksEthMfcManager):
         logging.debug("Setting up MksEthWidget with ip {}".format(ip_address))
         super().__init__()
 
         self.setLayout(QVBoxLayout())
 
-        self.mks_mfc = MksEthMfc(ip_address)
-        self.mks_mfc_async_worker = MksEthMfcWorker()
-        self.thread_pool = QThreadPool.globalInstance()
-        self.thread_pool.start(self.mks_mfc_async_worker)
-        self.mks_mfc_async_worker.signals.flow_ready.connect(self.update_widget)
-
-        self.sampling_timer = QTimer()
-        self.sampling_timer.timeout.connect(lambda: self.mks_mfc_async_worker.task_queue.put(
-            MksEthMfcWorkerTask(self.mks_mfc_async_worker.signals.flow_ready,
-                                lambda: self.mks_mfc.get_flow(),
-                                -1)))
-        self.sampling_timer.start(1000)
+        self.ip_address = ip_address
+        self.manager = manager
+        self.mks_mfc = self.manager.add_device(ip_address)
+        self.mks_mfc_async_worker = self.manager.workers[ip_address]
+        self.manager.snapshot_ready.connect(self.on_snapshot)
 
-        self.sample_buffer = list()
-        self.timestamp_buffer = list()
+        self.samples = SampleRingBuffer(self.sample_capacity(self.manager.sampling_timer.interval()))
+        self.manager.interval_changed.connect(self.resize_samples)
 
         self.info_label = QLabel("Brak błędów")
         self.ip_address_label = QLabel("Adres IP: {}".format(ip_address))
         self.setpoint_spinbox = QDoubleSpinBox()
-        self.setpoint_spinbox.valueChanged.connect(lambda val: self.mks_mfc_async_worker.task_queue.put(
+        self.setpoint_spinbox.valueChanged.connect(lambda val: self.mks_mfc_async_worker.submit(
             MksEthMfcWorkerTask(self.mks_mfc_async_worker.signals.empty,
                                 lambda: self.mks_mfc.set_setpoint(val),
-                                False)))
+                                False,
+                                priority=MksEthMfcWorkerTask.Priority.WRITE,
+                                key="setpoint")))
         self.plot_widget = PlotWidget()
         self.valve_state_group = QGroupBox("Tryb zaworu")
         self.valve_normal_button = QRadioButton("Normalny")
-        self.valve_normal_button.clicked.connect(lambda: self.mks_mfc_async_worker.task_queue.put(
+        self.valve_normal_button.clicked.connect(lambda: self.mks_mfc_async_worker.submit(
             MksEthMfcWorkerTask(self.mks_mfc_async_worker.signals.empty,
                                 lambda: self.mks_mfc.set_valve_state(MksEthMfcValveState.NORMAL),
-                                False)))
+                                False,
+                                priority=MksEthMfcWorkerTask.Priority.WRITE,
+                                key="valve_state")))
         self.valve_closed_button = QRadioButton("Zamknięty")
-        self.valve_closed_button.clicked.connect(lambda: self.mks_mfc_async_worker.task_queue.put(
+        self.valve_closed_button.clicked.connect(lambda: self.mks_mfc_async_worker.submit(
             MksEthMfcWorkerTask(self.mks_mfc_async_worker.signals.empty,
                                 lambda: self.mks_mfc.set_valve_state(MksEthMfcValveState.CLOSED),
-                                False)))
+                                False,
+                                priority=MksEthMfcWorkerTask.Priority.WRITE,
+                                key="valve_state")))
         self.valve_open_button = QRadioButton("Otwarty")
-        self.valve_open_button.clicked.connect(lambda: self.mks_mfc_async_worker.task_queue.put(
+        self.valve_open_button.clicked.connect(lambda: self.mks_mfc_async_worker.submit(
             MksEthMfcWorkerTask(self.mks_mfc_async_worker.signals.empty,
                                 lambda: self.mks_mfc.set_valve_state(MksEthMfcValveState.OPEN),
-                                False)))
+                                False,
+                                priority=MksEthMfcWorkerTask.Priority.WRITE,
+                                key="valve_state")))
 
         self.plot_widget.getPlotItem().showGrid(x=True, y=True, alpha=1)
         self.plot_widget.getPlotItem().setAxisItems(axisItems={"bottom": DateAxisItem()})
+        self.flow_curve = self.plot_widget.plot(pen=pyqtgraph.mkPen((255, 127, 0), width=1.25),
+                                                symbolBrush=(255, 127, 0),
+                                                symbolPen=pyqtgraph.mkPen((255, 127, 0)),
+                                                symbol='o',
+                                                symbolSize=5)
+        self.plot_widget.getPlotItem().getViewBox().sigResized.connect(self.redraw_flow)
+        self.plot_widget.getPlotItem().getViewBox().sigXRangeChanged.connect(self.redraw_flow_on_zoom)
 
         self.intervalEdit = QLineEdit()
         self.intervalEdit.setText("1")
         self.intervalEdit.setValidator(QRegExpValidator(QRegExp("[0-9]*(|\\.[0-9]*)")))
-        self.intervalEdit.editingFinished.connect(lambda: self.sampling_timer.setInterval(
-                                                          int(float(self.intervalEdit.text()) * 60 * 1000)))
+        self.intervalEdit.editingFinished.connect(self.set_interval)
         self.intervalEdit.setMaximumWidth(150)
 
         temp_layout = QHBoxLayout()
@@ -96,21 +112,54 @@ class MksEthWidget(QWidget):
 
         self.layout().addLayout(temp_layout)
 
-    def update_widget(self, new_sample):
+    def set_interval(self):
+        interval = int(float(self.intervalEdit.text() or 0) * 60 * 1000)
+        if interval < self.manager.MIN_INTERVAL:
+            self.info_label.setText(f"Interwał musi wynosić co najmniej {self.manager.MIN_INTERVAL} ms")
+            self.intervalEdit.setText(f"{self.manager.sampling_timer.interval() / 60000:g}")
+            return
+        self.info_label.setText("Brak błędów")
+        self.manager.set_interval(interval)
+
+    def sample_capacity(self, interval: int) -> int:
+        """
+        :param interval: sampling interval in milliseconds
+        """
+        return min(math.ceil(self.SAMPLE_HISTORY * 1000 / interval), self.MAX_SAMPLE_CAPACITY)
+
+    def resize_samples(self, interval: int):
+        """Keep SAMPLE_HISTORY worth of samples at the new interval, the newest samples move to the new buffer"""
+        capacity = self.sample_capacity(interval)
+        if capacity != self.samples.capacity:
+            self.samples = self.samples.resized(capacity)
+
+    def on_snapshot(self, ip_address: str, snapshot):
+        if ip_address == self.ip_address:
+            self.update_widget(snapshot.flow if snapshot else -1, snapshot.timestamp if snapshot else None)
+
+    def update_widget(self, new_sample, timestamp: float = None):
         if new_sample and new_sample != -1:
             logging.debug("New sample: {}".format(new_sample))
-            self.sample_buffer.append(new_sample)
-            self.timestamp_buffer.append(datetime(1, 1, 1).now().timestamp())
-
-            self.plot_widget.clear()
-            self.plot_widget.plot(x=self.timestamp_buffer,
-                                  y=self.sample_buffer,
-                                  pen=pyqtgraph.mkPen((255, 127, 0), width=1.25),
-                                  symbolBrush=(255, 127, 0),
-                                  symbolPen=pyqtgraph.mkPen((255, 127, 0)),
-                                  symbol='o',
-                                  symbolSize=5,
-                                  name="symbol ='o'")
+            self.samples.append(timestamp or datetime(1, 1, 1).now().timestamp(), new_sample)
+            self.redraw_flow()
 
         else:
             logging.info("No new sample")
+
+    def redraw_flow(self):
+        """Plot only the visible samples, reduced to their min and max per pixel column"""
+        timestamps, samples = self.samples.data()
+        view_box = self.plot_widget.getPlotItem().getViewBox()
+
+        # While the x axis follows the data every sample is visible
+        if not view_box.autoRangeEnabled()[0]:
+            x_min, x_max = view_box.viewRange()[0]
+            # One sample past each edge keeps the line running off the plot
+            start, end = np.searchsorted(timestamps, [x_min, x_max])
+            timestamps, samples = timestamps[max(start - 1, 0):end + 1], samples[max(start - 1, 0):end + 1]
+
+        self.flow_curve.setData(*decimate_min_max(timestamps, samples, int(view_box.width())))
+
+    def redraw_flow_on_zoom(self):
+        if not self.plot_widget.getPlotItem().getViewBox().autoRangeEnabled()[0]:
+            self.redraw_flow()
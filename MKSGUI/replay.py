@@ -0,0 +1,54 @@
+import argparse
+import logging
+import sys
+
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout
+
+from driver.MksEthMfcManager import MksEthMfcManager
+from driver.Telemetry import TelemetryReader
+from driver.TelemetryReplay import TelemetryReplay
+from gui.MksEthWidget import MksEthWidget
+from gui.ReplayControlWidget import ReplayControlWidget
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded MKSGUI run in the live widgets")
+    parser.add_argument("path", help="telemetry file recorded by MKSGUI")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed, 1 is real time")
+    parser.add_argument("--start", type=float, default=0.0, help="seconds into the recording to start at")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    qapp = QApplication(sys.argv)
+
+    reader = TelemetryReader(args.path)
+    channels = [channel for channel in reader.channels() if channel.startswith(MksEthMfcManager.CHANNEL_PREFIX)]
+    replay = TelemetryReplay(reader, channels, args.speed)
+    replay.seek(replay.start_time + args.start)
+
+    manager = MksEthMfcManager()
+    manager.connect_replay(replay)
+
+    window = QWidget()
+    window.setWindowTitle(f"MKSGUI replay - {args.path}")
+    window.setLayout(QVBoxLayout())
+    window.layout().addWidget(ReplayControlWidget(replay))
+    for ip_address in sorted({channel[len(MksEthMfcManager.CHANNEL_PREFIX):].rsplit("/", 1)[0]
+                              for channel in channels}):
+        widget = MksEthWidget(ip_address, manager)
+        # The controls would talk to the real MFC
+        widget.setpoint_spinbox.setEnabled(False)
+        widget.valve_state_group.setEnabled(False)
+        widget.intervalEdit.setEnabled(False)
+        window.layout().addWidget(widget)
+
+    window.show()
+    exit_code = qapp.exec_()
+    manager.close()
+    reader.close()
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
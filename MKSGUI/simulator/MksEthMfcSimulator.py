@@ -0,0 +1,75 @@
+import time
+
+from pyModbusTCP.server import ModbusServer, DataHandler, DataBank
+from pyModbusTCP.utils import encode_ieee, decode_ieee, long_list_to_word, word_list_to_long
+
+
+class MksEthMfcSimulator(DataHandler):
+    """
+    Simulated MKS Ethernet mass flow controller on a local Modbus TCP server, with the register map used by
+    MksEthMfc. The flow follows the setpoint unless the valve is forced open or closed.
+    """
+
+    FULL_SCALE_FLOW = 100.0
+
+    def __init__(self, host: str = "localhost", port: int = 5020, latency: float = 0.0):
+        """
+        :param latency: delay in seconds added to every request, on top of the network round trip
+        """
+        super().__init__(DataBank())
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.temperature = 25.0
+        self.__started_at = time.monotonic()
+        self.__server = ModbusServer(host=host, port=port, no_block=True, data_hdl=self)
+
+    def start(self):
+        self.__server.start()
+        return self
+
+    def stop(self):
+        self.__server.stop()
+
+    def setpoint(self) -> float:
+        return decode_ieee(word_list_to_long(self.data_bank.get_holding_registers(0xA000, 2))[0])
+
+    def flow(self) -> float:
+        is_open, is_closed = self.data_bank.get_coils(0xE001, 2)
+        if is_closed:
+            return 0.0
+        if is_open:
+            return self.FULL_SCALE_FLOW
+        return min(self.setpoint(), self.FULL_SCALE_FLOW)
+
+    def read_i_regs(self, address, count, srv_info):
+        time.sleep(self.latency)
+
+        flow = self.flow()
+        flow_hours = int((time.monotonic() - self.__started_at) / 3600)
+        registers = long_list_to_word([encode_ieee(flow),
+                                       encode_ieee(self.temperature),
+                                       encode_ieee(100.0 * flow / self.FULL_SCALE_FLOW),
+                                       0,
+                                       flow_hours,
+                                       int(flow * flow_hours * 60)])
+        self.data_bank.set_input_registers(0x4000, registers)
+
+        return super().read_i_regs(address, count, srv_info)
+
+    def read_h_regs(self, address, count, srv_info):
+        time.sleep(self.latency)
+        return super().read_h_regs(address, count, srv_info)
+
+    def write_h_regs(self, address, words_l, srv_info):
+        time.sleep(self.latency)
+        return super().write_h_regs(address, words_l, srv_info)
+
+    def read_coils(self, address, count, srv_info):
+        time.sleep(self.latency)
+        return super().read_coils(address, count, srv_info)
+
+    def write_coils(self, address, bits_l, srv_info):
+        time.sleep(self.latency)
+        return super().write_coils(address, bits_l, srv_info)
@@ -0,0 +1,44 @@
+import argparse
+import time
+
+from driver.PD500X1 import PD500X1
+from simulator.PD500X1Simulator import PD500X1Simulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(baudrate, latency, count):
+    simulator = PD500X1Simulator(baudrate=baudrate, latency=latency).start()
+    device = PD500X1(comport=simulator.port, baudrate=baudrate)
+
+    device.set_rs232_control()
+    device.set_active_target_power_setpoint(250)
+    device.enable_output()
+    for func_name in ["read_fault_bits", "read_status_bits", "read_actual_power_in_Watts",
+                      "read_actual_current_in_amps", "read_actual_voltage_in_volts",
+                      "report_all_output_and_arc_parameters"]:
+        measure(func_name, getattr(device, func_name), count)
+    measure("set_active_target_power_setpoint", lambda: device.set_active_target_power_setpoint(250), count)
+
+    device.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="PD500X1 driver benchmark against a simulated supply")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    driver_benchmark(args.baudrate, args.latency, args.count)
@@ -1,10 +1,12 @@
 from typing import Union
 
-import serial
 import logging
 
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.SerialTransport import SerialTransport
 
-class PD500X1:
+
+class PD500X1(AsyncDriverMixin):
     ERROR_CODES = {
         "Error 10": "Invalid Match(Repeat is active, use S97 to disable)",
         "Error 11": "Data Invalid",
@@ -14,13 +16,19 @@ class PD500X1:
         "Error 15": "Data out of range (Check supply min-max settings)"
     }
 
-    def __init__(self, comport: str, baudrate: int = 9600):
-        self.__serial = serial.Serial(comport, baudrate=baudrate)
+    def __init__(self, comport: str, baudrate: int = 9600, timeout: float = 1.0):
+        self.__transport = SerialTransport(comport, terminator=b"\r\n", timeout=timeout, baudrate=baudrate)
+
+    def close(self):
+        self.__transport.close()
 
     def __write_and_read(self, command: str, expected_response: Union[str, None] = "OK") -> Union[str, bool]:
         logging.debug(f"Writing {command}")
-        self.__serial.write(f"{command}\r".encode())
-        response = self.__serial.read_until(b"\r\n").decode().replace("\r\n", "")
+        try:
+            response = self.__transport.request(f"{command}\r".encode()).decode().replace("\r\n", "")
+        except TimeoutError:
+            logging.warning(f"No response for command {command}")
+            return False
 
         logging.debug(f"Response for {command}: {response}")
 
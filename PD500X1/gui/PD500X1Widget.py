@@ -6,15 +6,22 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QPushButton, QLineE
     QTextEdit
 from serial.tools.list_ports import comports
 
+from driver.PollScheduler import PollScheduler
 from driver.PD500X1 import PD500X1
 from gui.ButtonWIthEdits import ButtonWithEdits
 
 
 class PD500X1Widget(QWidget):
-    def __init__(self):
+    def __init__(self, scheduler: PollScheduler = None):
+        """
+        :param scheduler: runs the device calls of the buttons off the GUI thread, a new one if not given
+        """
         super().__init__()
 
         self.device = None
+        self.comport = None
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
 
         self.setLayout(QVBoxLayout())
 
@@ -61,7 +68,8 @@ class PD500X1Widget(QWidget):
         ]:
             visible_action_name = func_name.replace("_", " ")
 
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {})
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {},
+                                  submit=self.submit)
 
             self.device_group.layout().addWidget(bwe)
 
@@ -83,14 +91,16 @@ class PD500X1Widget(QWidget):
             annotations = argspec.annotations
 
             visible_action_name = func_name.replace("_", " ")
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, args, annotations)
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, args, annotations,
+                                  submit=self.submit)
 
             self.device_group.layout().addWidget(bwe)
 
         for func_name in ["set_commands_help", "query_commands_help", "read_fault_bits", "read_status_bits"]:
             visible_action_name = func_name.replace("_", " ")
 
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {}, output_class=QTextEdit)
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {}, output_class=QTextEdit,
+                                  submit=self.submit)
             bwe.output.setMinimumWidth(500)
             bwe.output.setReadOnly(True)
 
@@ -106,7 +116,8 @@ class PD500X1Widget(QWidget):
         self.layout().addWidget(self.device_group)
 
     def connect_device(self):
-        self.device = PD500X1(comport=self.comport_dropdown.currentText())
+        self.comport = self.comport_dropdown.currentText()
+        self.device = PD500X1(comport=self.comport)
         self.connect_button.setText("Disconnect")
         self.connect_button.clicked.disconnect(self.connect_device)
         self.connect_button.clicked.connect(self.disconnect_device)
@@ -117,6 +128,8 @@ class PD500X1Widget(QWidget):
                 widget.target = self.device
 
     def disconnect_device(self):
+        # Close the port on its lane, after a call that may still be running
+        self.scheduler.submit(self.comport, self.device.close)
         self.device = None
         self.connect_button.setText("Connect")
         self.connect_button.clicked.disconnect(self.disconnect_device)
@@ -126,3 +139,15 @@ class PD500X1Widget(QWidget):
         for widget in self.device_group.children():
             if isinstance(widget, ButtonWithEdits):
                 widget.target = None
+
+    def submit(self, func):
+        """Run func on the lane of the port, the device only handles one exchange at a time"""
+        self.scheduler.submit(self.comport, func)
+
+    def closeEvent(self, event):
+        if self.device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted, the close of the port among them
+            self.scheduler.close()
+        super().closeEvent(event)
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+
+class PD500X1Simulator(PtySerialDevice):
+    """Simulated PD500X1 DC supply answering the S/Q/H command set with the supply's error codes"""
+
+    # Set commands with a value, mapped to the setting they change, its allowed range and the number format
+    VALUE_COMMANDS = {
+        "S04": ("active_target", 1, 7, "{:.0f}"),
+        "S09": ("heartbeat_timeout", 0.0, 65.535, "{:.3f}"),
+        "S10": ("power_setpoint", 0.0, 500.0, "{:.1f}"),
+        "S11": ("current_setpoint", 0.0, 10.0, "{:.3f}"),
+        "S12": ("voltage_setpoint", 0.0, 10000.0, "{:.1f}"),
+        "S13": ("arc_detect_delay", 0.0, 999.9, "{:.1f}"),
+        "S14": ("arc_off_time", 32, 65535, "{:.0f}"),
+        "S15": ("kwh_limit", 0.0, 655.35, "{:.2f}"),
+        "S17": ("ramp_time", 0.0, 65.535, "{:.3f}"),
+        "S18": ("run_time", 0.0, 6553.5, "{:.1f}"),
+    }
+
+    # Query commands reading back a setting, mapped to the setting
+    SETTING_QUERIES = {
+        "Q04": "S04", "Q09": "S09", "Q10": "S10", "Q11": "S11", "Q12": "S12", "Q13": "S13", "Q14": "S14",
+        "Q15": "S15", "Q17": "S17", "Q18": "S18"
+    }
+
+    # Commands that are refused while the output is enabled
+    STANDBY_COMMANDS = ["S04", "S67"]
+
+    def __init__(self, baudrate: int = 9600, latency: float = 0.0):
+        super().__init__(terminator=b"\r", baudrate=baudrate, latency=latency)
+
+        self.settings = {}
+        self.reset_factory_defaults()
+        self.rs232_control = True
+        self.output_enabled = False
+        self.repeat_mode = False
+        self.repeated_command = None
+        self.hard_arc_count = 0
+        self.micro_arc_count = 0
+        self.kwh_count = 0.0
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        return f"{self.execute(command.decode().strip())}\r\n".encode()
+
+    def execute(self, command: str) -> str:
+        # In repeat mode every command has to be sent twice and only runs once the copies match
+        if self.repeat_mode and command not in ["S96", "S97"]:
+            if self.repeated_command is None:
+                self.repeated_command = command
+                return "OK"
+            repeated_command, self.repeated_command = self.repeated_command, None
+            if repeated_command != command:
+                return "Error 10"
+
+        name, _, value = command.partition(" ")
+
+        if name in ["H00", "H01"]:
+            return ",".join(self.VALUE_COMMANDS) if name == "H00" else ",".join(self.SETTING_QUERIES)
+        if name.startswith("Q"):
+            return self.query(name)
+        if name.startswith("S"):
+            return self.set(name, value)
+
+        return "Error 12"
+
+    def query(self, name: str) -> str:
+        if name in self.SETTING_QUERIES:
+            setting, _, _, number_format = self.VALUE_COMMANDS[self.SETTING_QUERIES[name]]
+            return number_format.format(self.settings[setting])
+
+        power, current, voltage = self.output()
+        return {
+            "Q00": "0,0,0,0,0,0",
+            "Q01": f"{int(self.output_enabled)},{int(self.rs232_control)}",
+            "Q02": f"{self.hard_arc_count}",
+            "Q03": f"{self.micro_arc_count}",
+            "Q05": f"{power:.1f}",
+            "Q06": f"{current:.3f}",
+            "Q07": f"{voltage:.1f}",
+            "Q08": "0",
+            "Q16": f"{self.kwh_count:.2f}",
+            "Q19": f"{power:.1f},{current:.3f},{voltage:.1f},0,{self.hard_arc_count},{self.micro_arc_count}",
+        }.get(name, "Error 12")
+
+    def set(self, name: str, value: str) -> str:
+        if name in ["S00", "S01"]:
+            self.rs232_control = name == "S01"
+            return "OK"
+
+        if not self.rs232_control:
+            return "Error 14"
+        if self.output_enabled and name in self.STANDBY_COMMANDS:
+            return "Error 13"
+
+        if name in ["S02", "S03"]:
+            self.output_enabled = name == "S02"
+        elif name == "S16":
+            self.kwh_count = 0.0
+        elif name == "S67":
+            self.reset_factory_defaults()
+        elif name in ["S96", "S97"]:
+            self.repeat_mode = name == "S96"
+        elif name == "S99":
+            pass
+        elif name in self.VALUE_COMMANDS:
+            setting, low, high, _ = self.VALUE_COMMANDS[name]
+            try:
+                number = float(value)
+            except ValueError:
+                return "Error 11"
+            if not low <= number <= high:
+                return "Error 15"
+            self.settings[setting] = number
+        else:
+            return "Error 12"
+
+        return "OK"
+
+    def reset_factory_defaults(self):
+        self.settings = {name: low for name, low, _, _ in self.VALUE_COMMANDS.values()}
+
+    def output(self):
+        # A resistive load of 500 Ohm behind the power setpoint
+        if not self.output_enabled:
+            return 0.0, 0.0, 0.0
+
+        power = self.settings["power_setpoint"]
+        voltage = (power * 500) ** 0.5
+        return power, power / voltage if voltage else 0.0, voltage
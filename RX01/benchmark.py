@@ -0,0 +1,139 @@
+import argparse
+import time
+import timeit
+
+from driver.RX01 import RX01
+from simulator.RX01Simulator import RX01Simulator
+
+LONG_STATUS_REPLY = b"2328510 0500 0498 002 0600\r"
+SHORT_STATUS_REPLY = b"2328510\r"
+
+
+class LegacyStatusDecoder:
+    """
+    The long status decoding of the driver before the lookup tables, copied verbatim from it for comparison. It still
+    decodes character 5 with the character 6 parser.
+    """
+
+    ControlSource = RX01.ControlSource
+    RfOutRegulationFeedbackSource = RX01.RfOutRegulationFeedbackSource
+    CommLinkStatus = RX01.CommLinkStatus
+
+    @staticmethod
+    def __parse_status_flag_char4(char):
+        ascii_decoded = bin(ord(char))
+
+        return {
+            "rf_on": bool(ascii_decoded[-4]),
+            "reflected_limit_active": bool(ascii_decoded[-3]),
+            "max_power_limit_active": bool(ascii_decoded[-2]),
+            "pa_current_limit_active": bool(ascii_decoded[-1])
+        }
+
+    @staticmethod
+    def __parse_status_flag_char5(char):
+        ascii_decoded = bin(ord(char))
+
+        return {
+            "ref_power_alarm_threshold_exceeded": not bool(ascii_decoded[-4]),
+            "dissipation_limit_active": bool(ascii_decoded[-3]),
+            "cex_slave_mode": bool(ascii_decoded[-2]),
+            "pulse_mode_active": bool(ascii_decoded[-1])
+        }
+
+    @staticmethod
+    def __parse_status_flag_char6(char):
+        ascii_decoded = bin(ord(char))
+
+        return {
+            "external_interlock_ok": bool(ascii_decoded[-2]),
+            "temperature_alarm_active": bool(ascii_decoded[-1])
+        }
+
+    def __parse_long_status(self, response: str):
+        other, setpoint, forward_power, reflected_power, max_power = response.split(" ")
+
+        return_data = {
+            "setpoint": int(setpoint),
+            "forward_power": int(forward_power),
+            "reflected_power": int(reflected_power),
+            "max_power": int(max_power),
+            "control_source": self.ControlSource(other[0]),
+            "rf_output_regulation_feedback_source": self.RfOutRegulationFeedbackSource(other[1]),
+            "setpoint_source": self.ControlSource(other[2]),
+            "communication_link_status": self.CommLinkStatus(other[6])
+        }
+
+        char4_data = self.__parse_status_flag_char4(other[3])
+        char5_data = self.__parse_status_flag_char6(other[4])
+        char6_data = self.__parse_status_flag_char6(other[5])
+
+        return_data.update(char4_data)
+        return_data.update(char5_data)
+        return_data.update(char6_data)
+
+        return return_data
+
+    def decode_long_status(self, response: str):
+        return self.__parse_long_status(response)
+
+
+def bench(name, func, number=100000):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    print(f"{name:<40} {1e6 * seconds / number:8.3f} us/call")
+    return seconds
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+    return latencies[count // 2]
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def decode_benchmark():
+    legacy_decoder = LegacyStatusDecoder()
+    legacy = bench("legacy long status decode", lambda: legacy_decoder.decode_long_status(LONG_STATUS_REPLY.decode()))
+    table = bench("table long status decode", lambda: RX01.decode_status(LONG_STATUS_REPLY))
+    bench("table short status decode", lambda: RX01.decode_status(SHORT_STATUS_REPLY))
+    print(f"Long status decode speedup: {legacy / table:.1f}x")
+
+
+def driver_benchmark(baudrate, latency, link_latency, count):
+    simulator = RX01Simulator(baudrate=baudrate, latency=latency, link_latency=link_latency).start()
+    device = RX01(RX01.RX01Model.R301, comport=simulator.port, baudrate=baudrate)
+
+    device.set_power_setpoint_and_enable_rf_output(500)
+    for func_name in ["get_forward_power_output", "get_reflected_power", "get_dc_bias_voltage",
+                      "get_control_voltage", "get_short_status", "get_long_status", "get_telemetry"]:
+        measure(func_name, getattr(device, func_name), count)
+    measure("set_power_setpoint", lambda: device.set_power_setpoint(500), count)
+
+    # The batch of get_telemetry against the same five queries one round trip each
+    unbatched = measure("telemetry one query at a time", lambda: [
+        device.get_forward_power_output(), device.get_reflected_power(), device.get_dc_bias_voltage(),
+        device.get_control_voltage(), device.get_long_status()], count)
+    batched = measure("telemetry in one batch", device.get_telemetry, count)
+    print(f"Telemetry batch speedup: {unbatched / batched:.1f}x")
+
+    device.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="RX01 decode and driver benchmarks against a simulated generator")
+    parser.add_argument("--baudrate", type=int, default=19200)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--link-latency", type=float, default=0.0,
+                        help="simulated round trip delay of the link in seconds, e.g. 0.016 for a USB serial adapter")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    decode_benchmark()
+    driver_benchmark(args.baudrate, args.latency, args.link_latency, args.count)
@@ -1,11 +1,44 @@
 from enum import Enum, auto
-from typing import Union
+from typing import Union, List
 
-import serial
 import logging
 
-
-class RX01:
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.SerialTransport import SerialTransport
+
+
+class RX01Status:
+    __slots__ = ("control_source", "rf_output_regulation_feedback_source", "setpoint_source",
+                 "rf_on", "reflected_limit_active", "max_power_limit_active", "pa_current_limit_active",
+                 "ref_power_alarm_threshold_exceeded", "dissipation_limit_active", "cex_slave_mode",
+                 "pulse_mode_active", "external_interlock_ok", "temperature_alarm_active",
+                 "communication_link_status", "setpoint", "forward_power", "reflected_power", "max_power")
+
+    def __init__(self, control_source, rf_output_regulation_feedback_source, setpoint_source, char4_flags,
+                 char5_flags, char6_flags, communication_link_status, setpoint=None, forward_power=None,
+                 reflected_power=None, max_power=None):
+        self.control_source = control_source
+        self.rf_output_regulation_feedback_source = rf_output_regulation_feedback_source
+        self.setpoint_source = setpoint_source
+        self.rf_on, self.reflected_limit_active, self.max_power_limit_active, self.pa_current_limit_active = \
+            char4_flags
+        self.ref_power_alarm_threshold_exceeded, self.dissipation_limit_active, self.cex_slave_mode, \
+            self.pulse_mode_active = char5_flags
+        self.external_interlock_ok, self.temperature_alarm_active = char6_flags
+        self.communication_link_status = communication_link_status
+        self.setpoint = setpoint
+        self.forward_power = forward_power
+        self.reflected_power = reflected_power
+        self.max_power = max_power
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return ",\n".join(f"{name}: {getattr(self, name)}" for name in self.__slots__)
+
+
+class RX01(AsyncDriverMixin):
     class RX01Model(Enum):
         R301 = auto()
         R601 = auto()
@@ -23,20 +56,47 @@ class RX01:
         OK = "0"
         FAULT = "1"
 
-    def __init__(self, model: RX01Model, comport="COM1", baudrate=19200):
+    # Status characters 4-6 decoded for every possible byte value, flags are listed from bit 3 down to bit 0
+    __CHAR4_FLAGS = tuple((bool(c & 0b1000), bool(c & 0b100), bool(c & 0b10), bool(c & 0b1)) for c in range(256))
+    __CHAR5_FLAGS = tuple((not c & 0b1000, bool(c & 0b100), bool(c & 0b10), bool(c & 0b1)) for c in range(256))
+    __CHAR6_FLAGS = tuple((bool(c & 0b10), bool(c & 0b1)) for c in range(256))
+
+    __CONTROL_SOURCES = {ord(source.value): source for source in ControlSource}
+    __FEEDBACK_SOURCES = {ord(source.value): source for source in RfOutRegulationFeedbackSource}
+    __COMM_LINK_STATUSES = {ord(status.value): status for status in CommLinkStatus}
+
+    # Commands that only read back a value and are answered with a single <cr> terminated line
+    QUERY_COMMANDS = ["W?", "R?", "0?", "V?", "LVL?", "Q", "R", "M?", "LPS", "TPS", "PHS", "MAG"]
+
+    def __init__(self, model: RX01Model, comport="COM1", baudrate=19200, timeout=1.0):
         self.model = model
-        self.__serial = serial.Serial(port=comport, baudrate=baudrate)
+        self.__transport = SerialTransport(comport, terminator=b"\r", timeout=timeout, baudrate=baudrate)
 
-    def __write_and_read(self, command: str, expected_response: Union[str, None] = "\r") -> Union[str, bool]:
+    def close(self):
+        self.__transport.close()
+
+    def __query_raw(self, command: str, terminator: bytes = b"\r") -> Union[bytes, None]:
         logging.debug(f"Writing {command}\r")
-        self.__serial.write(f"{command}\r".encode())
-        response = self.__serial.read_until(b"\r").decode()
+        try:
+            response = self.__transport.request(f"{command}\r".encode(), terminator)
+        except TimeoutError:
+            logging.warning(f"No response for command {command}")
+            return None
 
         logging.debug(f"Response for {command}\r: {response}")
 
-        if response == "N\r":
+        return response
+
+    def __write_and_read(self, command: str, expected_response: Union[str, None] = "\r") -> Union[str, bool]:
+        # Commands acknowledged with <cr><cr> have to be framed on both, or the second <cr> is left over for the
+        # next command
+        response = self.__query_raw(command, b"\r\r" if expected_response == "\r\r" else b"\r")
+
+        if response is None or response == b"N\r":
             return False
 
+        response = response.decode()
+
         if not expected_response:
             return response
 
@@ -46,6 +106,46 @@ class RX01:
 
         return True
 
+    def query_many(self, commands: List[str]) -> List[Union[str, bool]]:
+        """
+        Send a batch of query commands in a single write and match the <cr> terminated responses back to them.
+        The device answers in the order the commands were sent, so the whole batch costs one round trip instead of
+        one per command.
+
+        :param commands: query commands from QUERY_COMMANDS, e.g. ["W?", "R?", "0?", "V?", "Q"]
+        :return: raw responses in the same order as commands, False for every command the device rejected with N
+        """
+        for command in commands:
+            assert command in self.QUERY_COMMANDS, f"{command} is not a query command"
+
+        logging.debug(f"Writing batch {commands}")
+        futures = self.__transport.submit_many([f"{command}\r".encode() for command in commands])
+
+        responses = []
+        for command, future in zip(commands, futures):
+            try:
+                response = self.__transport.wait(future).decode()
+            except TimeoutError:
+                logging.warning(f"No response for command {command}")
+                response = "N\r"
+            logging.debug(f"Response for {command}\r: {response}")
+            responses.append(False if response == "N\r" else response)
+
+        return responses
+
+    def get_telemetry(self):
+        # Forward power, reflected power, DC bias, control voltage and long status in a single batch
+        forward_power, reflected_power, dc_bias_voltage, control_voltage, long_status = \
+            self.query_many(["W?", "R?", "0?", "V?", "Q"])
+
+        return {
+            "forward_power_output": forward_power,
+            "reflected_power": reflected_power,
+            "dc_bias_voltage": dc_bias_voltage,
+            "control_voltage": control_voltage,
+            "long_status": self.decode_status(long_status.encode()) if long_status else long_status
+        }
+
     def assert_serial_control(self) -> bool:
         return self.__write_and_read("SERIAL")
 
@@ -230,38 +330,7 @@ class RX01:
 
         return response
 
-    @staticmethod
-    def __parse_status_flag_char4(char):
-        ascii_decoded = bin(ord(char))
-
-        return {
-            "rf_on": bool(ascii_decoded[-4]),
-            "reflected_limit_active": bool(ascii_decoded[-3]),
-            "max_power_limit_active": bool(ascii_decoded[-2]),
-            "pa_current_limit_active": bool(ascii_decoded[-1])
-        }
-
-    @staticmethod
-    def __parse_status_flag_char5(char):
-        ascii_decoded = bin(ord(char))
-
-        return {
-            "ref_power_alarm_threshold_exceeded": not bool(ascii_decoded[-4]),
-            "dissipation_limit_active": bool(ascii_decoded[-3]),
-            "cex_slave_mode": bool(ascii_decoded[-2]),
-            "pulse_mode_active": bool(ascii_decoded[-1])
-        }
-
-    @staticmethod
-    def __parse_status_flag_char6(char):
-        ascii_decoded = bin(ord(char))
-
-        return {
-            "external_interlock_ok": bool(ascii_decoded[-2]),
-            "temperature_alarm_active": bool(ascii_decoded[-1])
-        }
-
-    def get_long_status(self):
+    def get_long_status(self) -> Union[RX01Status, bool]:
         # Returns status in the form of a mapped string, terminated with <cr>. See Serial Command
         # details for string mapping information.
         # XXXXXXX_aaaa_bbbb_ccc_dddd <cr>
@@ -271,49 +340,44 @@ class RX01:
         # dddd is the maximum power, in Watts
         # XXXXXXX is a 7 - character ASCII mapped string as described
         # below (characters are counted left - to - right)
-        response = self.__write_and_read("Q", None)
-        other, setpoint, forward_power, reflected_power, max_power = response.split(" ")
-
-        return_data = {
-            "setpoint": int(setpoint),
-            "forward_power": int(forward_power),
-            "reflected_power": int(reflected_power),
-            "max_power": int(max_power),
-            "control_source": self.ControlSource(other[0]),
-            "rf_output_regulation_feedback_source": self.RfOutRegulationFeedbackSource(other[1]),
-            "setpoint_source": self.ControlSource(other[2]),
-            "communication_link_status": self.CommLinkStatus(other[6])
-        }
-
-        char4_data = self.__parse_status_flag_char4(other[3])
-        char5_data = self.__parse_status_flag_char6(other[4])
-        char6_data = self.__parse_status_flag_char6(other[5])
-
-        return_data.update(char4_data)
-        return_data.update(char5_data)
-        return_data.update(char6_data)
+        response = self.__query_raw("Q")
 
-        return return_data
-
-    def get_short_status(self):
-        response = self.__write_and_read("R", None)
+        if response is None or response == b"N\r":
+            return False
 
-        return_data = {
-            "control_source": self.ControlSource(response[0]),
-            "rf_output_regulation_feedback_source": self.RfOutRegulationFeedbackSource(response[1]),
-            "setpoint_source": self.ControlSource(response[2]),
-            "communication_link_status": self.CommLinkStatus(response[6])
-        }
+        return self.decode_status(response)
 
-        char4_data = self.__parse_status_flag_char4(response[3])
-        char5_data = self.__parse_status_flag_char6(response[4])
-        char6_data = self.__parse_status_flag_char6(response[5])
+    def get_short_status(self) -> Union[RX01Status, bool]:
+        response = self.__query_raw("R")
 
-        return_data.update(char4_data)
-        return_data.update(char5_data)
-        return_data.update(char6_data)
+        if response is None or response == b"N\r":
+            return False
 
-        return return_data
+        return self.decode_status(response)
+
+    @classmethod
+    def decode_status(cls, response: bytes) -> RX01Status:
+        """
+        Decode a raw short (R) or long (Q) status reply straight from the received bytes
+
+        :param response: reply as read from the serial port, including the terminating <cr>
+        :return: decoded status, the power fields are None for a short status reply
+        """
+        if len(response) > 8:
+            _, setpoint, forward_power, reflected_power, max_power = response.split()
+            setpoint, forward_power, reflected_power, max_power = \
+                int(setpoint), int(forward_power), int(reflected_power), int(max_power)
+        else:
+            setpoint = forward_power = reflected_power = max_power = None
+
+        return RX01Status(cls.__CONTROL_SOURCES[response[0]],
+                          cls.__FEEDBACK_SOURCES[response[1]],
+                          cls.__CONTROL_SOURCES[response[2]],
+                          cls.__CHAR4_FLAGS[response[3]],
+                          cls.__CHAR5_FLAGS[response[4]],
+                          cls.__CHAR6_FLAGS[response[5]],
+                          cls.__COMM_LINK_STATUSES[response[6]],
+                          setpoint, forward_power, reflected_power, max_power)
 
     def get_maximum_power(self):
         return self.__write_and_read("M?", None)
@@ -1,9 +1,19 @@
-from PyQt5.QtCore import QTimer
+from typing import Callable, Optional
+
+from PyQt5.QtCore import QTimer, pyqtSignal
 from PyQt5.QtWidgets import QWidget, QPushButton, QLineEdit, QHBoxLayout, QLabel
 
 
 class ButtonWithEdits(QWidget):
-    def __init__(self, button_text, target, func_name, args, annotations, output_class=QLabel):
+    # Emitted from the thread the call ran on, delivered on the GUI thread
+    response_ready = pyqtSignal(object)
+
+    def __init__(self, button_text, target, func_name, args, annotations, output_class=QLabel,
+                 submit: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        :param submit: runs the call off the GUI thread, e.g. on the polling lane of the device. Called right away
+        if not given
+        """
         super().__init__()
 
         self.setLayout(QHBoxLayout())
@@ -15,6 +25,7 @@ class ButtonWithEdits(QWidget):
         self.func_name = func_name
         self.target = target
         self.annotations = annotations
+        self.submit = submit
         self.edits = []
 
         for arg in args:
@@ -30,12 +41,19 @@ class ButtonWithEdits(QWidget):
         self.clear_timer = QTimer()
 
         self.button.clicked.connect(self.funci)
+        self.response_ready.connect(self.show_response)
 
         self.layout().addStretch(0)
 
     def funci(self):
         func = getattr(self.target, self.func_name)
-        response = func(**self.get_args_from_edits())
+        kwargs = self.get_args_from_edits()
+        if self.submit:
+            self.submit(lambda: self.response_ready.emit(func(**kwargs)))
+        else:
+            self.show_response(func(**kwargs))
+
+    def show_response(self, response):
         self.output.setText(f"Response: {response}")
 
         # Timer to clear text after 5 seconds
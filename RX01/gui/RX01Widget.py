@@ -6,15 +6,22 @@ from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QPushButton, QLineE
     QTextEdit
 from serial.tools.list_ports import comports
 
+from driver.PollScheduler import PollScheduler
 from driver.RX01 import RX01
 from gui.ButtonWithEdits import ButtonWithEdits
 
 
 class RX01Widget(QWidget):
-    def __init__(self):
+    def __init__(self, scheduler: PollScheduler = None):
+        """
+        :param scheduler: runs the device calls of the buttons off the GUI thread, a new one if not given
+        """
         super().__init__()
 
         self.device = None
+        self.comport = None
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
 
         self.setLayout(QVBoxLayout())
 
@@ -63,7 +70,8 @@ class RX01Widget(QWidget):
 
             visible_action_name = func_name.replace("_", " ")
 
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {})
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {},
+                                  submit=self.submit)
 
             self.device_group.layout().addWidget(bwe)
 
@@ -93,14 +101,16 @@ class RX01Widget(QWidget):
             annotations = argspec.annotations
 
             visible_action_name = func_name.replace("_", " ")
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, args, annotations)
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, args, annotations,
+                                  submit=self.submit)
 
             self.device_group.layout().addWidget(bwe)
 
-        for func_name in ["get_short_status", "get_long_status"]:
+        for func_name in ["get_short_status", "get_long_status", "get_telemetry"]:
             visible_action_name = func_name.replace("_", " ")
 
-            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {}, output_class=QTextEdit)
+            bwe = ButtonWithEdits(visible_action_name, self.device, func_name, [], {}, output_class=QTextEdit,
+                                  submit=self.submit)
             bwe.output.setMinimumWidth(500)
             bwe.output.setReadOnly(True)
 
@@ -116,7 +126,8 @@ class RX01Widget(QWidget):
         self.layout().addWidget(self.device_group)
 
     def connect_device(self):
-        self.device = RX01(RX01.RX01Model.R301, comport=self.comport_dropdown.currentText())
+        self.comport = self.comport_dropdown.currentText()
+        self.device = RX01(RX01.RX01Model.R301, comport=self.comport)
         self.connect_button.setText("Disconnect")
         self.connect_button.clicked.disconnect(self.connect_device)
         self.connect_button.clicked.connect(self.disconnect_device)
@@ -127,6 +138,8 @@ class RX01Widget(QWidget):
                 widget.target = self.device
 
     def disconnect_device(self):
+        # Close the port on its lane, after a call that may still be running
+        self.scheduler.submit(self.comport, self.device.close)
         self.device = None
         self.connect_button.setText("Connect")
         self.connect_button.clicked.disconnect(self.disconnect_device)
@@ -136,3 +149,15 @@ class RX01Widget(QWidget):
         for widget in self.device_group.children():
             if isinstance(widget, ButtonWithEdits):
                 widget.target = None
+
+    def submit(self, func):
+        """Run func on the lane of the port, the device only handles one exchange at a time"""
+        self.scheduler.submit(self.comport, func)
+
+    def closeEvent(self, event):
+        if self.device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted, the close of the port among them
+            self.scheduler.close()
+        super().closeEvent(event)
@@ -19,4 +19,7 @@ if __name__ == '__main__':
 
     scroll_area.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # The scroll area doesn't pass its close on, the widget still has to release the port
+    window.close()
+    sys.exit(exit_code)
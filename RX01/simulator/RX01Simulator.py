@@ -0,0 +1,132 @@
+from typing import Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+
+class RX01Simulator(PtySerialDevice):
+    """Simulated R301/R601 generator answering the RX01 serial command set"""
+
+    # Commands acknowledged with a bare <cr>, mapped to the state they change
+    FLAG_COMMANDS = {
+        "SERIAL": ("control_source", "2"),
+        "ANALOG": ("control_source", "1"),
+        "PANEL": ("control_source", "0"),
+        "ECHO": ("echo", True),
+        "NOECHO": ("echo", False),
+        "MST": ("slave_mode", False),
+        "SLV": ("slave_mode", True),
+        "DL": ("load_leveling", False),
+        "EL": ("load_leveling", True),
+        "IR": ("voltage_control", False),
+        "DR": ("voltage_control", True),
+        "+P": ("pulse_mode", True),
+        "-P": ("pulse_mode", False),
+        "VX": ("vft", True),
+        "FX": ("vft", False),
+        "G": ("rf_on", True),
+        "S": ("rf_on", False),
+        "WS": ("rf_on", False),
+        "EU": ("ramping", True),
+        "DU": ("ramping", False),
+    }
+
+    # Commands taking a numeric argument, mapped to the state they set and the allowed range
+    VALUE_COMMANDS = {
+        "FQ": ("frequency", 170, 210),
+        "W": ("setpoint", 0, 9999),
+        "WG": ("setpoint", 0, 9999),
+        "V": ("voltage_setpoint", 0, 9999),
+        "D": ("duty_cycle", 0, 100),
+        "PR": ("pulse_frequency", 1, 1000),
+        "HT": ("pulse_high_time", 1, 9999),
+        "LP": ("pulse_low_power", 1, 9999),
+        "CR": ("vft_coarse_trip_ratio", 0, 100),
+        "CF": ("vft_coarse_step", 1, 10000),
+        "FF": ("vft_fine_step", 1, 10000),
+        "FT": ("vft_fine_trip_level", 0, 100),
+        "MAXVF": ("vft_max_frequency", 170, 210),
+        "MINVF": ("vft_min_frequency", 170, 210),
+        "SF": ("vft_strike_frequency", 170, 210),
+        "DN": ("rampdown_time", 1, 9999),
+        "UP": ("rampup_time", 1, 9999),
+        "_MPL": ("load_cap_position", 0, 100),
+        "_MPT": ("tune_cap_position", 0, 100),
+    }
+
+    def __init__(self, baudrate: int = 19200, latency: float = 0.0, max_power: int = 600, link_latency: float = 0.0):
+        super().__init__(terminator=b"\r", baudrate=baudrate, latency=latency, link_latency=link_latency)
+
+        self.state = {
+            "control_source": "2",
+            "echo": False,
+            "slave_mode": False,
+            "load_leveling": False,
+            "voltage_control": False,
+            "pulse_mode": False,
+            "vft": False,
+            "rf_on": False,
+            "ramping": False,
+            "setpoint": 0,
+            "voltage_setpoint": 0,
+            "load_cap_position": 50,
+            "tune_cap_position": 50,
+        }
+        self.max_power = max_power
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        command = command.decode().strip()
+
+        if command in self.FLAG_COMMANDS:
+            key, value = self.FLAG_COMMANDS[command]
+            self.state[key] = value
+            return b"\r"
+
+        query_response = self.query(command)
+        if query_response is not None:
+            return f"{query_response}\r".encode()
+
+        return self.set_value(command)
+
+    def query(self, command: str) -> Optional[str]:
+        forward_power = self.state["setpoint"] if self.state["rf_on"] else 0
+        reflected_power = forward_power // 100
+
+        return {
+            "W?": f"{forward_power}",
+            "R?": f"{reflected_power}",
+            "0?": f"{forward_power // 5}",
+            "V?": f"{self.state['voltage_setpoint']}",
+            "LVL?": "1" if self.state["load_leveling"] else "0",
+            "M?": f"{self.max_power}",
+            "Q": f"{self.status_characters()} {self.state['setpoint']:04} {forward_power:04} "
+                 f"{reflected_power:03} {self.max_power:04}",
+            "R": self.status_characters(),
+            "LPS": f"{self.state['load_cap_position']}",
+            "TPS": f"{self.state['tune_cap_position']}",
+            "PHS": "0",
+            "MAG": "0",
+        }.get(command)
+
+    def set_value(self, command: str) -> bytes:
+        value, _, name = command.replace("_", " _").partition(" ")
+        name = name.strip()
+
+        if name not in self.VALUE_COMMANDS or not value.isdigit():
+            return b"N\r"
+
+        key, low, high = self.VALUE_COMMANDS[name]
+        if not low <= int(value) <= high:
+            return b"N\r"
+
+        self.state[key] = int(value)
+        if name == "WG":
+            self.state["rf_on"] = True
+
+        return b"\r\r" if name in ["WG", "FT"] else b"\r"
+
+    def status_characters(self) -> str:
+        char4 = 0b1000 * self.state["rf_on"]
+        char5 = 0b1000 | 0b10 * self.state["slave_mode"] | 0b1 * self.state["pulse_mode"]
+        char6 = 0b10
+        return f"{self.state['control_source']}3{self.state['control_source']}" \
+               f"{chr(0x30 | char4)}{chr(0x30 | char5)}{chr(0x30 | char6)}0"
@@ -0,0 +1,42 @@
+import argparse
+import ipaddress
+import time
+
+from driver.SR201 import SR201, RelayState
+from simulator.SR201Simulator import SR201Simulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(port, latency, count):
+    simulator = SR201Simulator(port=port, latency=latency).start()
+    device = SR201(ipaddress.IPv4Address("127.0.0.1"), port=port)
+
+    measure("get_relay_states", device.get_relay_states, count)
+    measure("set_relay_state", lambda: device.set_relay_state(0, RelayState.CLOSED), count)
+    # A whole pattern: one relay at a time against a single write_multiple_coils
+    measure("set_relay_state x16", lambda: [device.set_relay_state(relay_n, RelayState.CLOSED)
+                                            for relay_n in range(SR201.RELAY_COUNT)], count)
+    measure("set_relay_states", lambda: device.set_relay_states(SR201.ALL_RELAYS), count)
+
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="SR201 driver benchmark against a simulated relay board")
+    parser.add_argument("--port", type=int, default=6724, help="local TCP port of the simulator")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    driver_benchmark(args.port, args.latency, args.count)
@@ -1,10 +1,13 @@
 import enum
 from enum import Enum
 import ipaddress
-from typing import Iterable
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from PyQt5.QtCore import QObject, pyqtSignal
-from pyModbusTCP.client import ModbusClient
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.CircuitBreaker import CircuitBreakerModbusClient
+from driver.TelemetryReplay import TelemetryReplay
 
 
 class RelayState(Enum):
@@ -14,29 +17,71 @@ class RelayState(Enum):
     UNKNOWN = enum.auto()
 
 
-class SR201(QObject):
+class SR201(AsyncDriverMixin, QObject):
 
+    # Emitted for every relay whose state changed, not for the relays that kept theirs
     stateChanged = pyqtSignal(int, RelayState)
+    # Batched form of stateChanged, once per read or write that changed anything: the bits of the relays that
+    # changed, the relay_mask and the known_mask after the change. Bit n is relay n.
+    statesChanged = pyqtSignal(int, int, int)
 
-    def __init__(self, ipv4_address: ipaddress.IPv4Address, mode: str = "tcp"):
+    RELAY_COUNT = 16
+    ALL_RELAYS = (1 << RELAY_COUNT) - 1
+
+    # Telemetry channel of a relay, the value is the RelayState value
+    RELAY_CHANNEL = "SR201/{address}/relay{relay_n}"
+
+    def __init__(self, ipv4_address: ipaddress.IPv4Address, mode: str = "tcp", port: int = 6724,
+                 timeout: float = 2.0):
         super().__init__()
         if mode.lower() != "tcp":
             raise ValueError("Non-TCP modes are not currently supported")
 
-        self.__modbus_client = ModbusClient(host=ipv4_address.exploded, port=6724)
+        self.ipv4_address = ipv4_address
+        self.__modbus_client = CircuitBreakerModbusClient(host=ipv4_address.exploded, port=port, timeout=timeout)
 
         self.__modbus_client.debug = True
 
+        # Last known state of all relays, a set bit is a CLOSED relay, only the bits set in known_mask are valid
+        self.relay_mask = 0
+        self.known_mask = 0
+        self.__relay_mask_lock = threading.Lock()
+
+        # Bit mask of the relays of every named group, see define_group()
+        self.relay_groups: Dict[str, int] = dict()
+
+    def is_available(self) -> bool:
+        """
+        :return: False while the board is considered down and requests fail without contacting it
+        """
+        return self.__modbus_client.circuit_breaker.allow()
+
+    def relay_channel(self, relay_n: int) -> str:
+        return self.RELAY_CHANNEL.format(address=self.ipv4_address, relay_n=relay_n)
+
+    def connect_replay(self, replay: TelemetryReplay):
+        """Take the relay states of a recording as if they were read from the board, they are emitted the same way"""
+        channels = {self.relay_channel(relay_n): relay_n for relay_n in range(self.RELAY_COUNT)}
+
+        def on_sample(channel: str, timestamp: float, value: float):
+            if channel in channels:
+                relay_n, state = channels[channel], RelayState(int(value))
+                self.__update_relay_mask(1 << relay_n, None if state == RelayState.UNKNOWN else state.value << relay_n)
+
+        replay.sample_ready.connect(on_sample)
+
+    def close(self):
+        self.__modbus_client.circuit_breaker.cancel()
+        self.__modbus_client.close()
+
     def get_relay_states(self, relay_n: int = -1) -> Iterable[RelayState]:
-        response = self.__modbus_client.read_coils(0, 16)
+        response = self.__modbus_client.read_coils(0, self.RELAY_COUNT)
 
         if not response:
-            for i in range(0, 16):
-                self.stateChanged.emit(i, RelayState.UNKNOWN)
+            self.__update_relay_mask(self.ALL_RELAYS, None)
             return [RelayState.UNKNOWN]*16 if relay_n == -1 else [RelayState.UNKNOWN]
 
-        for idx, state in enumerate(response):
-            self.stateChanged.emit(idx, RelayState(state))
+        self.__update_relay_mask(self.ALL_RELAYS, sum(bool(state) << idx for idx, state in enumerate(response)))
         return [RelayState(state) for state in response] if relay_n == -1 else [RelayState(response[relay_n])]
 
     def set_relay_state(self, relay_n: int, state: RelayState, duration: int = -1) -> bool:
@@ -44,16 +89,111 @@ class SR201(QObject):
 
         if duration == -1:
             # Write a coil to set state without timeout
-            if self.__modbus_client.write_single_coil(relay_n, state.value):
-                self.stateChanged.emit(relay_n, state)
-                return True
-            else:
-                self.stateChanged.emit(relay_n, RelayState.UNKNOWN)
-                return False
+            success = self.__modbus_client.write_single_coil(relay_n, state.value)
+        else:
+            success = self.__modbus_client.write_single_register(relay_n, duration)
+
+        self.__update_relay_mask(1 << relay_n, state.value << relay_n if success else None)
+        return bool(success)
+
+    def set_relay_states(self, states: Union[int, Dict[int, RelayState]]) -> bool:
+        """
+        Switch several relays with write_multiple_coils, one per run of consecutive relay numbers, so the relays of a
+        run change together. Relays that aren't switched are never written, as another client may have switched them
+        since they were last read.
 
-        if self.__modbus_client.write_single_register(relay_n, duration):
-            self.stateChanged.emit(relay_n, state)
-            return True
+        :param states: the state of all 16 relays as a bit mask, a set bit for CLOSED, or the new state of some
+        relays by number
+        :return: True if the board accepted every write
+        """
+        if isinstance(states, int):
+            relays, values = self.ALL_RELAYS, states & self.ALL_RELAYS
         else:
-            self.stateChanged.emit(relay_n, RelayState.UNKNOWN)
-            return False
+            assert all(0 <= relay_n <= 15 and state != RelayState.UNKNOWN for relay_n, state in states.items())
+            relays = sum(1 << relay_n for relay_n in states)
+            values = sum(state.value << relay_n for relay_n, state in states.items())
+
+        success = True
+        for first, count in self.__runs(relays):
+            run_success = self.__modbus_client.write_multiple_coils(first, [bool(values >> relay_n & 1)
+                                                                            for relay_n in range(first, first + count)])
+            self.__update_relay_mask(((1 << count) - 1) << first, values if run_success else None)
+            success = success and bool(run_success)
+        return success
+
+    def pulse_relays(self, relays: Iterable[int], duration: int) -> bool:
+        """
+        Close relays for duration seconds through their holding registers. Each run of consecutive relay numbers is
+        a single write_multiple_registers, a register outside the relays would start a pulse of its own relay.
+        """
+        relay_numbers = set(relays)
+        assert all(0 <= relay_n <= 15 for relay_n in relay_numbers)
+
+        success = True
+        for first, count in self.__runs(sum(1 << relay_n for relay_n in relay_numbers)):
+            run_success = self.__modbus_client.write_multiple_registers(first, [duration] * count)
+            run_mask = ((1 << count) - 1) << first
+            self.__update_relay_mask(run_mask, run_mask if run_success else None)
+            success = success and bool(run_success)
+        return success
+
+    def define_group(self, name: str, relays: Iterable[int]):
+        """Name a set of relays that are switched together, e.g. the valves of one gas line"""
+        relays = list(relays)
+        assert all(0 <= relay_n <= 15 for relay_n in relays)
+        self.relay_groups[name] = sum(1 << relay_n for relay_n in relays)
+
+    def set_group_state(self, name: str, state: RelayState) -> bool:
+        """Switch all relays of a group, see set_relay_states() for which of them change together"""
+        group = self.relay_groups[name]
+        return self.set_relay_states({relay_n: state for relay_n in range(self.RELAY_COUNT) if group >> relay_n & 1})
+
+    def pulse_group(self, name: str, duration: int) -> bool:
+        group = self.relay_groups[name]
+        return self.pulse_relays([relay_n for relay_n in range(self.RELAY_COUNT) if group >> relay_n & 1], duration)
+
+    @staticmethod
+    def __runs(relays: int) -> List[Tuple[int, int]]:
+        """
+        :param relays: bits of the relays
+        :return: the first relay number and the length of every run of consecutive relays, lowest first
+        """
+        runs = []
+        relay_n = 0
+        while relays >> relay_n:
+            if relays >> relay_n & 1:
+                count = 1
+                while relays >> (relay_n + count) & 1:
+                    count += 1
+                runs.append((relay_n, count))
+                relay_n += count
+            else:
+                relay_n += 1
+        return runs
+
+    def __update_relay_mask(self, relays: int, states: Optional[int]):
+        """
+        Merge the state of some relays into relay_mask and emit the relays that changed
+
+        :param relays: bits of the relays that were read or written
+        :param states: their new state, bits of other relays are ignored, None if the read or write failed
+        """
+        with self.__relay_mask_lock:
+            old_relay_mask, old_known_mask = self.relay_mask, self.known_mask
+            if states is None:
+                self.known_mask &= ~relays
+            else:
+                self.known_mask |= relays
+                self.relay_mask = (self.relay_mask & ~relays) | (states & relays)
+            relay_mask, known_mask = self.relay_mask, self.known_mask
+
+        # Relays that became known or unknown, and known relays that switched
+        changed = (old_known_mask ^ known_mask) | ((old_relay_mask ^ relay_mask) & known_mask)
+        if not changed:
+            return
+
+        for relay_n in range(self.RELAY_COUNT):
+            if changed >> relay_n & 1:
+                self.stateChanged.emit(relay_n, RelayState(relay_mask >> relay_n & 1) if known_mask >> relay_n & 1
+                                       else RelayState.UNKNOWN)
+        self.statesChanged.emit(changed, relay_mask, known_mask)
@@ -0,0 +1,114 @@
+import bisect
+import heapq
+import time
+from typing import Iterator, List, Optional, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from driver.Telemetry import TelemetryReader
+
+
+class TelemetryReplay(QObject):
+    """
+    Plays a telemetry file back in recorded time, scaled by speed. Chunks are decompressed from the memory-mapped
+    file only once playback reaches them, so recordings of any length can be replayed. Samples are emitted through
+    sample_ready, connect it to the signals the live widgets listen to.
+    """
+
+    # Channel, recorded timestamp and value of every sample, in time order
+    sample_ready = pyqtSignal(str, float, float)
+    # Recorded timestamp playback has reached
+    position_changed = pyqtSignal(float)
+    finished = pyqtSignal()
+
+    # Interval of the playback timer in milliseconds
+    TICK_INTERVAL = 20
+    # Most samples emitted per tick, above that playback falls behind the requested speed instead of blocking the GUI
+    MAX_SAMPLES_PER_TICK = 1000
+
+    def __init__(self, reader: TelemetryReader, channels: Optional[List[str]] = None, speed: float = 1.0):
+        """
+        :param reader: the recording to play
+        :param channels: channels to play, all of them if None
+        :param speed: playback speed, 1 plays in real time
+        """
+        super().__init__()
+
+        self.reader = reader
+        self.channels = channels if channels is not None else reader.channels()
+        self.speed = speed
+
+        time_ranges = [reader.time_range(channel) for channel in self.channels if reader.chunks[channel]]
+        self.start_time = min((start for start, _ in time_ranges), default=0.0)
+        self.end_time = max((end for _, end in time_ranges), default=0.0)
+
+        self.position = self.start_time
+        self.__samples: Iterator[Tuple[float, str, float]] = iter(())
+        self.__next_sample: Optional[Tuple[float, str, float]] = None
+        self.__started_at = 0.0
+        self.__started_position = 0.0
+
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.__tick)
+        self.seek(self.start_time)
+
+    def is_playing(self) -> bool:
+        return self.timer.isActive()
+
+    def play(self):
+        self.__started_at = time.monotonic()
+        self.__started_position = self.position
+        self.timer.start(self.TICK_INTERVAL)
+
+    def pause(self):
+        self.timer.stop()
+
+    def set_speed(self, speed: float):
+        self.position = self.__current_position()
+        self.__started_at = time.monotonic()
+        self.__started_position = self.position
+        self.speed = speed
+
+    def seek(self, timestamp: float):
+        """Continue playback from the first sample at or after timestamp"""
+        self.position = min(max(timestamp, self.start_time), self.end_time)
+        self.__started_at = time.monotonic()
+        self.__started_position = self.position
+
+        self.__samples = heapq.merge(*[self.__channel_samples(channel, self.position) for channel in self.channels])
+        self.__next_sample = next(self.__samples, None)
+        self.position_changed.emit(self.position)
+
+    def __current_position(self) -> float:
+        if not self.is_playing():
+            return self.position
+        return self.__started_position + (time.monotonic() - self.__started_at) * self.speed
+
+    def __tick(self):
+        self.position = min(self.__current_position(), self.end_time)
+
+        emitted = 0
+        while self.__next_sample is not None and self.__next_sample[0] <= self.position:
+            if emitted == self.MAX_SAMPLES_PER_TICK:
+                # Continue from the first sample left over at the next tick, the clock is set back to it
+                self.position = self.__next_sample[0]
+                self.__started_at = time.monotonic()
+                self.__started_position = self.position
+                break
+
+            timestamp, channel, value = self.__next_sample
+            self.sample_ready.emit(channel, timestamp, value)
+            self.__next_sample = next(self.__samples, None)
+            emitted += 1
+
+        self.position_changed.emit(self.position)
+
+        if self.__next_sample is None:
+            self.timer.stop()
+            self.finished.emit()
+
+    def __channel_samples(self, channel: str, start: float) -> Iterator[Tuple[float, str, float]]:
+        for chunk in self.reader.find_chunks(channel, start):
+            timestamps, values = self.reader.read_chunk(chunk)
+            for index in range(bisect.bisect_left(timestamps, start), len(timestamps)):
+                yield timestamps[index], channel, values[index]
@@ -0,0 +1,29 @@
+import os
+from typing import Dict, Tuple
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QPixmap
+
+# The res directory next to gui, wherever the application is started from
+RESOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "res")
+
+
+class IconCache:
+    """
+    Pixmaps of the images in res, read and scaled once per image and size and then shared by every widget of the
+    application. Only use it once the QApplication exists.
+    """
+
+    __pixmaps: Dict[Tuple[str, int], QPixmap] = dict()
+
+    @classmethod
+    def pixmap(cls, name: str, size: int) -> QPixmap:
+        """
+        :param name: file name of the image in res
+        :param size: width and height of the pixmap in pixels
+        """
+        key = (name, size)
+        if key not in cls.__pixmaps:
+            cls.__pixmaps[key] = QPixmap(os.path.join(RESOURCE_DIRECTORY, name)) \
+                .scaled(size, size, transformMode=Qt.SmoothTransformation)
+        return cls.__pixmaps[key]
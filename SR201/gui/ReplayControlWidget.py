@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QSlider, QDoubleSpinBox, QLabel
+
+from driver.TelemetryReplay import TelemetryReplay
+
+
+class ReplayControlWidget(QWidget):
+    # Resolution of the position slider
+    SLIDER_STEPS = 10000
+
+    def __init__(self, replay: TelemetryReplay):
+        super().__init__()
+
+        self.replay = replay
+
+        self.setLayout(QHBoxLayout())
+
+        self.play_button = QPushButton("Play")
+        self.play_button.clicked.connect(self.toggle_playback)
+
+        self.speed_spinbox = QDoubleSpinBox()
+        self.speed_spinbox.setRange(0.1, 100000)
+        self.speed_spinbox.setValue(replay.speed)
+        self.speed_spinbox.setSuffix("x")
+        self.speed_spinbox.valueChanged.connect(self.replay.set_speed)
+
+        self.position_slider = QSlider(Qt.Horizontal)
+        self.position_slider.setRange(0, self.SLIDER_STEPS)
+        self.position_slider.sliderReleased.connect(
+            lambda: self.replay.seek(self.replay.start_time + self.position_slider.value() / self.SLIDER_STEPS
+                                     * (self.replay.end_time - self.replay.start_time)))
+
+        self.position_label = QLabel()
+
+        self.layout().addWidget(self.play_button)
+        self.layout().addWidget(QLabel("Speed"))
+        self.layout().addWidget(self.speed_spinbox)
+        self.layout().addWidget(self.position_slider)
+        self.layout().addWidget(self.position_label)
+
+        self.replay.position_changed.connect(self.update_position)
+        self.replay.finished.connect(lambda: self.play_button.setText("Play"))
+        self.update_position(self.replay.position)
+
+    def toggle_playback(self):
+        if self.replay.is_playing():
+            self.replay.pause()
+            self.play_button.setText("Play")
+        else:
+            self.replay.play()
+            self.play_button.setText("Pause")
+
+    def update_position(self, timestamp: float):
+        self.position_label.setText(f"{datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M:%S}")
+        if not self.position_slider.isSliderDown() and self.replay.end_time > self.replay.start_time:
+            self.position_slider.setValue(int(self.SLIDER_STEPS * (timestamp - self.replay.start_time)
+                                              / (self.replay.end_time - self.replay.start_time)))
@@ -1,15 +1,44 @@
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout
 from ipaddress import IPv4Address
+from typing import Dict, Iterable
+from driver.PollScheduler import PollScheduler
 from driver.SR201 import SR201, RelayState
+from driver.Telemetry import TelemetryRecorder
+from driver.TelemetryReplay import TelemetryReplay
+from gui.IconCache import IconCache
 
 
 class SR201Widget(QWidget):
-    def __init__(self, ipv4_address: IPv4Address):
+    # Seconds between two reads of the relay states, to notice relays switched by someone else
+    POLL_INTERVAL = 1.0
+
+    STATE_ICONS = {
+        RelayState.OPEN: "button_green.png",
+        RelayState.CLOSED: "button_red.png"
+    }
+    ICON_SIZE = 32
+
+    def __init__(self, ipv4_address: IPv4Address, recorder: TelemetryRecorder = None, replay: TelemetryReplay = None,
+                 scheduler: PollScheduler = None, relay_groups: Dict[str, Iterable[int]] = None):
+        """
+        :param recorder: records every relay state change, if given
+        :param replay: shows the relay states of a recording instead of the board's, if given
+        :param scheduler: polls the relay states, a new one if not given
+        :param relay_groups: relay numbers by group name, each group gets buttons that switch it, consecutive relays
+        in one write
+        """
         super().__init__()
 
         self.device = SR201(ipv4_address)
+        self.device.define_group("All", range(SR201.RELAY_COUNT))
+        for name, relays in (relay_groups or dict()).items():
+            self.device.define_group(name, relays)
+        self.state_labels = [QLabel() for _ in range(SR201.RELAY_COUNT)]
+        # Queued to the GUI thread when emitted by a poll
+        self.device.stateChanged.connect(self.show_relay_state)
+        if recorder:
+            self.device.stateChanged.connect(
+                lambda relay_n, state: recorder.record(self.device.relay_channel(relay_n), state.value))
 
         self.setLayout(QVBoxLayout())
 
@@ -27,7 +56,47 @@ class SR201Widget(QWidget):
             else:
                 l2.addWidget(self._create_channel_widget(channel))
 
-        self.device.get_relay_states()
+        groups_layout = QHBoxLayout()
+        for name in self.device.relay_groups:
+            groups_layout.addWidget(self._create_group_widget(name))
+        groups_layout.addStretch()
+        self.layout().addLayout(groups_layout)
+
+        self.scheduler = None
+        self.owns_scheduler = scheduler is None
+        self.channel_name = f"SR201/{ipv4_address}"
+        if replay:
+            self.device.connect_replay(replay)
+            # The buttons would switch the real relays
+            for button in self.findChildren(QPushButton):
+                button.setEnabled(False)
+        else:
+            self.scheduler = scheduler if scheduler is not None else PollScheduler()
+            self.scheduler.add_channel(self.channel_name, str(ipv4_address), self.device.get_relay_states,
+                                       self.POLL_INTERVAL)
+
+    def set_relay_state(self, relay_n: int, state: RelayState):
+        # On the polling lane of the board, the Modbus connection carries one request at a time
+        self.scheduler.submit(str(self.device.ipv4_address), lambda: self.device.set_relay_state(relay_n, state))
+
+    def set_group_state(self, name: str, state: RelayState):
+        self.scheduler.submit(str(self.device.ipv4_address), lambda: self.device.set_group_state(name, state))
+
+    def show_relay_state(self, relay_n: int, state: RelayState):
+        label = self.state_labels[relay_n]
+        if state in self.STATE_ICONS:
+            label.setPixmap(IconCache.pixmap(self.STATE_ICONS[state], self.ICON_SIZE))
+        else:
+            label.clear()
+
+    def closeEvent(self, event):
+        if self.scheduler:
+            self.scheduler.remove_channel(self.channel_name)
+            self.scheduler.submit(str(self.device.ipv4_address), self.device.close)
+            if self.owns_scheduler:
+                # Runs the close of the device before the lane stops, nothing records from it afterwards
+                self.scheduler.close()
+        super().closeEvent(event)
 
     def _create_channel_widget(self, channel_n: int):
         widget = QWidget()
@@ -36,31 +105,32 @@ class SR201Widget(QWidget):
         widget.layout().addWidget(QLabel(f"Channel {channel_n}"))
 
         # Add a state label
-        label = QLabel()
-
-        def f(relay_n: int, state: RelayState):
-            if not relay_n == channel_n:
-                return
-
-            if state == RelayState.OPEN:
-                label.setPixmap(QPixmap("./res/button_green.png").scaled(32, 32, transformMode=Qt.SmoothTransformation))
-            elif state == RelayState.CLOSED:
-                label.setPixmap(QPixmap("./res/button_red.png").scaled(32, 32, transformMode=Qt.SmoothTransformation))
-            else:
-                label.setPixmap(QPixmap(""))
-
-        self.device.stateChanged.connect(f)
-        widget.layout().addWidget(label)
+        widget.layout().addWidget(self.state_labels[channel_n])
 
         # Add 2 QPushButton widgets in a horizontal layout
         open_button = QPushButton("Open")
-        open_button.clicked.connect(lambda: self.device.set_relay_state(channel_n, RelayState.OPEN))
+        open_button.clicked.connect(lambda: self.set_relay_state(channel_n, RelayState.OPEN))
         close_button = QPushButton("Close")
-        close_button.clicked.connect(lambda: self.device.set_relay_state(channel_n, RelayState.CLOSED))
+        close_button.clicked.connect(lambda: self.set_relay_state(channel_n, RelayState.CLOSED))
 
         temp_layout = QHBoxLayout()
         temp_layout.addWidget(open_button)
         temp_layout.addWidget(close_button)
         widget.layout().addLayout(temp_layout)
 
-        return widget
\ No newline at end of file
+        return widget
+
+    def _create_group_widget(self, name: str):
+        widget = QWidget()
+        widget.setLayout(QHBoxLayout())
+
+        widget.layout().addWidget(QLabel(name))
+
+        open_button = QPushButton("Open")
+        open_button.clicked.connect(lambda: self.set_group_state(name, RelayState.OPEN))
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(lambda: self.set_group_state(name, RelayState.CLOSED))
+        widget.layout().addWidget(open_button)
+        widget.layout().addWidget(close_button)
+
+        return widget
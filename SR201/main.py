@@ -2,10 +2,14 @@ from ipaddress import IPv4Address
 
 from PyQt5.QtWidgets import QApplication
 
+from driver.Telemetry import TelemetryRecorder
 from gui.SR201Widget import SR201Widget
 
 if __name__ == '__main__':
+    recorder = TelemetryRecorder(TelemetryRecorder.default_path("SR201"))
+
     app = QApplication([])
-    widget = SR201Widget(IPv4Address("192.168.1.100"))
+    widget = SR201Widget(IPv4Address("192.168.1.100"), recorder)
     widget.show()
-    app.exec_()
\ No newline at end of file
+    app.exec_()
+    recorder.close()
\ No newline at end of file
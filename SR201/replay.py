@@ -0,0 +1,37 @@
+import argparse
+import re
+import sys
+from ipaddress import IPv4Address
+
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout
+
+from driver.Telemetry import TelemetryReader
+from driver.TelemetryReplay import TelemetryReplay
+from gui.ReplayControlWidget import ReplayControlWidget
+from gui.SR201Widget import SR201Widget
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Replay the relay states of a recorded SR201 run")
+    parser.add_argument("path", help="telemetry file recorded by SR201")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed, 1 is real time")
+    parser.add_argument("--start", type=float, default=0.0, help="seconds into the recording to start at")
+    args = parser.parse_args()
+
+    app = QApplication([])
+
+    reader = TelemetryReader(args.path)
+    replay = TelemetryReplay(reader, speed=args.speed)
+    replay.seek(replay.start_time + args.start)
+
+    window = QWidget()
+    window.setWindowTitle(f"SR201 replay - {args.path}")
+    window.setLayout(QVBoxLayout())
+    window.layout().addWidget(ReplayControlWidget(replay))
+    for address in sorted({match.group(1) for match in map(re.compile(r"SR201/(.+)/relay\d+").fullmatch,
+                                                            reader.channels()) if match}):
+        window.layout().addWidget(SR201Widget(IPv4Address(address), replay=replay))
+
+    window.show()
+    exit_code = app.exec_()
+    reader.close()
+    sys.exit(exit_code)
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from pyModbusTCP.server import ModbusServer, DataHandler, DataBank
+
+
+class SR201RelayBank(DataBank):
+    """Coils 0-15 are the relays, writing n seconds to holding register i closes relay i for that long"""
+
+    def __init__(self):
+        super().__init__(coils_size=16, h_regs_size=16)
+
+        self.__timers = {}
+
+    def on_holding_registers_change(self, address, from_value, to_value, srv_info):
+        if address in self.__timers:
+            self.__timers.pop(address).cancel()
+
+        if to_value:
+            self.set_coils(address, [True])
+            self.__timers[address] = threading.Timer(to_value, self.set_coils, args=(address, [False]))
+            self.__timers[address].start()
+
+
+class SR201Simulator(DataHandler):
+    """Simulated SR201 16 channel relay board on a local Modbus TCP server"""
+
+    def __init__(self, host: str = "localhost", port: int = 6724, latency: float = 0.0):
+        """
+        :param latency: delay in seconds added to every request, on top of the network round trip
+        """
+        super().__init__(SR201RelayBank())
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.__server = ModbusServer(host=host, port=port, no_block=True, data_hdl=self)
+
+    def start(self):
+        self.__server.start()
+        return self
+
+    def stop(self):
+        self.__server.stop()
+
+    def read_coils(self, address, count, srv_info):
+        time.sleep(self.latency)
+        return super().read_coils(address, count, srv_info)
+
+    def write_coils(self, address, bits_l, srv_info):
+        time.sleep(self.latency)
+        return super().write_coils(address, bits_l, srv_info)
+
+    def read_h_regs(self, address, count, srv_info):
+        time.sleep(self.latency)
+        return super().read_h_regs(address, count, srv_info)
+
+    def write_h_regs(self, address, words_l, srv_info):
+        time.sleep(self.latency)
+        return super().write_h_regs(address, words_l, srv_info)
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from driver.StepperController import StepperController, StepperControllerAxis
+from simulator.StepperControllerSimulator import StepperControllerSimulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(baudrate, latency, count):
+    simulator = StepperControllerSimulator(baudrate=baudrate, latency=latency).start()
+    controller = StepperController(comport=simulator.port, baudrate=baudrate)
+    axis = StepperControllerAxis(controller, 1)
+
+    for func_name in ["output_actual_position", "output_command_position", "display_current_operation",
+                      "output_status_string", "query_positions"]:
+        measure(func_name, getattr(axis, func_name), count)
+    measure("set_velocity", lambda: axis.set_velocity(1000), count)
+    measure("move_relative", lambda: axis.move_relative(1), count)
+
+    controller.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stepper controller benchmark against a simulated controller")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    driver_benchmark(args.baudrate, args.latency, args.count)
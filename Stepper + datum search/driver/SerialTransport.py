@@ -0,0 +1,249 @@
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+
+import serial
+
+
+class RingBuffer:
+    """Fixed capacity byte buffer, the oldest bytes are dropped once it overflows"""
+
+    def __init__(self, capacity: int):
+        self.__buffer = bytearray(capacity)
+        self.__capacity = capacity
+        self.__start = 0
+        self.__size = 0
+
+    def __len__(self):
+        return self.__size
+
+    def write(self, data: bytes) -> int:
+        """
+        Append data to the buffer
+
+        :return: number of old bytes that had to be dropped to make room
+        """
+        if len(data) > self.__capacity:
+            data = data[-self.__capacity:]
+
+        overflow = max(0, self.__size + len(data) - self.__capacity)
+        self.__advance(overflow)
+
+        end = (self.__start + self.__size) % self.__capacity
+        first_part = min(len(data), self.__capacity - end)
+        self.__buffer[end:end + first_part] = data[:first_part]
+        self.__buffer[:len(data) - first_part] = data[first_part:]
+        self.__size += len(data)
+
+        return overflow
+
+    def peek(self) -> bytes:
+        end = self.__start + self.__size
+        if end <= self.__capacity:
+            return bytes(self.__buffer[self.__start:end])
+
+        return bytes(self.__buffer[self.__start:]) + bytes(self.__buffer[:end - self.__capacity])
+
+    def find(self, needle: bytes) -> int:
+        return self.peek().find(needle)
+
+    def read(self, n: int) -> bytes:
+        data = self.peek()[:n]
+        self.__advance(len(data))
+        return data
+
+    def clear(self):
+        self.__start = 0
+        self.__size = 0
+
+    def __advance(self, n: int):
+        self.__start = (self.__start + n) % self.__capacity
+        self.__size -= n
+
+
+class _PendingRequest:
+    __slots__ = ("command", "terminator", "future")
+
+    def __init__(self, command: bytes, terminator: bytes):
+        self.command = command
+        self.terminator = terminator
+        self.future = Future()
+
+
+class SerialTransport:
+    """
+    Serial port shared by all commands of a driver. A background thread reads everything the device sends into a
+    ring buffer, cuts it into frames on the terminator and hands every frame to the oldest request still waiting for
+    a response. Frames that arrive while nothing is waiting go to unsolicited_frame_callback.
+    """
+
+    # Read timeout of the background thread, bounds how long close() waits for it
+    READ_POLL_INTERVAL = 0.05
+
+    def __init__(self, port: str, terminator: bytes = b"\r", timeout: float = 1.0, buffer_size: int = 4096,
+                 **serial_kwargs):
+        """
+        :param port: serial port name, e.g. COM1
+        :param terminator: default frame terminator, used when a request does not specify its own
+        :param timeout: default time in seconds to wait for a response
+        :param buffer_size: capacity of the receive ring buffer in bytes
+        :param serial_kwargs: passed on to serial.Serial (baudrate, parity, bytesize, ...)
+        """
+        self.terminator = terminator
+        self.timeout = timeout
+        self.unsolicited_frame_callback: Optional[Callable[[bytes], None]] = None
+
+        self.__serial = serial.Serial(port=port, timeout=self.READ_POLL_INTERVAL, **serial_kwargs)
+        self.__buffer = RingBuffer(buffer_size)
+        self.__pending = deque()
+        self.__lock = threading.Lock()
+
+        self.__running = True
+        self.__reader = threading.Thread(target=self.__read_loop, name=f"SerialTransport {port}", daemon=True)
+        self.__reader.start()
+
+    def submit(self, command: bytes, terminator: Optional[bytes] = None) -> Future:
+        """
+        Write a command without waiting for its response
+
+        :return: future that resolves to the response frame, terminator included
+        """
+        return self.submit_many([command], terminator)[0]
+
+    def submit_many(self, commands: List[bytes], terminator: Optional[bytes] = None) -> List[Future]:
+        """
+        Write several commands in a single buffer, the responses are matched back to them in order
+
+        :return: one future per command, resolving to its response frame
+        """
+        requests = [_PendingRequest(command, terminator or self.terminator) for command in commands]
+
+        with self.__lock:
+            if not self.__running:
+                raise serial.SerialException("Transport is closed")
+
+            self.__pending.extend(requests)
+            try:
+                self.__serial.write(b"".join(commands))
+            except serial.SerialException:
+                for request in requests:
+                    self.__pending.remove(request)
+                raise
+
+        return [request.future for request in requests]
+
+    def write(self, data: bytes):
+        """Write data that gets no response, e.g. a control character"""
+        with self.__lock:
+            if not self.__running:
+                raise serial.SerialException("Transport is closed")
+            self.__serial.write(data)
+
+    def request(self, command: bytes, terminator: Optional[bytes] = None, timeout: Optional[float] = None) -> bytes:
+        """
+        Write a command and block until its response arrives
+
+        :raises TimeoutError: if there was no response within timeout seconds
+        """
+        return self.wait(self.submit(command, terminator), timeout)
+
+    def wait(self, future: Future, timeout: Optional[float] = None) -> bytes:
+        """
+        Wait for the response of a submitted command. A command that times out is dropped together with whatever
+        is left in the receive buffer, so a late response can't be handed to the next command.
+
+        :raises TimeoutError: if there was no response within timeout seconds
+        """
+        try:
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeoutError:
+            with self.__lock:
+                request = next((request for request in self.__pending if request.future is future), None)
+                if request:
+                    self.__pending.remove(request)
+                    logging.warning(f"No response for {request.command} within timeout, "
+                                    f"discarding {len(self.__buffer)} buffered bytes")
+                    self.__buffer.clear()
+                    self.__serial.reset_input_buffer()
+
+            if not request:
+                # The response arrived between the timeout and taking the lock
+                return future.result()
+
+            future.cancel()
+            raise TimeoutError(f"No response for {request.command}")
+
+    def close(self):
+        with self.__lock:
+            self.__running = False
+            pending = list(self.__pending)
+            self.__pending.clear()
+
+        self.__reader.join()
+        self.__serial.close()
+
+        for request in pending:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_exception(serial.SerialException("Transport was closed"))
+
+    def __read_loop(self):
+        while self.__running:
+            try:
+                data = self.__serial.read(self.__serial.in_waiting or 1)
+            except serial.SerialException as se:
+                logging.exception(f"Reading from serial failed (Err:{se})")
+                self.__fail_pending(se)
+                return
+
+            if not data:
+                continue
+
+            with self.__lock:
+                dropped = self.__buffer.write(data)
+                frames = self.__take_frames()
+
+            if dropped:
+                logging.warning(f"Receive buffer overflow, dropped {dropped} bytes")
+
+            for future, frame in frames:
+                if future is None:
+                    self.__handle_unsolicited(frame)
+                else:
+                    future.set_result(frame)
+
+    def __take_frames(self):
+        # Cut complete frames off the buffer, framing follows the terminator of the oldest waiting request
+        frames = []
+        while True:
+            terminator = self.__pending[0].terminator if self.__pending else self.terminator
+            index = self.__buffer.find(terminator)
+            if index == -1:
+                return frames
+
+            frame = self.__buffer.read(index + len(terminator))
+            if not self.__pending:
+                frames.append((None, frame))
+                continue
+
+            # A request cancelled by its caller still consumes its response
+            future = self.__pending.popleft().future
+            if future.set_running_or_notify_cancel():
+                frames.append((future, frame))
+
+    def __handle_unsolicited(self, frame: bytes):
+        if self.unsolicited_frame_callback:
+            self.unsolicited_frame_callback(frame)
+        else:
+            logging.debug(f"Discarding unsolicited frame {frame}")
+
+    def __fail_pending(self, exception: Exception):
+        with self.__lock:
+            self.__running = False
+            pending = list(self.__pending)
+            self.__pending.clear()
+
+        for request in pending:
+            if request.future.set_running_or_notify_cancel():
+                request.future.set_exception(exception)
@@ -6,6 +6,9 @@ import logging
 
 from serial import SerialException
 
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.SerialTransport import SerialTransport
+
 
 class StepperController:
     class StepperOperatingMode(Enum):
@@ -16,45 +19,61 @@ class StepperController:
         CLOSED_LOOP_STEPPER_MODE = 14
 
     def __init__(self, comport='COM3', baudrate=9600, parity=serial.PARITY_EVEN, databits=serial.SEVENBITS,
-                 stopbits=serial.STOPBITS_ONE, xonxoff=False):
+                 stopbits=serial.STOPBITS_ONE, xonxoff=False, timeout=100.0):
+        """
+        :param timeout: seconds to wait for a reply, WE only replies once the move is done so the default allows for
+        a long move
+        """
+        # Stays None if the port can't be opened, the commands then go unanswered like for a silent controller
+        self.__transport = None
         try:
             logging.debug("Setting up serial with params: {}".format(locals()))
-            self.__serial = serial.Serial(baudrate=baudrate,
-                                          parity=parity,
-                                          bytesize=databits,
-                                          stopbits=stopbits,
-                                          timeout=100,
-                                          port=comport)
+            self.__transport = SerialTransport(comport,
+                                               terminator=b"\n",
+                                               timeout=timeout,
+                                               baudrate=baudrate,
+                                               parity=parity,
+                                               bytesize=databits,
+                                               stopbits=stopbits)
         except ValueError as ve:
             logging.exception("One of args passed to Serial was out of bounds (Err:{}): {}".format(ve, locals()))
         except SerialException as se:
             logging.exception("Device not found or cannot be configured (Err:{})".format(se))
+        else:
+            logging.debug("Serial open")
+
+    def close(self):
+        if self.__transport is not None:
+            self.__transport.close()
 
-        logging.debug("Opening serial")
-        if not self.__serial.isOpen():
-            self.__serial.open()
-        logging.debug("Serial open")
+    def __write_and_read(self, command: str, timeout=None) -> bytes:
+        if self.__transport is None:
+            logging.warning("Serial port not open, command '{}' not sent".format(command))
+            return b""
+        try:
+            return self.__transport.request(command.encode("utf-8"), timeout=timeout)
+        except TimeoutError:
+            logging.warning("No response for command '{}'".format(command))
+            return b""
 
     def write(self, axis, command, value=None):
         if value:
-            self.__serial.write("{}{}{}\r".format(axis, command, value).encode())
+            readback = self.__write_and_read("{}{}{}\r".format(axis, command, value)).decode()
             logging.debug("Write command '{}{}{}'".format(axis, command, value))
         else:
-            self.__serial.write("{}{}\r".format(axis, command).encode())
+            readback = self.__write_and_read("{}{}\r".format(axis, command)).decode()
             logging.debug("Write command '{}{}'".format(axis, command))
-        readback = self.__serial.read_until().decode()
         logging.debug("Readback: {}".format(readback))
         return "OK" in readback.upper()
 
-    def read(self, axis, command):
+    def read(self, axis, command, timeout=None):
         logging.debug("Read command: {}{}".format(axis, command))
-        self.__serial.write("{}{}\r".format(axis, command).encode("utf-8"))
-        readback = self.__serial.read_until()
+        readback = self.__write_and_read("{}{}\r".format(axis, command), timeout)
         logging.debug("Readback: {}".format(readback))
         return readback
 
 
-class StepperControllerAxis:
+class StepperControllerAxis(AsyncDriverMixin):
     def __init__(self, stepper_controller: StepperController, axis_number: int):
         #assert 1 <= axis_number <= 99
         self.stepper_controller = stepper_controller
@@ -1,8 +1,14 @@
+from typing import Callable, Optional
+
 from PyQt5.QtWidgets import QWidget, QPushButton, QLineEdit, QHBoxLayout
 
 
 class ButtonWithEdits(QWidget):
-    def __init__(self, button_text, target, func, edits):
+    def __init__(self, button_text, target, func, edits, submit: Optional[Callable[[Callable[[], None]], None]] = None):
+        """
+        :param submit: runs the call off the GUI thread, e.g. on the lane of the controller's port. Called right
+        away if not given
+        """
         super().__init__()
 
         self.setLayout(QHBoxLayout())
@@ -13,6 +19,7 @@ class ButtonWithEdits(QWidget):
 
         self.func = func
         self.target = target
+        self.submit = submit
         self.edits = []
 
         for arg in edits:
@@ -27,7 +34,11 @@ class ButtonWithEdits(QWidget):
         self.layout().addStretch(0)
 
     def funci(self):
-        self.func(**self.get_args_from_edits())
+        kwargs = self.get_args_from_edits()
+        if self.submit:
+            self.submit(lambda: self.func(**kwargs))
+        else:
+            self.func(**kwargs)
 
     def get_args_from_edits(self):
         argos = {}
@@ -1,20 +1,33 @@
+import functools
 import logging
 import time
 
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QIntValidator, QDoubleValidator
 from PyQt5.QtWidgets import QMainWindow, QPushButton, QScrollArea, QLineEdit, QGroupBox, QVBoxLayout, QLabel
 import inspect
+from driver.PollScheduler import PollScheduler
 from driver.StepperController import StepperController, StepperControllerAxis
 from gui.ButtonWithEdits import ButtonWithEdits
 from gui.CentralWidget import CentralWidget
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Emitted from the lane of the port while the search routine runs, delivered on the GUI thread
+    status_changed = pyqtSignal(str)
+
+    def __init__(self, scheduler: PollScheduler = None):
+        """
+        :param scheduler: runs the commands of the buttons and the search routine off the GUI thread, a new one if
+        not given
+        """
         super().__init__()
         widget = CentralWidget()
-        stepper = StepperController(comport="COM3")
-        self.axisX = StepperControllerAxis(stepper, 1)
+        self.comport = "COM3"
+        self.stepper = StepperController(comport=self.comport)
+        self.axisX = StepperControllerAxis(self.stepper, 1)
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
 
         datum_search_group = QGroupBox()
         temp_layout = QVBoxLayout()
@@ -36,12 +49,13 @@ class MainWindow(QMainWindow):
 
         search_routine_execution_button = QPushButton()
         search_routine_execution_button.setText("Start")
-        search_routine_execution_button.clicked.connect(lambda: self.start_search_routine(int(initial_speed_edit.text()),
-                                                                                          int(shift_edit.text()),
-                                                                                          int(creep_speed_edit.text())))
+        search_routine_execution_button.clicked.connect(
+            lambda: self.submit(functools.partial(self.start_search_routine, int(initial_speed_edit.text()),
+                                                  int(shift_edit.text()), int(creep_speed_edit.text()))))
         temp_layout.addWidget(search_routine_execution_button)
 
         self.info_label = QLabel("Status: brak")
+        self.status_changed.connect(self.info_label.setText)
         temp_layout.addWidget(self.info_label)
 
         datum_search_group.setLayout(temp_layout)
@@ -50,7 +64,7 @@ class MainWindow(QMainWindow):
         for func in [method_name for method_name in dir(self.axisX)
                      if callable(getattr(self.axisX, method_name)) and not method_name.startswith("_")]:
             combo = ButtonWithEdits(func, self.axisX, getattr(self.axisX, func),
-                                    inspect.getfullargspec(getattr(self.axisX, func)).args[1:])
+                                    inspect.getfullargspec(getattr(self.axisX, func)).args[1:], submit=self.submit)
             widget.add_new_line([combo])
 
         sa = QScrollArea()
@@ -58,9 +72,21 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(sa)
         self.setMinimumSize(500, 500)
 
+    def submit(self, func):
+        """Run func on the lane of the port, the controller only handles one exchange at a time"""
+        self.scheduler.submit(self.comport, func)
+
+    def closeEvent(self, event):
+        # Close the port on its lane, after a command or search routine that may still be running
+        self.submit(self.stepper.close)
+        if self.owns_scheduler:
+            self.scheduler.close()
+        super().closeEvent(event)
+
     def start_search_routine(self, init_speed: int, shift_steps: int, creep_speed: int):
+        """Called on the lane of the port, it polls the controller until each step is done"""
         # Krok 1
-        self.info_label.setText("Krok 1: szybki home to datum")
+        self.status_changed.emit("Krok 1: szybki home to datum")
         self.axisX.set_velocity(init_speed)
         self.axisX.go_home_to_datum(False)
         current_operation = self.axisX.display_current_operation()
@@ -74,7 +100,7 @@ class MainWindow(QMainWindow):
         self.axisX.set_creep_steps(shift_steps)
         self.axisX.set_creep_speed(creep_speed)
         # Krok 2
-        self.info_label.setText("Krok 2: odsunięcie od hard limitu")
+        self.status_changed.emit("Krok 2: odsunięcie od hard limitu")
         self.axisX.move_relative(-shift_steps)
 
         current_operation = self.axisX.display_current_operation()
@@ -85,9 +111,9 @@ class MainWindow(QMainWindow):
             logging.debug("Current operation: {}".format(current_operation))
 
         # Krok 3
-        self.info_label.setText("Krok 3: wolny home to datum")
+        self.status_changed.emit("Krok 3: wolny home to datum")
         self.axisX.go_home_to_datum(False)
         # self.axisX.constant_velocity_move(creep_speed)
-        self.info_label.setText("Koniec")
+        self.status_changed.emit("Koniec")
 
 
@@ -0,0 +1,125 @@
+import re
+import time
+from typing import Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+
+class SimulatedAxis:
+    def __init__(self):
+        self.settings = {"SV": 1000, "SC": 100, "SA": 10000, "SD": 10000, "CR": 0}
+        self.position = 0
+        self.datum_position = None
+        self.__move_start = 0
+        self.__move_target = 0
+        self.__move_started_at = None
+        self.__homing = False
+
+    def move_to(self, target: int, homing: bool = False):
+        self.position = self.current_position()
+        self.__move_start = self.position
+        self.__move_target = target
+        self.__move_started_at = time.monotonic()
+        self.__homing = homing
+
+    def stop(self):
+        self.position = self.current_position()
+        self.__move_started_at = None
+
+    def current_position(self) -> int:
+        # Constant velocity moves at the set velocity, no acceleration ramps
+        if self.__move_started_at is None:
+            return self.position
+
+        distance = self.__move_target - self.__move_start
+        travelled = int(self.settings["SV"] * (time.monotonic() - self.__move_started_at))
+        if travelled >= abs(distance):
+            self.position = self.__move_target
+            self.__move_started_at = None
+            if self.__homing:
+                self.datum_position = self.position
+            return self.position
+
+        return self.__move_start + (travelled if distance > 0 else -travelled)
+
+    def current_operation(self) -> str:
+        self.current_position()
+        if self.__move_started_at is None:
+            return "Idle"
+        return "Home to datum" if self.__homing else "Moving"
+
+
+class StepperControllerSimulator(PtySerialDevice):
+    """Simulated multi-axis stepper controller, replies are prefixed with the axis number like the real one"""
+
+    # Commands taking a value that only change a setting
+    SETTING_COMMANDS = ["AM", "CM", "ER", "BO", "CR", "TO", "SE", "WI", "SL", "TR", "SH", "DM", "SC", "SF", "SJ",
+                        "SV", "SA", "SD", "LD", "DE", "LL", "UL", "WP", "WA", "IF", "IT", "JM", "JC", "JS", "JT",
+                        "AE", "DS", "LS", "XS", "US", "NP", "PI", "PL"]
+
+    COMMAND_PATTERN = re.compile(r"^(\d+)(\x03|[A-Z]{2})(.*)$")
+
+    def __init__(self, baudrate: int = 9600, latency: float = 0.0, axis_count: int = 2, travel: int = 100000):
+        super().__init__(terminator=b"\r", baudrate=baudrate, latency=latency)
+
+        self.axes = {axis_number: SimulatedAxis() for axis_number in range(1, axis_count + 1)}
+        # Position of the hard limit that datum searches stop at, relative to power up
+        self.travel = travel
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        match = self.COMMAND_PATTERN.match(command.decode("utf-8").strip())
+        if not match:
+            return b"! SYNTAX ERROR\r\n"
+
+        axis_number, mnemonic, value = int(match.group(1)), match.group(2), match.group(3)
+        if axis_number not in self.axes:
+            return None
+
+        return f"{axis_number:02}:{self.execute(self.axes[axis_number], mnemonic, value)}\r\n".encode("utf-8")
+
+    def execute(self, axis: SimulatedAxis, mnemonic: str, value: str) -> str:
+        if mnemonic in self.SETTING_COMMANDS:
+            if not value:
+                return "! INVALID VALUE"
+            axis.settings[mnemonic] = int(value) if value.lstrip("-").isdigit() else value
+            return "OK"
+
+        if mnemonic in ["MA", "MR", "CP", "DA"]:
+            if not value.lstrip("-").isdigit():
+                return "! INVALID VALUE"
+            target = int(value)
+            axis.move_to(target if mnemonic in ["MA", "CP"] else axis.current_position() + target)
+            return "OK"
+        if mnemonic == "HD":
+            axis.move_to(-self.travel if value == "-1" else self.travel, homing=True)
+            return "OK"
+        if mnemonic == "MD":
+            axis.move_to(axis.datum_position or 0)
+            return "OK"
+        if mnemonic in ["\x03", "ST", "AB"]:
+            axis.stop()
+            return "OK"
+        if mnemonic == "WE":
+            while axis.current_operation() != "Idle":
+                time.sleep(0.01)
+            return "OK"
+        if mnemonic == "AP":
+            axis.stop()
+            axis.position = int(value)
+            return "OK"
+
+        return {
+            "OC": f"{axis.current_position()}",
+            "OA": f"{axis.current_position()}",
+            "OD": f"{axis.datum_position}",
+            "OV": f"{axis.settings['SV']}",
+            "OS": "00000000",
+            "OF": "0",
+            "CO": axis.current_operation(),
+            "ID": "Simulated stepper controller",
+            "QS": f"SV={axis.settings['SV']} SC={axis.settings['SC']} SA={axis.settings['SA']} "
+                  f"SD={axis.settings['SD']}",
+            "QP": f"AP={axis.current_position()} DP={axis.datum_position}",
+            "QL": "PL=0",
+        }.get(mnemonic, "OK" if mnemonic in ["IN", "RS", "CD", "AD", "ES", "BS", "BA", "BD"]
+                     else "! UNKNOWN COMMAND")
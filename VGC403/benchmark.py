@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from driver.VGC403 import VGC403
+from simulator.VGC403Simulator import VGC403Simulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(baudrate, latency, count, stream_duration):
+    simulator = VGC403Simulator(baudrate=baudrate, latency=latency).start()
+    device = VGC403(comport=simulator.port, baudrate=baudrate)
+
+    for sensor_number in [1, 2, 3]:
+        measure(f"read_pressure_sensor({sensor_number})", lambda: device.read_pressure_sensor(sensor_number), count)
+    measure("read_all_pressure_sensors()", device.read_all_pressure_sensors, count)
+
+    stream = device.start_streaming(VGC403.ContinuousInterval.MS_100)
+    time.sleep(stream_duration)
+    device.stop_streaming()
+    print(f"{'start_streaming(MS_100)':<40} {len(stream) / stream_duration:10.1f} measurements/s")
+
+    device.close()
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="VGC403 driver benchmark against a simulated gauge controller")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    parser.add_argument("--stream", type=float, default=5.0, help="seconds to stream in continuous mode")
+    args = parser.parse_args()
+
+    driver_benchmark(args.baudrate, args.latency, args.count, args.stream)
@@ -1,19 +1,57 @@
 import logging
-from dataclasses import dataclass
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import List, Optional, Tuple
 
 import serial
 
+from driver.AsyncDriver import AsyncDriverMixin
+from driver.SerialTransport import SerialTransport
+
 
 @dataclass
 class VGC403PressureSensorData:
+    # No per-instance __dict__, a streamed pump-down curve holds many of these
+    __slots__ = ("status", "value", "error")
+
     status: int
     value: float
     error: float
 
 
-class VGC403:
+@dataclass(frozen=True)
+class VGC403Measurement:
+    """Readouts of all three gauges, taken in one exchange"""
+    sensors: Tuple[VGC403PressureSensorData, VGC403PressureSensorData, VGC403PressureSensorData]
+    timestamp: float = field(default_factory=time.time)
+
+
+class VGC403(AsyncDriverMixin):
+
+    class ContinuousInterval(IntEnum):
+        """Transmission interval of the continuous output mode, the parameter of COM"""
+        MS_100 = 0
+        S_1 = 1
+        MIN_1 = 2
+
+    ACK = b"\x06\r\n"
+    NAK = b"\x15\r\n"
+    ENQ = b"\x05"
+    ETX = b"\x03"
+    # Seconds to wait after ETX for a frame already on the wire, so it isn't taken as the response to the next command
+    STREAM_SETTLE_TIME = 0.2
+    # Seconds to wait for a response to the ENQ after a refused command, there may be none
+    NAK_ENQ_TIMEOUT = 0.2
+    # Bytes from one gauge's data to the next in a PRX or continuous mode frame, "a,sx.xxxxEsxx,"
+    SENSOR_DATA_STRIDE = 14
+
+    # Status of a gauge whose readout got no response, not one of the controller's own codes
+    NO_RESPONSE = -1
 
     PR_STATUS_STRINGS = {
+        NO_RESPONSE: "no response",
         0: "OK",
         1: "underrange",
         2: "overrange",
@@ -25,26 +63,151 @@ class VGC403:
     }
 
     def __init__(self, comport='COM1', baudrate=9600, parity=serial.PARITY_NONE, databits=serial.EIGHTBITS,
-                 stopbits=serial.STOPBITS_ONE):
-        self.__serial = serial.Serial(baudrate=baudrate,
-                                      parity=parity,
-                                      bytesize=databits,
-                                      stopbits=stopbits,
-                                      timeout=100,
-                                      port=comport)
-
-    def read_pressure_sensor(self, sensor_number: int):
+                 stopbits=serial.STOPBITS_ONE, timeout=2.0):
+        self.__transport = SerialTransport(comport,
+                                           terminator=b"\r\n",
+                                           timeout=timeout,
+                                           baudrate=baudrate,
+                                           parity=parity,
+                                           bytesize=databits,
+                                           stopbits=stopbits)
+        # Whether the controller knows PRX, assumed until it answers PRX with NAK
+        self.__supports_prx = True
+        # Measurements sent by the controller in continuous mode, appended by the transport's reader thread
+        self.stream: Optional[deque] = None
+
+    def close(self):
+        if self.stream is not None:
+            self.stop_streaming()
+        self.__transport.close()
+
+    def read_pressure_sensor(self, sensor_number: int) -> VGC403PressureSensorData:
         assert sensor_number in [1, 2, 3]
-        logging.info(f"Sending 'PR{sensor_number}'\r")
-        self.__serial.write(f"PR{sensor_number}\r".encode())
-        logging.info(f"Readback: {self.__serial.readline()}")
-        logging.info(f"Sending '{chr(0x05)}'")
-        self.__serial.write(f"{chr(0x05)}".encode())
-        logging.info("Reading back info")
-        readback_string = self.__serial.readline().decode()
-        logging.info(readback_string)
-        logging.info(f"Extracted info: {int(readback_string[0]), float(readback_string[2:9]), int(readback_string[10:13])}")
-        return VGC403PressureSensorData(int(readback_string[0]), float(readback_string[2:9]), int(readback_string[10:13]))
+        self.__check_not_streaming()
+        try:
+            logging.debug("Sending 'PR%d'", sensor_number)
+            readback = self.__transport.request(f"PR{sensor_number}\r".encode())
+            logging.debug("Readback: %r", readback)
+            logging.debug("Sending ENQ")
+            readback = self.__transport.request(self.ENQ)
+            logging.debug("Readback: %r", readback)
+        except TimeoutError:
+            logging.warning(f"No response reading gauge {sensor_number}")
+            return self.__no_response()
+        return self.__parse_sensor_data(memoryview(readback), 0)
 
     def get_pr_status_string(self, status: int) -> str:
         return self.PR_STATUS_STRINGS[status]
+
+    def read_all_pressure_sensors(self) -> VGC403Measurement:
+        """
+        Read all three gauges. PRX and the ENQ asking for its data go out in a single write, instead of a PRn and an
+        ENQ per gauge. Controllers that don't know PRX are read gauge by gauge.
+        """
+        self.__check_not_streaming()
+        if self.__supports_prx:
+            logging.debug("Sending 'PRX' and ENQ")
+            acknowledgement_future, readback_future = self.__transport.submit_many([b"PRX\r", self.ENQ])
+            try:
+                # The acknowledgement first: a controller that refuses PRX may leave the ENQ unanswered
+                acknowledgement = self.__transport.wait(acknowledgement_future)
+                if acknowledgement != self.NAK:
+                    readback = self.__transport.wait(readback_future)
+            except TimeoutError:
+                logging.warning("No response reading the gauges")
+                self.__discard(readback_future)
+                return VGC403Measurement((self.__no_response(), self.__no_response(), self.__no_response()))
+
+            if acknowledgement != self.NAK:
+                logging.debug("Readback: %r", readback)
+                return self.__parse_measurement(readback)
+
+            logging.warning("PRX is not supported, reading the gauges one by one")
+            self.__supports_prx = False
+            # Whatever the ENQ gets back must not be taken as the response to PR1
+            self.__discard(readback_future, self.NAK_ENQ_TIMEOUT)
+
+        return VGC403Measurement(tuple(self.read_pressure_sensor(sensor_number) for sensor_number in [1, 2, 3]))
+
+    def start_streaming(self, interval: "VGC403.ContinuousInterval" = ContinuousInterval.MS_100,
+                        maxlen: int = 100000) -> deque:
+        """
+        Switch the controller to continuous output: it sends the readouts of all gauges every interval without being
+        asked. The reader thread of the transport parses them into VGC403Measurement records and appends them to
+        the returned deque, append and popleft being thread safe no lock is involved. Once maxlen records are queued
+        the oldest ones are dropped. No other command may be sent until stop_streaming().
+        """
+        self.__check_not_streaming()
+
+        logging.info("Sending 'COM,%d'", interval.value)
+        acknowledgement = self.__transport.request(f"COM,{interval.value}\r".encode())
+        if acknowledgement != self.ACK:
+            raise IOError(f"Continuous mode refused: {acknowledgement}")
+
+        self.stream = deque(maxlen=maxlen)
+        self.__transport.unsolicited_frame_callback = self.__stream_frame
+        return self.stream
+
+    def stop_streaming(self):
+        """Leave continuous output, measurements still in the stream stay there"""
+        logging.info("Sending ETX")
+        self.__transport.write(self.ETX)
+        time.sleep(self.STREAM_SETTLE_TIME)
+        self.__transport.unsolicited_frame_callback = None
+        self.stream = None
+
+    def drain_stream(self) -> List[VGC403Measurement]:
+        """
+        :return: the measurements streamed since the last call, oldest first
+        """
+        measurements = []
+        stream = self.stream
+        while stream:
+            measurements.append(stream.popleft())
+        return measurements
+
+    def __stream_frame(self, frame: bytes):
+        stream = self.stream
+        if stream is None:
+            return
+
+        try:
+            stream.append(self.__parse_measurement(frame))
+        except ValueError:
+            logging.warning("Discarding malformed continuous mode frame %r", frame)
+
+    def __check_not_streaming(self):
+        if self.stream is not None:
+            raise RuntimeError("The controller is in continuous mode, call stop_streaming() first")
+
+    def __discard(self, future, timeout: float = 0.0):
+        """Stop waiting for a response that may never come, so it can't be handed to the next command"""
+        if future.done():
+            return
+        try:
+            self.__transport.wait(future, timeout)
+        except TimeoutError:
+            pass
+
+    @staticmethod
+    def __no_response() -> VGC403PressureSensorData:
+        return VGC403PressureSensorData(VGC403.NO_RESPONSE, float("nan"), 0)
+
+    @staticmethod
+    def __parse_measurement(readback: bytes) -> VGC403Measurement:
+        # "a,sx.xxxxEsxx,b,sx.xxxxEsxx,c,sx.xxxxEsxx", the status and pressure of each gauge
+        if len(readback) < 3 * VGC403.SENSOR_DATA_STRIDE - 1:
+            raise ValueError(f"Expected the data of three gauges, got {readback}")
+
+        view = memoryview(readback)
+        return VGC403Measurement(tuple(VGC403.__parse_sensor_data(view, VGC403.SENSOR_DATA_STRIDE * index)
+                                       for index in range(3)))
+
+    @staticmethod
+    def __parse_sensor_data(view: memoryview, offset: int) -> VGC403PressureSensorData:
+        # "a,sx.xxxxEsxx" at offset: the status digit, the sign and mantissa, the exponent. float() and int() take
+        # the slices of the receive buffer as they are, nothing is decoded or copied
+        status = view[offset] - 0x30
+        if not 0 <= status <= 9:
+            raise ValueError(f"Invalid status {bytes(view[offset:offset + 1])}")
+        return VGC403PressureSensorData(status, float(view[offset + 2:offset + 9]), int(view[offset + 10:offset + 13]))
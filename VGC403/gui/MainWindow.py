@@ -1,9 +1,15 @@
 from PyQt5.QtWidgets import QMainWindow
 
+from driver.Telemetry import TelemetryRecorder
 from gui.VGC403Widget import VGC403Widget
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, recorder: TelemetryRecorder = None):
         super().__init__()
-        self.setCentralWidget(VGC403Widget())
\ No newline at end of file
+        self.setCentralWidget(VGC403Widget(recorder))
+
+    def closeEvent(self, event):
+        # Lets the widget release the port and its scheduler before main.py closes the recorder
+        self.centralWidget().close()
+        super().closeEvent(event)
@@ -1,16 +1,32 @@
-from PyQt5.QtCore import QTimer
+from typing import List
+
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QDoubleValidator
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QPushButton, QLineEdit, QLabel, QHBoxLayout
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QPushButton, QLineEdit, QLabel, QHBoxLayout, \
+    QCheckBox
 from serial.tools.list_ports import comports
 
-from driver.VGC403 import VGC403
+from driver.PollScheduler import PollScheduler
+from driver.Telemetry import TelemetryRecorder
+from driver.VGC403 import VGC403, VGC403Measurement
 
 
 class VGC403Widget(QWidget):
-    def __init__(self):
+    # Emitted from the polling thread, delivered on the GUI thread
+    measurement_ready = pyqtSignal(VGC403Measurement)
+    streaming_failed = pyqtSignal(str)
+
+    def __init__(self, recorder: TelemetryRecorder = None, scheduler: PollScheduler = None):
         super().__init__()
 
         self.device = None
+        self.recorder = recorder
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.comport = None
+        self.channel_name = None
+        # Set on the polling thread when the controller refused continuous mode, it is then polled instead
+        self.streaming_refused = False
 
         self.setLayout(QVBoxLayout())
 
@@ -25,11 +41,16 @@ class VGC403Widget(QWidget):
         self.interval_edit.setText("10")
         self.interval_edit.editingFinished.connect(self.update_interval)
 
-        self.measurement_timer = QTimer()
+        # In continuous mode the controller sends at its own rate, the interval only sets how often the GUI catches up
+        self.continuous_checkbox = QCheckBox("Continuous")
+
+        self.measurement_ready.connect(self.show_measurements)
+        self.streaming_failed.connect(self.show_streaming_failure)
 
         self.sensor_1_readout_label = QLabel("Sensor 1 readout: none")
         self.sensor_2_readout_label = QLabel("Sensor 2 readout: none")
         self.sensor_3_readout_label = QLabel("Sensor 3 readout: none")
+        self.info_label = QLabel()
 
         temp_layout = QHBoxLayout()
 
@@ -37,6 +58,7 @@ class VGC403Widget(QWidget):
         temp_layout.addWidget(QLabel("Interval"))
         temp_layout.addWidget(self.interval_edit)
         temp_layout.addWidget(QLabel("seconds"))
+        temp_layout.addWidget(self.continuous_checkbox)
         temp_layout.addWidget(self.connect_button)
 
         self.layout().addLayout(temp_layout)
@@ -44,28 +66,83 @@ class VGC403Widget(QWidget):
         self.layout().addWidget(self.sensor_1_readout_label)
         self.layout().addWidget(self.sensor_2_readout_label)
         self.layout().addWidget(self.sensor_3_readout_label)
+        self.layout().addWidget(self.info_label)
 
     def connect_device(self):
-        self.device = VGC403(comport=self.comport_dropdown.currentText())
-        self.measurement_timer.timeout.connect(self.get_measurements)
-        self.measurement_timer.start(1000 * int(self.interval_edit.text()))
+        self.comport = self.comport_dropdown.currentText()
+        self.device = VGC403(comport=self.comport)
+        self.channel_name = f"VGC403/{self.comport}"
+        if self.continuous_checkbox.isChecked():
+            self.streaming_refused = False
+            self.info_label.clear()
+            self.scheduler.add_channel(self.channel_name, self.comport, self.get_streamed_measurements,
+                                       self.interval(), self.emit_measurements)
+        else:
+            self.scheduler.add_channel(self.channel_name, self.comport, self.get_measurements, self.interval(),
+                                       self.measurement_ready.emit)
+        self.continuous_checkbox.setEnabled(False)
         self.connect_button.setText("Disconnect")
         self.connect_button.clicked.disconnect(self.connect_device)
         self.connect_button.clicked.connect(self.disconnect_device)
 
     def disconnect_device(self):
+        self.scheduler.remove_channel(self.channel_name)
+        # Close the port on the polling lane, after a poll that may still be running
+        self.scheduler.submit(self.comport, self.device.close)
         self.device = None
-        self.measurement_timer.timeout.disconnect(self.get_measurements)
-        self.measurement_timer.stop()
+        self.continuous_checkbox.setEnabled(True)
         self.connect_button.setText("Connect")
         self.connect_button.clicked.disconnect(self.disconnect_device)
         self.connect_button.clicked.connect(self.connect_device)
 
-    def get_measurements(self):
-        assert self.device, "There was no device, but measurements were requested"
-        readouts = self.device.read_pressure_sensor(1), \
-                   self.device.read_pressure_sensor(2), \
-                   self.device.read_pressure_sensor(3)
+    def closeEvent(self, event):
+        if self.device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted before the lane stops, nothing records from it afterwards
+            self.scheduler.close()
+        super().closeEvent(event)
+
+    def interval(self) -> float:
+        return float(self.interval_edit.text().replace(",", "."))
+
+    def get_measurements(self) -> VGC403Measurement:
+        """Called on the polling thread"""
+        device = self.device
+        assert device, "There was no device, but measurements were requested"
+        return device.read_all_pressure_sensors()
+
+    def get_streamed_measurements(self) -> List[VGC403Measurement]:
+        """
+        Called on the polling thread, the first call switches the controller to continuous mode. If it refuses, the
+        gauges are polled at the interval instead.
+        """
+        device = self.device
+        assert device, "There was no device, but measurements were requested"
+        if device.stream is None and not self.streaming_refused:
+            try:
+                device.start_streaming()
+            except OSError as e:
+                self.streaming_refused = True
+                self.streaming_failed.emit(str(e))
+
+        if self.streaming_refused:
+            return [device.read_all_pressure_sensors()]
+        return device.drain_stream()
+
+    def show_streaming_failure(self, error: str):
+        self.info_label.setText(f"Continuous mode failed, polling every interval instead: {error}")
+
+    def emit_measurements(self, measurements: List[VGC403Measurement]):
+        """Called on the polling thread with the measurements streamed since the last poll"""
+        for measurement in measurements:
+            self.measurement_ready.emit(measurement)
+
+    def show_measurements(self, measurement: VGC403Measurement):
+        if self.device is None:
+            return
+
+        readouts = measurement.sensors
         if readouts[0].status == 0:
             self.sensor_1_readout_label.setText(f"Sensor 1 readout: {readouts[0].value}e{readouts[0].error} mbar")
         else:
@@ -79,6 +156,14 @@ class VGC403Widget(QWidget):
         else:
             self.sensor_3_readout_label.setText(f"Sensor 3 readout: {self.device.get_pr_status_string(readouts[2].status)}")
 
+        if self.recorder:
+            for sensor_number, readout in enumerate(readouts, 1):
+                self.recorder.record_many({
+                    f"VGC403/sensor{sensor_number}/status": readout.status,
+                    f"VGC403/sensor{sensor_number}/pressure": readout.value * 10 ** readout.error
+                    if readout.status == 0 else float("nan")
+                }, measurement.timestamp)
+
     def update_interval(self):
         if self.device:
-            self.measurement_timer.start(int(1000 * float(self.interval_edit.text().replace(",", "."))))
+            self.scheduler.set_interval(self.channel_name, self.interval())
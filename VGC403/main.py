@@ -7,6 +7,7 @@ import sys
 
 from PyQt5.QtWidgets import QApplication
 
+from driver.Telemetry import TelemetryRecorder
 from driver.VGC403 import VGC403
 
 
@@ -23,9 +24,13 @@ if __name__ == '__main__':
         ]
     )
 
+    recorder = TelemetryRecorder(TelemetryRecorder.default_path("VGC403"))
+
     app = QApplication([])
-    widget = MainWindow()
+    widget = MainWindow(recorder)
     widget.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    recorder.close()
+    sys.exit(exit_code)
 
 # See PyCharm help at https://www.jetbrains.com/help/pycharm/
@@ -0,0 +1,91 @@
+import threading
+import time
+from typing import List, Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+ACK = b"\x06\r\n"
+NAK = b"\x15\r\n"
+ENQ = 0x05
+ETX = 0x03
+
+# Transmission interval of each COM parameter in seconds
+CONTINUOUS_INTERVALS = {0: 0.1, 1: 1.0, 2: 60.0}
+
+
+class VGC403Simulator(PtySerialDevice):
+    """
+    Simulated VGC403 gauge controller. Every mnemonic is acknowledged with ACK or NAK, the data is only sent
+    after the host asks for it with ENQ. COM,n switches to continuous output of all gauges, ETX ends it.
+    """
+
+    def __init__(self, baudrate: int = 9600, latency: float = 0.0):
+        super().__init__(terminator=b"\r", baudrate=baudrate, latency=latency)
+
+        # (status, pressure in mbar) per gauge, see VGC403.PR_STATUS_STRINGS for the status codes
+        self.gauges = {1: (0, 2.2e-3), 2: (0, 7.6e-6), 3: (5, 1.0e3)}
+        self.gauge_types = "PSG,BPG,noSen"
+        self.__last_mnemonic = None
+        self.__continuous_stop = threading.Event()
+        self.__continuous_stop.set()
+
+    def split_commands(self, buffer: bytearray) -> List[bytes]:
+        # ENQ is a single byte without a terminator, everything else ends with <cr> and an optional <lf>
+        commands = []
+        while buffer:
+            if buffer[0] in (ENQ, ETX):
+                commands.append(bytes(buffer[:1]))
+                del buffer[:1]
+                continue
+
+            index = buffer.find(self.terminator)
+            if index == -1:
+                break
+            commands.append(bytes(buffer[:index]).strip())
+            del buffer[:index + len(self.terminator)]
+            if buffer[:1] == b"\n":
+                del buffer[:1]
+        return commands
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        if command == bytes([ENQ]):
+            if self.__last_mnemonic is None:
+                return NAK
+            return f"{self.data(self.__last_mnemonic)}\r\n".encode()
+
+        if command == bytes([ETX]):
+            self.__continuous_stop.set()
+            return None
+
+        mnemonic = command.decode()
+        if mnemonic.startswith("COM,") and int(mnemonic[4:]) in CONTINUOUS_INTERVALS:
+            self.__start_continuous(CONTINUOUS_INTERVALS[int(mnemonic[4:])])
+            return ACK
+
+        if mnemonic not in ["PR1", "PR2", "PR3", "PRX", "TID"]:
+            self.__last_mnemonic = None
+            return NAK
+
+        self.__last_mnemonic = mnemonic
+        return ACK
+
+    def data(self, mnemonic: str) -> str:
+        if mnemonic == "TID":
+            return self.gauge_types
+        if mnemonic == "PRX":
+            return ",".join(f"{status}, {pressure:.4E}" for status, pressure in self.gauges.values())
+
+        status, pressure = self.gauges[int(mnemonic[2])]
+        return f"{status}, {pressure:.4E}"
+
+    def __start_continuous(self, interval: float):
+        self.__continuous_stop.set()
+        stop = self.__continuous_stop = threading.Event()
+
+        def transmit():
+            deadline = time.monotonic() + interval
+            while not stop.wait(max(0.0, deadline - time.monotonic())):
+                self.send(f"{self.data('PRX')}\r\n".encode())
+                deadline += interval
+
+        threading.Thread(target=transmit, name="VGC403Simulator continuous", daemon=True).start()
@@ -0,0 +1,36 @@
+import argparse
+import time
+
+from driver.WP8026ADAM import WP8026ADAM
+from simulator.WP8026ADAMSimulator import WP8026ADAMSimulator
+
+
+def measure(name, func, count):
+    latencies = sorted(timed_call(func) for _ in range(count))
+    print(f"{name:<40} {count / sum(latencies):10.1f} cmd/s   p50 {1e3 * latencies[count // 2]:8.3f} ms   "
+          f"p99 {1e3 * latencies[min(count - 1, int(0.99 * count))]:8.3f} ms")
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def driver_benchmark(latency, count):
+    # The driver always talks at 9600 baud
+    simulator = WP8026ADAMSimulator(baudrate=9600, latency=latency).start()
+    device = WP8026ADAM(comport=simulator.port)
+
+    measure("get_input_states", device.get_input_states, count)
+
+    simulator.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="WP8026ADAM driver benchmark against a simulated input module")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated device latency in seconds")
+    parser.add_argument("--count", type=int, default=200, help="calls per driver method")
+    args = parser.parse_args()
+
+    driver_benchmark(args.latency, args.count)
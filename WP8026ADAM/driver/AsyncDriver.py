@@ -0,0 +1,47 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared by every driver in the process, bounds the number of blocking device calls in flight at once
+EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix="AsyncDriver")
+
+# Guards the creation of the lock of each driver, so two threads calling a new driver can't create one each
+_DRIVER_LOCK_CREATION = threading.Lock()
+
+
+class AsyncDriverMixin:
+    """
+    Gives a driver an awaitable twin of every public method: await driver.a<method>(...) runs driver.<method>(...)
+    on the shared executor, so one event loop can poll many devices without a thread per device. Calls to the same
+    driver are serialized by a lock of the driver, also when they are awaited from different event loops or threads,
+    as the devices only handle one exchange at a time.
+    """
+
+    def __getattr__(self, name: str):
+        method_name = name[1:]
+        if not name.startswith("a") or method_name.startswith("_") \
+                or not callable(getattr(type(self), method_name, None)):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        method = getattr(self, method_name)
+        lock = self.__driver_lock()
+
+        def locked_method(*args, **kwargs):
+            with lock:
+                return method(*args, **kwargs)
+
+        @functools.wraps(method)
+        async def async_method(*args, **kwargs):
+            return await asyncio.get_running_loop().run_in_executor(EXECUTOR,
+                                                                    functools.partial(locked_method, *args, **kwargs))
+
+        return async_method
+
+    def __driver_lock(self) -> threading.Lock:
+        # Created on first use, the drivers don't all call the __init__ of their base classes
+        lock = self.__dict__.get("_async_lock")
+        if lock is None:
+            with _DRIVER_LOCK_CREATION:
+                lock = self.__dict__.setdefault("_async_lock", threading.Lock())
+        return lock
@@ -5,6 +5,8 @@ import pymodbus.exceptions
 from pymodbus.client import ModbusSerialClient
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from driver.AsyncDriver import AsyncDriverMixin
+
 
 class InputState(Enum):
     LOW = 0
@@ -12,7 +14,7 @@ class InputState(Enum):
     UNKNOWN = 2
 
 
-class WP8026ADAM(QObject):
+class WP8026ADAM(AsyncDriverMixin, QObject):
 
     stateChanged = pyqtSignal(int, InputState)
 
@@ -24,11 +26,15 @@ class WP8026ADAM(QObject):
         if not self.__modbus_client.connect():
             raise pymodbus.exceptions.ModbusException(f"Failed to connect to WP8026ADAM on port {comport}")
 
+    def close(self):
+        self.__modbus_client.close()
+
     def get_input_states(self, input_n: int = -1) -> Iterable[InputState]:
         assert -1 <= input_n <= 15
 
         if self.__modbus_client.send([0x01, 0x02, 0x00, 0x00, 0x00, 0x10, 0x79, 0xc6]):
-            response = self.__modbus_client.recv(8)
+            # Address, function code, byte count, 2 bytes of input states and the CRC
+            response = self.__modbus_client.recv(7)
             if not response:
                 return [InputState.UNKNOWN]*16 if input_n == -1 else [InputState.UNKNOWN]
 
@@ -1,18 +1,28 @@
 from typing import Iterable
 
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import pyqtSignal
 from PyQt5.QtGui import QDoubleValidator
 from PyQt5.QtWidgets import QWidget, QComboBox, QPushButton, QLineEdit, QLabel, QHBoxLayout, QVBoxLayout
 from serial.tools.list_ports import comports
 
+from driver.PollScheduler import PollScheduler
+from driver.Telemetry import TelemetryRecorder
 from driver.WP8026ADAM import WP8026ADAM
 
 
 class WP8026ADAMWidget(QWidget):
-    def __init__(self):
+    # Emitted from the polling thread, delivered on the GUI thread
+    readouts_ready = pyqtSignal(object)
+
+    def __init__(self, recorder: TelemetryRecorder = None, scheduler: PollScheduler = None):
         super().__init__()
 
         self.device = None
+        self.recorder = recorder
+        self.owns_scheduler = scheduler is None
+        self.scheduler = scheduler if scheduler is not None else PollScheduler()
+        self.channel_name = None
+        self.comport = None
 
         self.setLayout(QVBoxLayout())
 
@@ -27,7 +37,7 @@ class WP8026ADAMWidget(QWidget):
         self.interval_edit.setText("2")
         self.interval_edit.editingFinished.connect(self.update_interval)
 
-        self.measurement_timer = QTimer()
+        self.readouts_ready.connect(self.show_measurements)
 
         self.input_readout_labels: Iterable[QLabel] = [QLabel(f"Input {i}: UNKNOWN") for i in range(1, 17)]
 
@@ -45,28 +55,52 @@ class WP8026ADAMWidget(QWidget):
             self.layout().addWidget(label)
 
     def connect_device(self):
-        self.device = WP8026ADAM(comport=self.comport_dropdown.currentText())
-        self.measurement_timer.timeout.connect(self.get_measurements)
-        self.measurement_timer.start(1000 * int(self.interval_edit.text()))
+        self.comport = self.comport_dropdown.currentText()
+        self.device = WP8026ADAM(comport=self.comport)
+        self.channel_name = f"WP8026ADAM/{self.comport}"
+        self.scheduler.add_channel(self.channel_name, self.comport, self.get_measurements, self.interval(),
+                                   self.readouts_ready.emit)
         self.connect_button.setText("Disconnect")
         self.connect_button.clicked.disconnect(self.connect_device)
         self.connect_button.clicked.connect(self.disconnect_device)
 
     def disconnect_device(self):
+        self.scheduler.remove_channel(self.channel_name)
+        # Close the port on the polling lane, after a poll that may still be running
+        self.scheduler.submit(self.comport, self.device.close)
         self.device = None
-        self.measurement_timer.timeout.disconnect(self.get_measurements)
-        self.measurement_timer.stop()
         self.connect_button.setText("Connect")
         self.connect_button.clicked.disconnect(self.disconnect_device)
         self.connect_button.clicked.connect(self.connect_device)
 
+    def closeEvent(self, event):
+        if self.device:
+            self.disconnect_device()
+        if self.owns_scheduler:
+            # Runs the calls already submitted before the lane stops, nothing records from it afterwards
+            self.scheduler.close()
+        super().closeEvent(event)
+
+    def interval(self) -> float:
+        return float(self.interval_edit.text().replace(",", "."))
+
     def get_measurements(self):
-        assert self.device, "There was no device, but measurements were requested"
-        readouts = self.device.get_input_states()
+        """Called on the polling thread"""
+        device = self.device
+        assert device, "There was no device, but measurements were requested"
+        return device.get_input_states()
+
+    def show_measurements(self, readouts):
+        if self.device is None:
+            return
 
         for idx, label in enumerate(self.input_readout_labels):
             label.setText(f"Input {idx+1}: {readouts[idx].name}")
 
+        if self.recorder:
+            self.recorder.record_many({f"WP8026ADAM/input{idx+1}": readout.value
+                                       for idx, readout in enumerate(readouts)})
+
     def update_interval(self):
         if self.device:
-            self.measurement_timer.start(int(1000 * float(self.interval_edit.text().replace(",", "."))))
+            self.scheduler.set_interval(self.channel_name, self.interval())
@@ -2,12 +2,17 @@ import sys
 
 from PyQt5.QtWidgets import QApplication
 
+from driver.Telemetry import TelemetryRecorder
 from gui.WP8026ADAMWidget import WP8026ADAMWidget
 
 if __name__ == '__main__':
+    recorder = TelemetryRecorder(TelemetryRecorder.default_path("WP8026ADAM"))
+
     app = QApplication([])
-    widget = WP8026ADAMWidget()
+    widget = WP8026ADAMWidget(recorder)
 
     widget.show()
 
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    recorder.close()
+    sys.exit(exit_code)
@@ -0,0 +1,57 @@
+import struct
+from typing import List, Optional
+
+from simulator.PtySerialDevice import PtySerialDevice
+
+READ_DISCRETE_INPUTS = 0x02
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+
+
+def crc16(data: bytes) -> bytes:
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return struct.pack("<H", crc)
+
+
+class WP8026ADAMSimulator(PtySerialDevice):
+    """Simulated WP8026ADAM 16 channel digital input module speaking Modbus RTU"""
+
+    INPUT_COUNT = 16
+
+    def __init__(self, slave_address: int = 1, baudrate: int = 9600, latency: float = 0.0):
+        super().__init__(terminator=b"", baudrate=baudrate, latency=latency)
+
+        self.slave_address = slave_address
+        # Bit n is input n + 1
+        self.inputs = 0
+
+    def split_commands(self, buffer: bytearray) -> List[bytes]:
+        # Every request the module understands is 8 bytes long
+        commands = []
+        while len(buffer) >= 8:
+            commands.append(bytes(buffer[:8]))
+            del buffer[:8]
+        return commands
+
+    def handle_command(self, command: bytes) -> Optional[bytes]:
+        if crc16(command[:-2]) != command[-2:] or command[0] != self.slave_address:
+            return None
+
+        function_code = command[1]
+        address, count = struct.unpack(">HH", command[2:6])
+
+        if function_code != READ_DISCRETE_INPUTS:
+            response = bytes([self.slave_address, function_code | 0x80, ILLEGAL_FUNCTION])
+        elif count == 0 or address + count > self.INPUT_COUNT:
+            response = bytes([self.slave_address, function_code | 0x80, ILLEGAL_DATA_ADDRESS])
+        else:
+            byte_count = (count + 7) // 8
+            states = (self.inputs >> address) & ((1 << count) - 1)
+            response = bytes([self.slave_address, function_code, byte_count]) + states.to_bytes(byte_count, "little")
+
+        return response + crc16(response)